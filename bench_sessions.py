@@ -0,0 +1,100 @@
+"""Session storage benchmark: on-disk size and load time per session format.
+
+Generates synthetic sessions shaped like real ones (prose plus generated code
+blocks), stores them in each format in a temporary directory and loads them back.
+
+    python bench_sessions.py [--sessions N] [--turns N]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from utils.session_format import zstandard
+from utils.session_manager import SessionManager
+
+WORDS = ("the function returns a list of results when the request succeeds and raises "
+         "an error otherwise so callers should retry with backoff after checking status").split()
+
+CODE = '''```python
+def {name}(items, limit={limit}):
+    """Return the first {limit} items that pass validation."""
+    results = []
+    for item in items:
+        if item.get("status") == "ok" and item.get("score", 0) > {threshold}:
+            results.append(item)
+        if len(results) >= limit:
+            break
+    return results
+```'''
+
+
+def make_conversation(rng: random.Random, turns: int) -> list:
+    conversation = []
+    for turn in range(turns):
+        conversation.append({"role": "user", "content": " ".join(rng.choices(WORDS, k=rng.randint(8, 40)))})
+        reply = " ".join(rng.choices(WORDS, k=rng.randint(40, 200)))
+        for block in range(rng.randint(0, 3)):
+            reply += "\n\n" + CODE.format(name=f"select_{turn}_{block}", limit=rng.randint(1, 50),
+                                          threshold=rng.random())
+        conversation.append({"role": "assistant", "content": reply})
+    return conversation
+
+
+def directory_size(path: str) -> int:
+    """Bytes of session files plus any trained dictionaries, excluding the index."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+        if name != "index.db"
+    )
+
+
+def bench_format(conversations: list, compression: str) -> tuple:
+    """(bytes on disk, seconds to load every session) for one format."""
+    directory = tempfile.mkdtemp(prefix=f"bench_sessions_{compression}_")
+    try:
+        manager = SessionManager(directory)
+        for i, conversation in enumerate(conversations):
+            manager.save_session(conversation, f"session_{i}")
+        if compression != "json":
+            manager.migrate_sessions(compression)
+        size = directory_size(directory)
+
+        # Fresh manager so dictionaries are loaded from disk as in a new process
+        manager = SessionManager(directory)
+        filenames = [session["filename"] for session in manager.list_sessions()]
+        start = time.perf_counter()
+        for filename in filenames:
+            manager.load_session(filename)
+        return size, time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    conversations = [make_conversation(rng, args.turns) for _ in range(args.sessions)]
+
+    formats = ["json", "gzip"] + (["zstd"] if zstandard is not None else [])
+    baseline = None
+    print(f"{'format':<8}{'size KB':>12}{'ratio':>8}{'load ms':>10}{'ms/session':>12}")
+    for compression in formats:
+        size, seconds = bench_format(conversations, compression)
+        baseline = baseline or size
+        print(f"{compression:<8}{size / 1024:>12.1f}{baseline / size:>8.2f}"
+              f"{seconds * 1000:>10.1f}{seconds * 1000 / args.sessions:>12.3f}")
+    if zstandard is None:
+        print("\nzstd skipped: install zstandard to include it")
+
+
+if __name__ == "__main__":
+    main()
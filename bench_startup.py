@@ -0,0 +1,90 @@
+"""Startup benchmark: time-to-menu and per-module import cost.
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+
+    python bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = [
+    "main",
+    "features.chat",
+    "features.code_gen",
+    "features.arxiv_search",
+    "features.settings",
+    "models.ai_manager",
+    "models.openai_client",
+    "models.anthropic_client",
+    "models.groq_client",
+    "models.gemini_client",
+    "models.context_budget",
+    "utils.config_manager",
+    "utils.session_manager",
+    "utils.export_manager",
+    "utils.response_cache",
+]
+
+TIME_TO_MENU = """
+import io, time
+start = time.perf_counter()
+from rich.console import Console
+import main
+assistant = main.AIAssistant()
+console = Console(file=io.StringIO())
+console.print(main.create_header("AI Assistant"))
+console.print(main.create_menu([]))
+print(time.perf_counter() - start)
+"""
+
+
+def measure_time_to_menu(runs: int) -> list:
+    """Seconds from interpreter start of the snippet until the main menu is rendered."""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", TIME_TO_MENU],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def measure_import_cost(module: str) -> int:
+    """Cumulative microseconds spent importing a module, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return -1
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    return -1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = measure_time_to_menu(args.runs)
+    print(f"time-to-menu: median {statistics.median(timings) * 1000:.1f} ms "
+          f"(min {min(timings) * 1000:.1f} ms, {args.runs} runs)")
+
+    print(f"\n{'module':<28}{'import ms':>10}")
+    for module in MODULES:
+        cost = measure_import_cost(module)
+        shown = f"{cost / 1000:.1f}" if cost >= 0 else "error"
+        print(f"{module:<28}{shown:>10}")
+
+
+if __name__ == "__main__":
+    main()
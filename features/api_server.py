@@ -0,0 +1,251 @@
+from rich.console import Console
+from aiohttp import web
+import asyncio
+import contextlib
+import json
+import re
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, AsyncIterator
+
+from models.ai_manager import AIManager
+from models.context_budget import ContextBudget
+from utils.logger import setup_logger
+from utils.session_manager import SessionManager
+
+console = Console()
+logger = setup_logger()
+
+# Session ids double as file names, so only allow a safe character set
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+class APIServer:
+    """HTTP interface to chat, code generation and arXiv search.
+
+    All requests share one AIManager, so concurrent clients reuse the same
+    provider clients and their connection pools.
+
+    Endpoints:
+      POST   /chat                    {"message", "session_id"?, "provider"?} -> server-sent events
+      GET    /sessions                list saved sessions
+      GET    /sessions/{session_id}   conversation of a session
+      DELETE /sessions/{session_id}   delete a session
+      POST   /code                    {"description", "review"?} -> generated project
+      GET    /arxiv/search?query=...  arXiv results
+      POST   /arxiv/analyze           {"query", "papers"?} -> AI analysis
+    """
+
+    def __init__(self, config, sessions_dir: Optional[str] = None):
+        self.config = config
+        self.ai_manager = AIManager(config)
+        self.context_budget = ContextBudget(config, summarizer=self.ai_manager.get_chat_response)
+        self.session_manager = SessionManager(
+            sessions_dir or config.get("Server", "sessions_dir", fallback="sessions"),
+            compression=config.get("Sessions", "compression", fallback="json")
+        )
+        # Recently used conversations; every turn is saved, so evicted ones reload from disk
+        self.max_cached_sessions = int(config.get("Server", "max_cached_sessions", fallback="256"))
+        self.sessions: "OrderedDict[str, List[Dict[str, str]]]" = OrderedDict()
+        # Locks exist only while a session has turns running or waiting
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        self._code_gen = None
+        self._arxiv = None
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get("/health", self.health),
+            web.post("/chat", self.chat),
+            web.get("/sessions", self.list_sessions),
+            web.get("/sessions/{session_id}", self.get_session),
+            web.delete("/sessions/{session_id}", self.delete_session),
+            web.post("/code", self.generate_code),
+            web.get("/arxiv/search", self.arxiv_search),
+            web.post("/arxiv/analyze", self.arxiv_analyze),
+        ])
+        return app
+
+    async def run(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """Serve until cancelled."""
+        runner = web.AppRunner(self.create_app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        console.print(f"[green]API server listening on http://{host}:{port}[/green]")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    def _get_code_gen(self):
+        if self._code_gen is None:
+            from features.code_gen import CodeGenerator
+            self._code_gen = CodeGenerator(self.config)
+        return self._code_gen
+
+    def _get_arxiv(self):
+        if self._arxiv is None:
+            from features.arxiv_search import ArxivSearch
+            self._arxiv = ArxivSearch(self.config, self.ai_manager)
+        return self._arxiv
+
+    async def _read_json(self, request: web.Request) -> Dict:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Request body must be a JSON object")
+        return body
+
+    def _check_session_id(self, session_id: str) -> str:
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise web.HTTPBadRequest(text="Invalid session id")
+        return session_id
+
+    async def _load_conversation(self, session_id: str) -> List[Dict[str, str]]:
+        """Get a session's conversation from memory, falling back to its saved file."""
+        conversation = self.sessions.get(session_id)
+        if conversation is None:
+            conversation = await asyncio.to_thread(self._read_session, session_id) or []
+        self._remember(session_id, conversation)
+        return conversation
+
+    def _remember(self, session_id: str, conversation: List[Dict[str, str]]) -> None:
+        """Keep a conversation in memory, evicting the least recently used beyond max_cached_sessions."""
+        self.sessions[session_id] = conversation
+        self.sessions.move_to_end(session_id)
+        while len(self.sessions) > self.max_cached_sessions:
+            self.sessions.popitem(last=False)
+
+    @contextlib.asynccontextmanager
+    async def _session_lock(self, session_id: str) -> AsyncIterator[None]:
+        """Serialize turns of one session; the lock is dropped once nobody holds or awaits it."""
+        lock = self._session_locks.setdefault(session_id, asyncio.Lock())
+        self._lock_users[session_id] = self._lock_users.get(session_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[session_id] -= 1
+            if not self._lock_users[session_id]:
+                del self._lock_users[session_id]
+                del self._session_locks[session_id]
+
+    def _read_session(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """A saved session in whichever format it is stored, or None."""
+        filename = self.session_manager.find_session(session_id)
+        return self.session_manager.load_session(filename) if filename else None
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def chat(self, request: web.Request) -> web.StreamResponse:
+        """Stream a chat reply as server-sent events and persist the turn to the session."""
+        body = await self._read_json(request)
+        message = body.get("message")
+        if not isinstance(message, str) or not message:
+            raise web.HTTPBadRequest(text="'message' is required")
+        session_id = self._check_session_id(body.get("session_id") or uuid.uuid4().hex)
+        provider = body.get("provider") or self.ai_manager.default_provider
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache"
+        })
+        await response.prepare(request)
+
+        async def send(event: Optional[str], data: Dict) -> None:
+            prefix = f"event: {event}\n" if event else ""
+            await response.write(f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        # Turns of one session are serialized; different sessions run concurrently
+        async with self._session_lock(session_id):
+            conversation = await self._load_conversation(session_id)
+            await send("session", {"session_id": session_id})
+
+            turn = conversation + [{"role": "user", "content": message}]
+            chunks = []
+            try:
+                messages = await self.context_budget.fit(
+                    turn, provider, self.ai_manager.get_default_model(provider)
+                )
+                async for chunk in self.ai_manager.stream_chat_response(messages, provider):
+                    chunks.append(chunk)
+                    await send(None, {"chunk": chunk})
+            except (ConnectionResetError, asyncio.CancelledError):
+                # Client went away; keep the session unchanged
+                raise
+            except Exception as e:
+                logger.error(f"API chat error: {str(e)}")
+                await send("error", {"error": str(e)})
+                await response.write_eof()
+                return response
+
+            turn.append({"role": "assistant", "content": "".join(chunks)})
+            self._remember(session_id, turn)
+            await asyncio.to_thread(
+                self.session_manager.save_session, turn, session_id, True
+            )
+            await send("done", {"session_id": session_id, "message_count": len(turn)})
+
+        await response.write_eof()
+        return response
+
+    async def list_sessions(self, request: web.Request) -> web.Response:
+        sessions = await asyncio.to_thread(self.session_manager.list_sessions)
+        return web.json_response({"sessions": sessions})
+
+    async def get_session(self, request: web.Request) -> web.Response:
+        session_id = self._check_session_id(request.match_info["session_id"])
+        conversation = self.sessions.get(session_id) or await asyncio.to_thread(
+            self._read_session, session_id
+        )
+        if conversation is None:
+            raise web.HTTPNotFound(text="Session not found")
+        return web.json_response({"session_id": session_id, "conversation": conversation})
+
+    async def delete_session(self, request: web.Request) -> web.Response:
+        session_id = self._check_session_id(request.match_info["session_id"])
+        self.sessions.pop(session_id, None)
+        filename = await asyncio.to_thread(self.session_manager.find_session, session_id)
+        deleted = filename and await asyncio.to_thread(self.session_manager.delete_session, filename)
+        if not deleted:
+            raise web.HTTPNotFound(text="Session not found")
+        return web.json_response({"deleted": session_id})
+
+    async def generate_code(self, request: web.Request) -> web.Response:
+        body = await self._read_json(request)
+        description = body.get("description")
+        if not isinstance(description, str) or not description:
+            raise web.HTTPBadRequest(text="'description' is required")
+        try:
+            result = await self._get_code_gen().create_project(description, review=bool(body.get("review", True)))
+        except Exception as e:
+            logger.error(f"API code generation error: {str(e)}")
+            return web.json_response({"error": str(e)}, status=502)
+        return web.json_response(result)
+
+    async def arxiv_search(self, request: web.Request) -> web.Response:
+        query = request.query.get("query")
+        if not query:
+            raise web.HTTPBadRequest(text="'query' is required")
+        results = await self._get_arxiv()._search_arxiv(query)
+        return web.json_response({"query": query, "results": results})
+
+    async def arxiv_analyze(self, request: web.Request) -> web.Response:
+        body = await self._read_json(request)
+        query = body.get("query")
+        if not isinstance(query, str) or not query:
+            raise web.HTTPBadRequest(text="'query' is required")
+        arxiv_search = self._get_arxiv()
+        papers = body.get("papers") or await arxiv_search._search_arxiv(query)
+        if not papers:
+            return web.json_response({"query": query, "analysis": None, "papers": []})
+        try:
+            analysis = await arxiv_search._analyze_papers(papers, query)
+        except Exception as e:
+            logger.error(f"API arXiv analysis error: {str(e)}")
+            return web.json_response({"error": str(e)}, status=502)
+        return web.json_response({"query": query, "analysis": str(analysis), "papers": papers})
@@ -0,0 +1,98 @@
+import re
+from bisect import insort
+from datetime import date
+from typing import List, Dict, Any, Optional
+
+WORD = re.compile(r"\w+")
+
+# /sort criteria; each keeps a presorted ordering in both directions
+SORT_CRITERIA = ("date", "authors", "relevance")
+
+class ResultIndex:
+    """In-memory view of the loaded results of one query for instant /filter and /sort.
+
+    Papers are added page by page. A category -> positions inverted index and
+    one presorted ordering per criterion are updated incrementally, so any
+    filter/sort combination is answered without re-querying arXiv.
+    """
+
+    def __init__(self, query: str = ""):
+        # Field prefixes like "ti:" and boolean operators are not relevance terms
+        self.terms = {
+            term for term in WORD.findall(query.lower())
+            if term not in ("and", "or", "andnot", "ti", "au", "abs", "cat", "all")
+        }
+        self.papers: List[Dict[str, Any]] = []
+        self.by_category: Dict[str, List[int]] = {}
+        # (criterion, descending) -> sorted (key, position); ties keep load order either way
+        self.orderings: Dict[tuple, List[tuple]] = {
+            (criterion, descending): [] for criterion in SORT_CRITERIA for descending in (False, True)
+        }
+        self._seen = set()
+
+    def __len__(self) -> int:
+        return len(self.papers)
+
+    def add(self, papers: List[Dict[str, Any]]) -> None:
+        """Index newly loaded papers; papers already indexed are skipped."""
+        for paper in papers:
+            if paper['url'] in self._seen:
+                continue
+            self._seen.add(paper['url'])
+            position = len(self.papers)
+            self.papers.append(paper)
+            for category in paper.get('categories', []):
+                self.by_category.setdefault(category, []).append(position)
+            for criterion in SORT_CRITERIA:
+                key = self._sort_key(criterion, paper)
+                insort(self.orderings[(criterion, False)], (key, position))
+                insort(self.orderings[(criterion, True)], (-key, position))
+
+    def _sort_key(self, criterion: str, paper: Dict[str, Any]):
+        if criterion == "date":
+            return date.fromisoformat(paper['published']).toordinal()
+        if criterion == "authors":
+            return len(paper['authors'])
+        return self.relevance(paper)
+
+    def relevance(self, paper: Dict[str, Any]) -> int:
+        """Query term hits, with title matches counting double."""
+        if not self.terms:
+            return 0
+        title = WORD.findall(paper['title'].lower())
+        abstract = WORD.findall(paper['abstract'].lower())
+        return 2 * sum(word in self.terms for word in title) + sum(word in self.terms for word in abstract)
+
+    def categories(self) -> Dict[str, int]:
+        """Paper count per category, most common first."""
+        return dict(sorted(
+            ((category, len(positions)) for category, positions in self.by_category.items()),
+            key=lambda item: (-item[1], item[0])
+        ))
+
+    def _matching_positions(self, category: str) -> set:
+        """Positions in a category; "cs" also matches every "cs.*" category."""
+        positions = set(self.by_category.get(category, []))
+        if "." not in category:
+            for name, members in self.by_category.items():
+                if name.startswith(category + "."):
+                    positions.update(members)
+        return positions
+
+    def view(self,
+             category: Optional[str] = None,
+             sort_by: Optional[str] = None,
+             descending: bool = True) -> List[Dict[str, Any]]:
+        """Loaded papers, optionally restricted to a category and in a presorted order."""
+        if sort_by is not None and sort_by not in SORT_CRITERIA:
+            raise ValueError(f"Unknown sort criterion: {sort_by}")
+        allowed = self._matching_positions(category) if category else None
+
+        if sort_by is None:
+            positions = sorted(allowed) if allowed is not None else range(len(self.papers))
+        else:
+            positions = [
+                position for _, position in self.orderings[(sort_by, descending)]
+                if allowed is None or position in allowed
+            ]
+        return [self.papers[position] for position in positions]
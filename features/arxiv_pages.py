@@ -0,0 +1,107 @@
+import asyncio
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+class ResultPage:
+    """One page of search results, formatted into dicts only when first viewed.
+
+    Prefetched pages that are never opened cost only the raw API objects.
+    """
+
+    def __init__(self,
+                 items: Iterable[Any],
+                 format_item: Optional[Callable[[Any], Dict[str, Any]]] = None,
+                 on_materialize: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self._items = list(items)
+        self._results: Optional[List[Dict[str, Any]]] = None
+        self.format_item = format_item
+        self.on_materialize = on_materialize
+
+    def __len__(self) -> int:
+        return len(self._results if self._results is not None else self._items)
+
+    def materialize(self) -> List[Dict[str, Any]]:
+        if self._results is None:
+            if self.format_item:
+                self._results = [self.format_item(item) for item in self._items]
+            else:
+                self._results = self._items
+            self._items = None
+            if self.on_materialize:
+                self.on_materialize(self._results)
+        return self._results
+
+class ResultPager:
+    """Cursor over the pages of one query that prefetches the next page in the background.
+
+    Only the most recently used `max_cached_pages` pages are kept in memory;
+    older ones are fetched again (from the local store) when revisited.
+    """
+
+    def __init__(self,
+                 fetch_page: Callable[[int], Awaitable[ResultPage]],
+                 page_size: int,
+                 max_cached_pages: int = 5):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_cached_pages = max(max_cached_pages, 2)
+        self.page = -1
+        self._pages: "OrderedDict[int, ResultPage]" = OrderedDict()
+        self._prefetching: Dict[int, asyncio.Task] = {}
+
+    @property
+    def has_next(self) -> bool:
+        """A short page means the result set ended there."""
+        current = self._pages.get(self.page)
+        return current is None or len(current) >= self.page_size
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 0
+
+    async def get(self, page: int) -> List[Dict[str, Any]]:
+        """Results of a page, then start fetching the one after it."""
+        if page in self._pages:
+            self._pages.move_to_end(page)
+        else:
+            task = self._prefetching.pop(page, None)
+            self._pages[page] = await task if task else await self.fetch_page(page)
+            self._evict(keep=page)
+
+        self.page = page
+        if self.has_next:
+            self._prefetch(page + 1)
+        return self._pages[page].materialize()
+
+    async def next(self) -> List[Dict[str, Any]]:
+        return await self.get(self.page + 1)
+
+    async def prev(self) -> List[Dict[str, Any]]:
+        return await self.get(max(self.page - 1, 0))
+
+    def _prefetch(self, page: int) -> None:
+        if page in self._pages or page in self._prefetching:
+            return
+        task = asyncio.ensure_future(self.fetch_page(page))
+        # Retrieve a failed prefetch's exception so it is not reported as never retrieved;
+        # get() awaits the same task and sees the error there
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._prefetching[page] = task
+
+    def _evict(self, keep: int) -> None:
+        while len(self._pages) > self.max_cached_pages:
+            oldest = next(iter(self._pages))
+            if oldest == keep:
+                self._pages.move_to_end(oldest)
+                continue
+            del self._pages[oldest]
+
+    def close(self) -> None:
+        """Cancel background prefetches when the query is abandoned."""
+        for task in self._prefetching.values():
+            task.cancel()
+        self._prefetching.clear()
@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from utils.embedding_store import EmbeddingStore
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Rows scaled to unit length so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class SemanticRanker:
+    """Re-ranks papers by embedding similarity to the query and collapses near-duplicates.
+
+    Paper vectors are embedded once per entry_id and kept in an EmbeddingStore,
+    so only papers never seen before cost an embedding call. Scoring and
+    duplicate detection are a couple of matrix products per page.
+    """
+
+    def __init__(self, embedder, cache_dir: str = "cache", dedup_threshold: float = 0.95):
+        self.embedder = embedder
+        self.cache_dir = cache_dir
+        self.dedup_threshold = dedup_threshold
+        self.store: Optional[EmbeddingStore] = None
+        self._queries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @staticmethod
+    def paper_text(paper: Dict[str, Any]) -> str:
+        return f"{paper['title']}\n\n{paper['abstract']}"
+
+    async def _query_vector(self, query: str) -> np.ndarray:
+        vector = self._queries.get(query)
+        if vector is None:
+            vector = normalize(await self.embedder.embed([query]))[0]
+            self._queries[query] = vector
+            if len(self._queries) > 32:
+                self._queries.popitem(last=False)
+        if self.store is None:
+            # Provider embeddings have a model-specific size, learned from the first vector
+            self.store = EmbeddingStore(self.cache_dir, self.embedder.name, vector.shape[0])
+        return vector
+
+    async def _paper_vectors(self, papers: List[Dict[str, Any]]) -> np.ndarray:
+        by_id = {paper['url']: paper for paper in papers}
+        missing = self.store.missing(list(by_id))
+        if missing:
+            vectors = await self.embedder.embed([self.paper_text(by_id[entry_id]) for entry_id in missing])
+            self.store.add(missing, vectors)
+        return normalize(self.store.get([paper['url'] for paper in papers]))
+
+    async def rank(self, query: str, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Papers most similar to the query first, keeping only the best of each near-duplicate group."""
+        if not papers:
+            return []
+        query_vector = await self._query_vector(query)
+        vectors = await self._paper_vectors(papers)
+
+        order = np.argsort(-(vectors @ query_vector), kind="stable")
+        vectors = vectors[order]
+        similarity = vectors @ vectors.T
+        collapsed = np.zeros(len(order), dtype=bool)
+        kept = []
+        for i in range(len(order)):
+            if collapsed[i]:
+                continue
+            kept.append(order[i])
+            collapsed |= similarity[i] >= self.dedup_threshold
+
+        if len(kept) < len(papers):
+            logger.info(f"Collapsed {len(papers) - len(kept)} near-duplicate papers")
+        return [papers[i] for i in kept]
@@ -4,26 +4,90 @@ from rich.prompt import Prompt
 from rich.panel import Panel
 from rich.markdown import Markdown
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
-from crewai import Agent, Task, Crew, Process
-from langchain.tools import Tool
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 from utils.logger import setup_logger
-from utils.export_manager import ExportManager
+from utils.arxiv_store import ArxivStore
+from utils.pdf_library import PdfLibrary
+from features.arxiv_pages import ResultPage, ResultPager
+from features.arxiv_index import ResultIndex, SORT_CRITERIA
+from utils.export_manager import ExportManager, EXPORT_FORMATS
 
 console = Console()
 logger = setup_logger()
 
+# [ArXiv] sort values and the order arXiv returns results in
+API_SORT_CRITERIA = {
+    "submitted": arxiv.SortCriterion.SubmittedDate,
+    "updated": arxiv.SortCriterion.LastUpdatedDate,
+    "relevance": arxiv.SortCriterion.Relevance
+}
+
+# Prompt for the map step: one self-contained summary per paper, reused across queries
+PAPER_SUMMARY_PROMPT = """Summarize this paper in 3-5 bullet points covering its key findings, \
+methodology and main contribution. Be concise.
+
+Title: {title}
+Authors: {authors}
+Abstract: {abstract}"""
+
+# Map-step prompt when the paper's PDF text has been extracted
+PAPER_FULLTEXT_PROMPT = """Summarize this paper in 3-5 bullet points covering its key findings, \
+methodology and main contribution. Be concise.
+
+Title: {title}
+Authors: {authors}
+Abstract: {abstract}
+
+Full text (may be truncated):
+{text}"""
+
+# Prompt for the reduce step over per-paper (or already merged) summaries
+REDUCE_PROMPT = """Analyze these papers for query: {query}
+
+Paper summaries:
+{summaries}
+
+Guidelines:
+1. Identify key themes and findings
+2. Highlight important methodologies
+3. Note significant contributions
+4. Suggest potential applications
+5. Identify research trends"""
+
 class ArxivSearch:
-    def __init__(self, config):
+    def __init__(self, config, ai_manager=None):
         self.config = config
         self.export_manager = ExportManager()
         self.results_per_page = int(config.get("ArXiv", "results_per_page", fallback="10"))
+        # "mapreduce" summarizes papers concurrently and merges them; "crew" runs one crewai task
+        self.analysis_mode = config.get("ArXiv", "analysis_mode", fallback="mapreduce")
+        self.analysis_concurrency = int(config.get("ArXiv", "analysis_concurrency", fallback="4"))
+        self.reduce_batch = max(int(config.get("ArXiv", "reduce_batch", fallback="20")), 2)
+        self.store = ArxivStore(config.get("Cache", "cache_dir", fallback="cache"))
+        # Seconds a query's result list is served locally before asking arXiv again
+        self.query_ttl = float(config.get("ArXiv", "query_ttl", fallback="21600"))
+        # Offline mode answers every query from the local full-text index
+        self.offline = config.get("ArXiv", "offline", fallback="false").lower() == "true"
+        # Pages of the current query kept in memory while browsing with /next and /prev
+        self.max_cached_pages = int(config.get("ArXiv", "max_cached_pages", fallback="5"))
+        self.pager: Optional[ResultPager] = None
+        # PDFs fetched with /pdf give the analysis the paper text, not just the abstract
+        self.pdfs = PdfLibrary.from_config(config)
+        self.fulltext_chars = int(config.get("ArXiv", "fulltext_chars", fallback="12000"))
+        self._pdf_task: Optional[asyncio.Task] = None
+        # All loaded results of the current query, for /filter and /sort
+        self.result_index = ResultIndex()
+        self.filter_category: Optional[str] = None
+        self.sort_by: Optional[str] = None
+        self.sort_descending = True
+        # Order requested from the arXiv API: submitted, updated or relevance
+        self.api_sort = config.get("ArXiv", "sort", fallback="submitted")
+        # Optional embedding re-ranking of each page against the query
+        self.rerank = config.get("ArXiv", "rerank", fallback="false").lower() == "true"
+        self.dedup_threshold = float(config.get("ArXiv", "dedup_threshold", fallback="0.95"))
+        self._ranker = None
         self.current_results = []
         self.current_query = ""
         
@@ -38,80 +102,176 @@ class ArxivSearch:
         self.provider = config.get("DEFAULT", "ai_provider")
         self.model = config.get(self.provider.title(), "default_model")
         
-        # Initialize language model
-        self.llm = self._initialize_llm()
+        # Language model and AI manager are created on first analysis
+        self._llm = None
+        self._ai_manager = ai_manager
+
+    @property
+    def ai_manager(self):
+        if self._ai_manager is None:
+            from models.ai_manager import AIManager
+            self._ai_manager = AIManager(self.config)
+        return self._ai_manager
+
+    @property
+    def ranker(self):
+        # numpy is only imported once re-ranking is actually used
+        if self._ranker is None:
+            from models.embeddings import get_embedder
+            from features.arxiv_rank import SemanticRanker
+            self._ranker = SemanticRanker(
+                get_embedder(self.config, self.ai_manager),
+                self.config.get("Cache", "cache_dir", fallback="cache"),
+                self.dedup_threshold
+            )
+        return self._ranker
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = self._initialize_llm()
+        return self._llm
 
     def _initialize_llm(self):
         """Initialize the appropriate language model based on config."""
+        # langchain packages are slow to import, so load only the one in use
         if self.provider == "groq":
+            from langchain_groq import ChatGroq
             return ChatGroq(
                 groq_api_key=self.config.get("Groq", "api_key"),
                 model_name=self.model
             )
         elif self.provider == "openai":
+            from langchain_openai import ChatOpenAI
             return ChatOpenAI(
                 api_key=self.config.get("OpenAI", "api_key"),
                 model_name=self.model
             )
         elif self.provider == "anthropic":
+            from langchain_anthropic import ChatAnthropic
             return ChatAnthropic(
                 api_key=self.config.get("Anthropic", "api_key"),
                 model_name=self.model
             )
         elif self.provider == "gemini":
+            from langchain_google_genai import ChatGoogleGenerativeAI
             return ChatGoogleGenerativeAI(
                 api_key=self.config.get("Gemini", "api_key"),
                 model_name=self.model
             )
 
-    async def _search_arxiv(self, query: str) -> List[Dict]:
-        """Search arxiv papers using the API."""
-        try:
-            # Create search query
-            search = arxiv.Search(
-                query=query,
-                max_results=self.results_per_page,
-                sort_by=arxiv.SortCriterion.SubmittedDate,
-                sort_order=arxiv.SortOrder.Descending
-            )
+    def _query_key(self, query: str, page: int = 0) -> str:
+        """Cache key for one page of a query's results; whitespace differences don't matter."""
+        return f"{' '.join(query.split())}|{self.results_per_page}|{self.api_sort}_desc|{page}"
+
+    def _format_paper(self, paper: arxiv.Result) -> Dict[str, Any]:
+        return {
+            'title': paper.title,
+            'authors': [author.name for author in paper.authors],
+            'abstract': paper.summary,
+            'url': paper.entry_id,
+            'pdf_url': paper.pdf_url,
+            'published': paper.published.strftime("%Y-%m-%d"),
+            'updated': paper.updated.strftime("%Y-%m-%d"),
+            'categories': paper.categories,
+            'comment': paper.comment,
+            'journal_ref': paper.journal_ref,
+            'doi': paper.doi
+        }
+
+    async def _fetch_page(self, query: str, page: int = 0) -> ResultPage:
+        """Fetch one page of results, serving repeated queries from the local store until they expire."""
+        key = self._query_key(query, page)
+        offset = page * self.results_per_page
+        entry_ids = self.store.get_cached_query(key, self.query_ttl)
+        if entry_ids is not None:
+            return ResultPage(self.store.get_papers(entry_ids))
+        if self.offline:
+            return ResultPage(self.store.search_local(query, self.results_per_page, offset))
+
+        # Create search query for just this page
+        search = arxiv.Search(
+            query=query,
+            max_results=offset + self.results_per_page,
+            sort_by=API_SORT_CRITERIA.get(self.api_sort, arxiv.SortCriterion.SubmittedDate),
+            sort_order=arxiv.SortOrder.Descending
+        )
 
-            # Execute search synchronously in a thread pool
-            def do_search():
-                return list(self.client.results(search))
+        # Execute search synchronously in a thread pool
+        def do_search():
+            return list(self.client.results(search, offset=offset))
 
-            # Run in thread pool
+        try:
             papers = await asyncio.to_thread(do_search)
-            
-            # Format results
-            results = []
-            for paper in papers:
-                results.append({
-                    'title': paper.title,
-                    'authors': [author.name for author in paper.authors],
-                    'abstract': paper.summary,
-                    'url': paper.entry_id,
-                    'pdf_url': paper.pdf_url,
-                    'published': paper.published.strftime("%Y-%m-%d"),
-                    'categories': paper.categories,
-                    'comment': paper.comment,
-                    'journal_ref': paper.journal_ref,
-                    'doi': paper.doi
-                })
-            return results
+        except Exception as e:
+            # Serve stale results or local matches rather than nothing
+            logger.error(f"arXiv search error, using local store: {str(e)}")
+            entry_ids = self.store.get_cached_query(key, None)
+            if entry_ids is not None:
+                return ResultPage(self.store.get_papers(entry_ids))
+            return ResultPage(self.store.search_local(query, self.results_per_page, offset))
+
+        def remember(results: List[Dict]) -> None:
+            self.store.upsert_papers(results)
+            self.store.cache_query(key, [result['url'] for result in results])
 
+        # Results are formatted and stored only once the page is viewed
+        return ResultPage(papers, self._format_paper, remember)
+
+    async def _search_arxiv(self, query: str, page: int = 0) -> List[Dict]:
+        """Search arxiv papers, one page of results at a time."""
+        try:
+            return (await self._fetch_page(query, page)).materialize()
         except Exception as e:
             logger.error(f"arXiv search error: {str(e)}")
             return []
 
+    async def _rank_results(self, results: List[Dict], query: str) -> List[Dict]:
+        """Re-rank a page by semantic similarity when enabled; arXiv's order is kept on failure."""
+        if not self.rerank or not results:
+            return results
+        try:
+            ranked = await self.ranker.rank(query, results)
+        except Exception as e:
+            logger.error(f"Re-ranking error: {str(e)}")
+            return results
+        if len(ranked) < len(results):
+            console.print(f"[dim]Collapsed {len(results) - len(ranked)} near-duplicate papers[/dim]")
+        return ranked
+
+    def _reset_view(self, query: str) -> None:
+        self.result_index = ResultIndex(query)
+        self.filter_category = None
+        self.sort_by = None
+        self.sort_descending = True
+
+    def _current_view(self) -> List[Dict]:
+        return self.result_index.view(self.filter_category, self.sort_by, self.sort_descending)
+
+    def _open_pager(self, query: str) -> ResultPager:
+        """Start browsing a new query, abandoning the previous one."""
+        if self.pager:
+            self.pager.close()
+        self._reset_view(query)
+        self.pager = ResultPager(
+            lambda page: self._fetch_page(query, page),
+            self.results_per_page,
+            self.max_cached_pages
+        )
+        return self.pager
+
     async def search(self):
         try:
             console.clear()
             console.print(Panel(
                 "arXiv Search Interface - Commands:\n" +
                 "/exit - Return to main menu\n" +
-                "/export [format] - Export results (txt/md/json)\n" +
-                "/filter [category] - Filter by category\n" +
-                "/sort [criterion] - Sort results\n" + 
+                "/export [format] - Export results (txt/md/json/jsonl, add .gz to compress)\n" +
+                "/next, /prev - Browse result pages\n" +
+                "/pdf <numbers...|all> - Fetch PDFs for deeper analysis\n" +
+                "/local <query> - Search previously seen papers offline\n" +
+                "/filter [category] - Filter loaded results by category (e.g. cs.LG or cs)\n" +
+                "/sort [date|authors|relevance] [asc|desc] - Sort loaded results\n" + 
                 "/help - Show this help message",
                 title="arXiv Search Commands",
                 style="bold blue"
@@ -128,61 +288,12 @@ class ArxivSearch:
                     
                     self.current_query = query
                     
-                    # Search papers
+                    # Search papers; later pages are browsed with /next and /prev
                     with console.status("[bold green]Searching arXiv...[/bold green]"):
-                        results = await self._search_arxiv(query)
+                        results = await self._rank_results(await self._open_pager(query).get(0), query)
+                    self.result_index.add(results)
                     
-                    if results:
-                        self.current_results = results
-                        
-                        # Display results list
-                        console.print("\n[bold cyan]Search Results:[/bold cyan]")
-                        for i, result in enumerate(results, 1):
-                            console.print(f"[{i}] {result['title']}")
-                        
-                        # Ask for paper selection
-                        if len(results) > 0:
-                            selection = Prompt.ask(
-                                "\nSelect a paper to view details (1-{})".format(len(results)),
-                                default="1"
-                            )
-                            try:
-                                idx = int(selection) - 1
-                                if 0 <= idx < len(results):
-                                    selected = results[idx]
-                                    # Display detailed view of selected paper
-                                    console.print(Panel(
-                                        f"[bold]{selected['title']}[/bold]\n\n" +
-                                        f"Authors: {', '.join(selected['authors'])}\n" +
-                                        f"Published: {selected['published']}\n" +
-                                        f"Categories: {', '.join(selected['categories'])}\n" +
-                                        f"URL: [blue]{selected['url']}[/blue]\n" +
-                                        f"PDF: [blue]{selected['pdf_url']}[/blue]\n\n" +
-                                        f"Abstract:\n{selected['abstract']}",
-                                        title=f"Paper Details [{selection}/{len(results)}]",
-                                        style="green"
-                                    ))
-                                else:
-                                    console.print("[red]Invalid selection[/red]")
-                            except ValueError:
-                                console.print("[red]Invalid input[/red]")
-                        
-                        # Optional AI analysis
-                        if Prompt.ask(
-                            "\nWould you like an AI analysis of these papers?",
-                            choices=["y", "n"],
-                            default="n"
-                        ) == "y":
-                            with console.status("[bold green]Analyzing papers...[/bold green]"):
-                                analysis = await self._analyze_papers(results, query)
-                            
-                            console.print(Panel("AI Analysis:", style="cyan"))
-                            console.print(Panel(
-                                Markdown(analysis),
-                                style="green"
-                            ))
-                    else:
-                        console.print("[yellow]No papers found.[/yellow]")
+                    await self._present_results(results, query)
                     
                 except KeyboardInterrupt:
                     raise
@@ -191,6 +302,90 @@ class ArxivSearch:
                     await asyncio.sleep(1)
         except KeyboardInterrupt:
             console.print("\nExiting arXiv search...", style="bold yellow")
+        finally:
+            if self.pager:
+                self.pager.close()
+
+    async def _present_results(self, results: List[Dict], query: str) -> None:
+        """Show results, let the user open one and offer an AI analysis."""
+        if results:
+            self.current_results = results
+            
+            # Display results list
+            page = f" (page {self.pager.page + 1})" if self.pager else ""
+            console.print(f"\n[bold cyan]Search Results{page}:[/bold cyan]")
+            for i, result in enumerate(results, 1):
+                console.print(f"[{i}] {result['title']}")
+            
+            # Ask for paper selection
+            if len(results) > 0:
+                selection = Prompt.ask(
+                    "\nSelect a paper to view details (1-{})".format(len(results)),
+                    default="1"
+                )
+                try:
+                    idx = int(selection) - 1
+                    if 0 <= idx < len(results):
+                        selected = results[idx]
+                        # Display detailed view of selected paper
+                        console.print(Panel(
+                            f"[bold]{selected['title']}[/bold]\n\n" +
+                            f"Authors: {', '.join(selected['authors'])}\n" +
+                            f"Published: {selected['published']}\n" +
+                            f"Categories: {', '.join(selected['categories'])}\n" +
+                            f"URL: [blue]{selected['url']}[/blue]\n" +
+                            f"PDF: [blue]{selected['pdf_url']}[/blue]\n\n" +
+                            f"Abstract:\n{selected['abstract']}",
+                            title=f"Paper Details [{selection}/{len(results)}]",
+                            style="green"
+                        ))
+                    else:
+                        console.print("[red]Invalid selection[/red]")
+                except ValueError:
+                    console.print("[red]Invalid input[/red]")
+            
+            # Optional AI analysis
+            if Prompt.ask(
+                "\nWould you like an AI analysis of these papers?",
+                choices=["y", "n"],
+                default="n"
+            ) == "y":
+                with console.status("[bold green]Analyzing papers...[/bold green]"):
+                    analysis = await self._analyze_papers(results, query)
+                
+                console.print(Panel("AI Analysis:", style="cyan"))
+                console.print(Panel(
+                    Markdown(analysis),
+                    style="green"
+                ))
+        else:
+            console.print("[yellow]No papers found.[/yellow]")
+
+    def _select_papers(self, selection: List[str]) -> List[Dict]:
+        """Papers of the current results picked by 1-based numbers, or all of them."""
+        if selection == ["all"]:
+            return list(self.current_results)
+        picked = []
+        for item in selection:
+            if item.isdigit() and 1 <= int(item) <= len(self.current_results):
+                picked.append(self.current_results[int(item) - 1])
+        return picked
+
+    def _start_pdf_fetch(self, papers: List[Dict]) -> asyncio.Task:
+        """Download and extract PDFs in the background while the user keeps browsing."""
+        def report(task: asyncio.Task) -> None:
+            if task.cancelled():
+                return
+            if task.exception():
+                console.print(f"[red]PDF fetch failed: {str(task.exception())}[/red]")
+                return
+            outcomes = task.result()
+            console.print(f"\n[green]PDF text ready for {sum(outcomes.values())}/{len(outcomes)} papers[/green]")
+
+        console.print(f"[cyan]Fetching {len(papers)} PDFs in the background...[/cyan]")
+        self._pdf_task = asyncio.ensure_future(self.pdfs.fetch_many(papers))
+        self._pdf_task.add_done_callback(report)
+        return self._pdf_task
 
     async def _get_user_input(self) -> str:
         """Get user input with proper formatting."""
@@ -211,22 +406,95 @@ class ArxivSearch:
                     return True
                 
                 export_format = "md"
-                if len(cmd_parts) > 1 and cmd_parts[1] in ["txt", "md", "json"]:
-                    export_format = cmd_parts[1]
+                compress = False
+                if len(cmd_parts) > 1:
+                    compress = cmd_parts[1].endswith(".gz")
+                    requested = cmd_parts[1][:-3] if compress else cmd_parts[1]
+                    if requested in EXPORT_FORMATS:
+                        export_format = requested
                 
-                filename = self.export_manager.export_search_results(
+                filename = await self.export_manager.export_search_results_async(
                     self.current_results,
                     "arxiv",
                     self.current_query,
-                    export_format
+                    export_format,
+                    compress
                 )
                 console.print(f"[green]Results exported to: {filename}[/green]")
             
+            elif cmd in ("/next", "/prev"):
+                if not self.pager:
+                    console.print("[yellow]Search for something first[/yellow]")
+                    return True
+                if cmd == "/next" and not self.pager.has_next:
+                    console.print("[yellow]No more results[/yellow]")
+                    return True
+                if cmd == "/prev" and not self.pager.has_prev:
+                    console.print("[yellow]Already on the first page[/yellow]")
+                    return True
+                with console.status("[bold green]Loading page...[/bold green]"):
+                    results = await (self.pager.next() if cmd == "/next" else self.pager.prev())
+                results = await self._rank_results(results, self.current_query)
+                self.result_index.add(results)
+                await self._present_results(results, self.current_query)
+            
+            elif cmd == "/pdf":
+                papers = self._select_papers(cmd_parts[1:])
+                if not papers:
+                    console.print("[yellow]Usage: /pdf <result numbers...|all> after a search[/yellow]")
+                    return True
+                self._start_pdf_fetch(papers)
+            
+            elif cmd == "/local":
+                query = command[len(cmd_parts[0]):].strip()
+                if not query:
+                    console.print("[yellow]Usage: /local <query>[/yellow]")
+                    return True
+                self.current_query = query
+                if self.pager:
+                    self.pager.close()
+                    self.pager = None
+                results = await self._rank_results(self.store.search_local(query, self.results_per_page), query)
+                self._reset_view(query)
+                self.result_index.add(results)
+                await self._present_results(results, query)
+            
+            elif cmd == "/filter":
+                if not len(self.result_index):
+                    console.print("[yellow]Search for something first[/yellow]")
+                    return True
+                if len(cmd_parts) < 2:
+                    self.filter_category = None
+                    counts = ", ".join(f"{name} ({count})" for name, count in self.result_index.categories().items())
+                    console.print(f"[cyan]Filter cleared. Categories in loaded results: {counts}[/cyan]")
+                else:
+                    self.filter_category = cmd_parts[1]
+                await self._present_results(self._current_view(), self.current_query)
+            
+            elif cmd == "/sort":
+                if not len(self.result_index):
+                    console.print("[yellow]Search for something first[/yellow]")
+                    return True
+                if len(cmd_parts) < 2:
+                    self.sort_by = None
+                elif cmd_parts[1] in SORT_CRITERIA:
+                    self.sort_by = cmd_parts[1]
+                    self.sort_descending = not (len(cmd_parts) > 2 and cmd_parts[2] == "asc")
+                else:
+                    console.print(f"[yellow]Sort by one of: {', '.join(SORT_CRITERIA)} [asc|desc][/yellow]")
+                    return True
+                await self._present_results(self._current_view(), self.current_query)
+            
             elif cmd == "/help":
                 console.print(Panel(
                     "Available Commands:\n" +
                     "/exit - Return to main menu\n" +
-                    "/export [format] - Export results (txt/md/json)\n" +
+                    "/export [format] - Export results (txt/md/json/jsonl, add .gz to compress)\n" +
+                    "/next, /prev - Browse result pages\n" +
+                    "/pdf <numbers...|all> - Fetch PDFs for deeper analysis\n" +
+                    "/local <query> - Search previously seen papers offline\n" +
+                    "/filter [category] - Filter loaded results by category (e.g. cs.LG or cs)\n" +
+                    "/sort [date|authors|relevance] [asc|desc] - Sort loaded results\n" +
                     "/help - Show this help message",
                     title="arXiv Search Commands",
                     style="bold blue"
@@ -244,6 +512,68 @@ class ArxivSearch:
 
     async def _analyze_papers(self, papers: List[Dict], query: str) -> str:
         """Analyze papers using AI."""
+        if self.analysis_mode == "crew":
+            return await self._analyze_papers_crew(papers, query)
+        return await self._analyze_papers_mapreduce(papers, query)
+
+    async def _analyze_papers_mapreduce(self, papers: List[Dict], query: str) -> str:
+        """Summarize each paper concurrently (cached by entry_id), then merge the summaries."""
+        provider = self.ai_manager.default_provider
+        model = f"{provider}:{self.ai_manager.get_default_model(provider)}"
+        fulltext_model = f"{model}:fulltext"
+        # A /pdf extraction still running in the background would give a partial text, cached for good
+        texts = {
+            paper['url']: self.pdfs.get_text(paper['url'], self.fulltext_chars)
+            if self.pdfs.is_extracted(paper['url']) else ""
+            for paper in papers
+        }
+        cached = self.store.get_summaries([url for url, text in texts.items() if not text], model)
+        cached.update(self.store.get_summaries([url for url, text in texts.items() if text], fulltext_model))
+        semaphore = asyncio.Semaphore(self.analysis_concurrency)
+
+        async def summarize(paper: Dict) -> str:
+            if paper['url'] in cached:
+                return cached[paper['url']]
+            text = texts[paper['url']]
+            prompt = (PAPER_FULLTEXT_PROMPT if text else PAPER_SUMMARY_PROMPT).format(
+                title=paper['title'],
+                authors=', '.join(paper['authors']),
+                abstract=paper['abstract'],
+                text=text
+            )
+            try:
+                async with semaphore:
+                    summary, answered_by = await self.ai_manager.get_chat_response_with_provider(
+                        [{"role": "user", "content": prompt}]
+                    )
+            except Exception as e:
+                # One failed paper should not sink the analysis; fall back to its abstract
+                logger.error(f"Error summarizing {paper['url']}: {str(e)}")
+                return paper['abstract']
+            # A fallback provider's summary is not stored under the default model's key
+            if answered_by == provider:
+                self.store.set_summary(paper['url'], fulltext_model if text else model, summary)
+            return summary
+
+        summaries = await asyncio.gather(*(summarize(paper) for paper in papers))
+        sections = [f"### {paper['title']}\n{summary}" for paper, summary in zip(papers, summaries)]
+
+        # Merge in groups until everything fits in a single reduce prompt
+        while len(sections) > self.reduce_batch:
+            groups = [sections[i:i + self.reduce_batch] for i in range(0, len(sections), self.reduce_batch)]
+            merged = await asyncio.gather(*(self._reduce(group, query, semaphore) for group in groups))
+            sections = [f"### Paper group {i}\n{analysis}" for i, analysis in enumerate(merged, 1)]
+        return await self._reduce(sections, query, semaphore)
+
+    async def _reduce(self, sections: List[str], query: str, semaphore: asyncio.Semaphore) -> str:
+        prompt = REDUCE_PROMPT.format(query=query, summaries="\n\n".join(sections))
+        async with semaphore:
+            return await self.ai_manager.get_chat_response([{"role": "user", "content": prompt}])
+
+    async def _analyze_papers_crew(self, papers: List[Dict], query: str) -> str:
+        """Analyze all papers in one crewai task."""
+        from crewai import Agent, Task, Crew, Process
+        
         # Create a simple researcher agent
         researcher = Agent(
             role='Research Specialist',
@@ -0,0 +1,148 @@
+from rich.console import Console
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Any, Set
+
+from models.ai_manager import AIManager
+from utils.logger import setup_logger
+
+console = Console()
+logger = setup_logger()
+
+class BatchRunner:
+    """Runs prompts from a JSONL file concurrently and streams results to a JSONL file.
+
+    Each input line is a JSON object with an "id" and a "type":
+      chat:  {"id": "1", "type": "chat", "prompt": "..."} or "messages": [...]
+      code:  {"id": "2", "type": "code", "prompt": "..."}
+      arxiv: {"id": "3", "type": "arxiv", "query": "...", "analyze": true}
+    An optional "provider" overrides the default AI provider.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.ai_manager = AIManager(config)
+        self.concurrency = int(config.get("Batch", "concurrency", fallback="4"))
+        self.max_in_flight = int(config.get("Batch", "max_in_flight", fallback="64"))
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._arxiv = None
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Get the concurrency limit for a provider ([Batch] concurrency.<provider> or concurrency)."""
+        if provider not in self._semaphores:
+            limit = int(self.config.get("Batch", f"concurrency.{provider}", fallback=str(self.concurrency)))
+            self._semaphores[provider] = asyncio.Semaphore(limit)
+        return self._semaphores[provider]
+
+    def _get_arxiv(self):
+        if self._arxiv is None:
+            from features.arxiv_search import ArxivSearch
+            self._arxiv = ArxivSearch(self.config, self.ai_manager)
+        return self._arxiv
+
+    def load_completed_ids(self, output_path: str) -> Set[str]:
+        """IDs with a successful result in an existing output file; failed requests are retried."""
+        completed = set()
+        if not os.path.exists(output_path):
+            return completed
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a truncated last line
+                    continue
+                if record.get("status") == "ok":
+                    completed.add(str(record.get("id")))
+        return completed
+
+    def _ends_with_newline(self, path: str) -> bool:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    async def run(self, input_path: str, output_path: str) -> Dict[str, int]:
+        """Run all pending requests, appending each result as soon as it completes."""
+        completed = self.load_completed_ids(output_path)
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        counts = {"ok": 0, "error": 0, "skipped": 0}
+        tasks = set()
+
+        with open(output_path, 'a', encoding='utf-8') as out:
+            # Terminate a line left half-written by a crash so new records start cleanly
+            if out.tell() > 0 and not self._ends_with_newline(output_path):
+                out.write("\n")
+
+            def write_result(task: asyncio.Task) -> None:
+                record = task.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                counts[record["status"]] += 1
+                in_flight.release()
+
+            with open(input_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        request = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Skipping invalid batch line {line_number}: {str(e)}")
+                        continue
+
+                    request_id = str(request.get("id", line_number))
+                    if request_id in completed:
+                        counts["skipped"] += 1
+                        continue
+
+                    await in_flight.acquire()
+                    task = asyncio.ensure_future(self._run_request(request_id, request))
+                    task.add_done_callback(write_result)
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            while tasks:
+                await asyncio.wait(set(tasks))
+
+        console.print(
+            f"[green]Batch finished: {counts['ok']} ok, {counts['error']} failed, "
+            f"{counts['skipped']} already done[/green]"
+        )
+        return counts
+
+    async def _run_request(self, request_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request and build its output record; errors are recorded, not raised."""
+        request_type = request.get("type", "chat")
+        provider = request.get("provider") or self.ai_manager.default_provider
+        start = time.monotonic()
+        record = {"id": request_id, "type": request_type, "provider": provider}
+
+        try:
+            async with self._get_semaphore(provider if request_type != "arxiv" else "arxiv"):
+                record["result"] = await self._dispatch(request_type, request, provider)
+            record["status"] = "ok"
+        except Exception as e:
+            logger.error(f"Batch request {request_id} failed: {str(e)}")
+            record["status"] = "error"
+            record["error"] = str(e)
+
+        record["elapsed"] = round(time.monotonic() - start, 3)
+        return record
+
+    async def _dispatch(self, request_type: str, request: Dict[str, Any], provider: str) -> Any:
+        if request_type == "chat":
+            messages = request.get("messages") or [{"role": "user", "content": request["prompt"]}]
+            return await self.ai_manager.get_chat_response(messages, provider)
+        elif request_type == "code":
+            return await self.ai_manager.generate_code(request["prompt"], provider)
+        elif request_type == "arxiv":
+            arxiv_search = self._get_arxiv()
+            papers = await arxiv_search._search_arxiv(request["query"])
+            result = {"papers": papers}
+            if request.get("analyze") and papers:
+                result["analysis"] = str(await arxiv_search._analyze_papers(papers, request["query"]))
+            return result
+        else:
+            raise ValueError(f"Unknown batch request type: {request_type}")
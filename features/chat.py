@@ -3,25 +3,43 @@ from rich.prompt import Prompt
 from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.table import Table
+from rich.live import Live
+from rich.markup import escape
 import asyncio
-from typing import Optional
+import time
+from datetime import datetime
+from typing import Optional, List, Dict
 import os
 
 from models.ai_manager import AIManager
+from models.context_budget import ContextBudget
 from utils.logger import setup_logger
 from utils.session_manager import SessionManager
-from utils.export_manager import ExportManager
+from utils.session_journal import SessionJournal
+from utils.session_format import SESSION_EXTENSIONS, session_name
+from utils.search_index import SearchIndex, MATCH_START, MATCH_END
+from utils.export_manager import ExportManager, EXPORT_FORMATS
 
 console = Console()
 logger = setup_logger()
 
+# Live panel refreshes per second while a response is streaming
+RENDER_RATE = 12
+
 class ChatInterface:
     def __init__(self, config):
         self.config = config
         self.ai_manager = AIManager(config)
+        self.context_budget = ContextBudget(config, summarizer=self.ai_manager.get_chat_response)
         self.conversation_history = []
-        self.session_manager = SessionManager()
-        self.export_manager = ExportManager()
+        self.search_index = SearchIndex()
+        self.session_manager = SessionManager(
+            search_index=self.search_index,
+            compression=config.get("Sessions", "compression", fallback="json")
+        )
+        self.export_manager = ExportManager(search_index=self.search_index)
+        self._search_synced = False
+        self.journal: Optional[SessionJournal] = None
 
     async def start_chat(self):
         """Start an interactive chat session with the AI."""
@@ -32,14 +50,19 @@ class ChatInterface:
                 "/exit - Return to main menu\n" +
                 "/save [name] - Save current session\n" +
                 "/load - Load a previous session\n" +
-                "/list - List available sessions\n" +
-                "/export [format] - Export current session (txt/md/json)\n" +
+                "/list [page] - List available sessions\n" +
+                "/reindex - Rebuild the session and search indexes\n" +
+                "/search <query> - Search saved sessions and exports\n" +
+                "/migrate <json|gzip|zstd> - Convert saved sessions to another format\n" +
+                "/export [format] - Export current session (txt/md/json/jsonl, add .gz to compress)\n" +
                 "/clear - Clear current session\n" +
                 "/help - Show this help message",
                 title="Chat Commands",
                 style="bold blue"
             ))
             
+            self._recover_journal()
+            
             while True:
                 try:
                     user_input = await self._get_user_input()
@@ -50,20 +73,24 @@ class ChatInterface:
                         break
                     
                     # Add user message to history
-                    self.conversation_history.append({"role": "user", "content": user_input})
+                    self._append_message({"role": "user", "content": user_input})
                     
-                    # Get AI response
-                    response = await self.ai_manager.get_chat_response(
-                        self.conversation_history
+                    # Trim history to the model's context window
+                    provider = self.ai_manager.default_provider
+                    messages = await self.context_budget.fit(
+                        self.conversation_history,
+                        provider,
+                        self.ai_manager.get_default_model(provider)
                     )
                     
+                    # Stream AI response into a live panel
+                    response = await self._stream_response(messages)
+
                     # Add AI response to history
-                    self.conversation_history.append({"role": "assistant", "content": response})
-                    
-                    # Display response
-                    md = Markdown(response)
-                    console.print(Panel(md, style="green", title="AI Response"))
-                    
+                    self._append_message({"role": "assistant", "content": response})
+                    if self.journal.should_compact():
+                        self.journal.compact(self.conversation_history)
+
                 except KeyboardInterrupt:
                     raise  # Re-raise to be caught by outer try
                 except Exception as e:
@@ -71,7 +98,102 @@ class ChatInterface:
                     await asyncio.sleep(1)
         except KeyboardInterrupt:
             console.print("\nExiting chat...", style="bold yellow")
+        finally:
+            self._close_journal()
+    
+    def _start_journal(self, session_id: Optional[str] = None) -> None:
+        """Journal the current conversation under a session id (a new autosave name by default)."""
+        if session_id is None:
+            session_id = datetime.now().strftime("autosave_%Y%m%d_%H%M%S_%f")
+        self.journal = SessionJournal.from_config(self.config, self.session_manager, session_id)
+    
+    def _append_message(self, message: Dict[str, str]) -> None:
+        """Add a message to the history and write it to the session journal."""
+        if self.journal is None:
+            self._start_journal()
+        self.journal.append(message, len(self.conversation_history))
+        self.conversation_history.append(message)
+    
+    def _close_journal(self) -> None:
+        """Compact the journal into its session snapshot and stop journaling."""
+        if self.journal is None:
+            return
+        try:
+            filename = self.journal.close(self.conversation_history)
+            if filename:
+                console.print(f"[green]Session autosaved as: {filename}[/green]")
+        except Exception as e:
+            console.print(f"[red]Error autosaving session: {str(e)}[/red]")
+        self.journal = None
+    
+    def _recover_journal(self) -> None:
+        """Offer to restore a session left unsaved by a crash; declined ones are still kept as snapshots."""
+        for session_id in SessionJournal.pending(self.session_manager.sessions_dir):
+            journal = SessionJournal.from_config(self.config, self.session_manager, session_id)
+            conversation = journal.recover()
+            if self.journal is None and conversation and Prompt.ask(
+                f"Recover unsaved session {session_id} ({len(conversation)} messages)?",
+                choices=["y", "n"]
+            ) == "y":
+                self.conversation_history = conversation
+                self.journal = journal
+                console.print("[green]Session recovered![/green]")
+            else:
+                journal.close(conversation)
     
+    def _sync_search_index(self) -> int:
+        """Pick up session and export files changed outside the chat."""
+        count = self.search_index.sync({
+            "sessions": self.session_manager.sessions_dir,
+            "exports": os.path.join(self.export_manager.export_dir, "conversations")
+        })
+        self._search_synced = True
+        return count
+    
+    def _display_search_results(self, query: str) -> None:
+        """Show ranked matches with highlighted snippets."""
+        if not self._search_synced:
+            self._sync_search_index()
+        results = self.search_index.search(query)
+        if not results:
+            console.print("[yellow]No matches found[/yellow]")
+            return
+        
+        table = Table(title=f"Search results for: {query}")
+        table.add_column("File", style="cyan")
+        table.add_column("Role", style="green")
+        table.add_column("Snippet")
+        for result in results:
+            snippet = escape(result["snippet"]).replace(MATCH_START, "[bold yellow]").replace(MATCH_END, "[/bold yellow]")
+            table.add_row(
+                f"{result['source']}/{os.path.basename(result['path'])}",
+                result["role"] or "-",
+                snippet
+            )
+        console.print(table)
+    
+    async def _stream_response(self, conversation: List[Dict[str, str]]) -> str:
+        """Render the AI response in a Live panel as chunks arrive and return the full text."""
+        chunks = []
+        last_render = 0.0
+
+        with Live(Panel(Markdown(""), style="green", title="AI Response"),
+                  console=console,
+                  refresh_per_second=RENDER_RATE) as live:
+            async for chunk in self.ai_manager.stream_chat_response(conversation):
+                chunks.append(chunk)
+
+                # Re-parsing markdown on every chunk is quadratic, so throttle renders
+                now = time.monotonic()
+                if now - last_render >= 1 / RENDER_RATE:
+                    live.update(Panel(Markdown("".join(chunks)), style="green", title="AI Response"))
+                    last_render = now
+
+            response = "".join(chunks)
+            live.update(Panel(Markdown(response), style="green", title="AI Response"))
+
+        return response
+
     async def _get_user_input(self) -> str:
         """Get user input with proper formatting."""
         return Prompt.ask("[bold blue]You[/bold blue]")
@@ -88,12 +210,23 @@ class ChatInterface:
             elif cmd == "/save":
                 name = cmd_parts[1] if len(cmd_parts) > 1 else None
                 filename = self.session_manager.save_session(self.conversation_history, name)
+                # Further turns are journaled into the saved session instead of a separate autosave
+                if self.journal is not None and self.journal.session_id.startswith("autosave_"):
+                    self.journal.discard()
+                    self.journal = None
+                else:
+                    self._close_journal()
+                self._start_journal(session_name(filename))
                 console.print(f"[green]Session saved as: {filename}[/green]")
             
             elif cmd == "/load":
                 self.session_manager.display_sessions()
                 filename = Prompt.ask("Enter session filename to load")
-                self.conversation_history = self.session_manager.load_session(filename)
+                conversation = self.session_manager.load_session(filename)
+                self._close_journal()
+                self.conversation_history = conversation
+                # Further turns are journaled and compacted back into the loaded session
+                self._start_journal(session_name(filename))
                 console.print("[green]Session loaded successfully![/green]")
                 
                 # Display last few messages for context
@@ -106,7 +239,27 @@ class ChatInterface:
                     console.print()
             
             elif cmd == "/list":
-                self.session_manager.display_sessions()
+                page = int(cmd_parts[1]) if len(cmd_parts) > 1 and cmd_parts[1].isdigit() else 1
+                self.session_manager.display_sessions(page)
+            
+            elif cmd == "/reindex":
+                count = self.session_manager.rebuild_index()
+                documents = self._sync_search_index()
+                console.print(f"[green]Session index rebuilt: {count} sessions, {documents} searchable files[/green]")
+            
+            elif cmd == "/search":
+                query = command[len(cmd_parts[0]):].strip()
+                if not query:
+                    console.print("[yellow]Usage: /search <query>[/yellow]")
+                    return True
+                self._display_search_results(query)
+            
+            elif cmd == "/migrate":
+                if len(cmd_parts) < 2 or cmd_parts[1] not in SESSION_EXTENSIONS:
+                    console.print("[yellow]Usage: /migrate <json|gzip|zstd>[/yellow]")
+                    return True
+                count = self.session_manager.migrate_sessions(cmd_parts[1])
+                console.print(f"[green]Converted {count} sessions to {self.session_manager.compression}[/green]")
             
             elif cmd == "/export":
                 if not self.conversation_history:
@@ -114,19 +267,26 @@ class ChatInterface:
                     return True
                 
                 export_format = "md"
-                if len(cmd_parts) > 1 and cmd_parts[1] in ["txt", "md", "json"]:
-                    export_format = cmd_parts[1]
+                compress = False
+                if len(cmd_parts) > 1:
+                    # "json.gz" and friends write a gzip-compressed export
+                    compress = cmd_parts[1].endswith(".gz")
+                    requested = cmd_parts[1][:-3] if compress else cmd_parts[1]
+                    if requested in EXPORT_FORMATS:
+                        export_format = requested
                 
-                # Use the new ExportManager for better formatted exports
-                filename = self.export_manager.export_conversation(
+                # Stream the export from a worker thread so big sessions don't block the loop
+                filename = await self.export_manager.export_conversation_async(
                     self.conversation_history,
                     export_format=export_format,
-                    name="chat"
+                    name="chat",
+                    compress=compress
                 )
                 console.print(f"[green]Session exported to: {filename}[/green]")
             
             elif cmd == "/clear":
                 if Prompt.ask("Are you sure you want to clear the current session?", choices=["y", "n"]) == "y":
+                    self._close_journal()
                     self.conversation_history = []
                     console.print("[green]Session cleared![/green]")
             
@@ -136,8 +296,11 @@ class ChatInterface:
                     "/exit - Return to main menu\n" +
                     "/save [name] - Save current session\n" +
                     "/load - Load a previous session\n" +
-                    "/list - List available sessions\n" +
-                    "/export [format] - Export current session (txt/md/json)\n" +
+                    "/list [page] - List available sessions\n" +
+                    "/reindex - Rebuild the session and search indexes\n" +
+                    "/search <query> - Search saved sessions and exports\n" +
+                    "/migrate <json|gzip|zstd> - Convert saved sessions to another format\n" +
+                    "/export [format] - Export current session (txt/md/json/jsonl, add .gz to compress)\n" +
                     "/clear - Clear current session\n" +
                     "/help - Show this help message",
                     title="Chat Commands",
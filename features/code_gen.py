@@ -1,19 +1,27 @@
 from rich.console import Console
-from rich.prompt import Prompt
+from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.progress import Progress
 from rich.table import Table
 from rich import box
 import asyncio
-from typing import Optional, Dict, List
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Set, Callable, AsyncIterator
 import os
 import json
 from datetime import datetime
 import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
 
+from models.gemini_client import configure_gemini, response_text
 from utils.logger import setup_logger
+from utils.project_stream import ProjectStreamParser, ProjectWriter
+from features.code_review import CodeReviewer
+from features.code_history import ChatHistoryWindow
+from utils.project_manifest import ProjectManifest
+from utils.unified_diff import apply_patch, PatchError
+from features.project_tests import ProjectVerifier, failure_report
 
 console = Console()
 logger = setup_logger()
@@ -26,7 +34,7 @@ class CodeGenerator:
             self.model_name = config.get("Gemini", "default_model", fallback="gemini-exp-1121")
             
             # Configure Gemini
-            genai.configure(api_key=self.gemini_key)
+            configure_gemini(self.gemini_key)
             
             # Set generation config
             self.generation_config = GenerationConfig(
@@ -42,8 +50,28 @@ class CodeGenerator:
                 generation_config=self.generation_config
             )
             
-            # Start a chat
-            self.chat = self.model.start_chat(history=[])
+            # One chat per project ("project") or one for the whole session ("session"),
+            # each resending only a bounded window of its history
+            self.history_scope = config.get("CodeGen", "history_scope", fallback="project")
+            self.max_chats = int(config.get("CodeGen", "max_chats", fallback="8"))
+            self.chats: "OrderedDict[str, Any]" = OrderedDict()
+            self.history_window = ChatHistoryWindow.from_config(config, summarizer=self._summarize_history)
+            
+            # Threads writing generated files while the reply is still streaming
+            self.write_workers = int(config.get("CodeGen", "write_workers", fallback="4"))
+            
+            # Reviews run as stateless calls over chunks of the generated files
+            self.reviewer = CodeReviewer.from_config(config, self.model)
+            
+            # Token budget for file contents sent when improving an existing project
+            self.improve_context_tokens = int(config.get("CodeGen", "improve_context_tokens", fallback="24000"))
+            self.last_project_dir: Optional[str] = None
+            
+            # Generated tests can run in a cached venv after the files are written. This runs
+            # model-written code on this machine without a sandbox, so it is opt-in and confirmed
+            self.run_tests = config.get("CodeGen", "run_tests", fallback="false").lower() == "true"
+            self.test_fix_rounds = int(config.get("CodeGen", "test_fix_rounds", fallback="1"))
+            self.verifier = ProjectVerifier.from_config(config)
             
             logger.info(f"Successfully initialized Gemini model: {self.model_name}")
             
@@ -57,6 +85,7 @@ class CodeGenerator:
         console.print(Panel(
             "🚀 Code Generation Interface\n\n" +
             "I'll help you create and improve your project.\n" +
+            "Type '/improve <change>' to update an existing project\n" +
             "Type 'exit' to return to main menu",
             title="Code Generator",
             border_style="bright_blue"
@@ -70,10 +99,14 @@ class CodeGenerator:
                 if project_desc.lower() == "exit":
                     break
                 
+                # An explicit command, so descriptions starting with "improve" still create projects
+                command, _, change = project_desc.strip().partition(" ")
+                if command.lower() == "/improve":
+                    await self._improve_interactive(change.strip())
+                    continue
+                
                 # Create project directory
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                project_dir = f"generated_project_{timestamp}"
-                os.makedirs(project_dir, exist_ok=True)
+                project_dir = self._new_project_dir()
                 
                 with Progress() as progress:
                     task1 = progress.add_task("[cyan]Planning project structure...", total=100)
@@ -83,114 +116,50 @@ class CodeGenerator:
                     # Generate project structure
                     progress.update(task1, advance=50)
                     
-                    structure_prompt = f"""Create a complete Python project structure for: {project_desc}
-                    
-                    Requirements:
-                    1. Create all necessary files and directories
-                    2. Include proper documentation
-                    3. Follow Python best practices
-                    4. Include error handling
-                    5. Add unit tests
-                    6. Create requirements.txt
-                    7. Add a detailed README.md
-                    
-                    Format your response as a JSON object with this structure:
-                    {{
-                        "files": [
-                            {{
-                                "path": "relative/path/to/file",
-                                "content": "file content"
-                            }}
-                        ],
-                        "dependencies": ["package1", "package2"]
-                    }}
-                    
-                    Rules:
-                    1. Use forward slashes in paths
-                    2. Include complete file contents
-                    3. Add all necessary imports
-                    4. Follow PEP 8 style guide
-                    5. Add proper error handling
-                    6. Include docstrings and comments"""
+                    written = []
                     
-                    response = await self._get_gemini_response(structure_prompt)
-                    progress.update(task1, advance=50)
-                    progress.update(task2, advance=30)
+                    def on_file(path: str) -> None:
+                        # The plan is settled once the first file arrives
+                        if not written:
+                            progress.update(task1, completed=100)
+                        written.append(path)
+                        progress.update(
+                            task2,
+                            description=f"[green]Generating code... {len(written)} files written",
+                            completed=min(90, 30 + 5 * len(written))
+                        )
                     
                     try:
-                        # Clean and parse JSON response
-                        cleaned_response = response.replace("```json", "").replace("```", "").strip()
-                        start_idx = cleaned_response.find("{")
-                        end_idx = cleaned_response.rfind("}") + 1
-                        if start_idx == -1 or end_idx <= 0:
-                            raise ValueError("No valid JSON object found in response")
-                        cleaned_response = cleaned_response[start_idx:end_idx]
-                        
-                        # Parse project structure
-                        project_structure = json.loads(cleaned_response)
+                        created_files = await self._generate_project_files(project_desc, project_dir, on_file=on_file)
+                        self.last_project_dir = project_dir
+                        progress.update(task1, completed=100)
+                        progress.update(task2, completed=100)
+                        console.print(
+                            f"[dim]Chat history sent: {self.history_window.last['messages']} messages "
+                            f"(~{self.history_window.last['tokens']} tokens)[/dim]"
+                        )
                         
-                        # Validate project structure
-                        if not isinstance(project_structure, dict):
-                            raise ValueError("Invalid project structure format")
-                        if "files" not in project_structure:
-                            raise ValueError("No files specified in project structure")
-                        if not isinstance(project_structure["files"], list):
-                            raise ValueError("Files must be a list")
-                        
-                        # Create files
-                        created_files = []
-                        for file_info in project_structure.get("files", []):
-                            if not isinstance(file_info, dict) or "path" not in file_info or "content" not in file_info:
-                                logger.warning(f"Skipping invalid file info: {file_info}")
-                                continue
-                                
-                            file_path = os.path.join(project_dir, file_info["path"])
+                        if created_files and self.run_tests and self._confirm_test_run(progress):
+                            progress.update(task3, description="[yellow]Running tests...")
                             try:
-                                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                                with open(file_path, "w", encoding="utf-8") as f:
-                                    f.write(file_info["content"])
-                                created_files.append(file_info["path"])
+                                verification = await self.verify_project(project_dir)
                             except Exception as e:
-                                logger.error(f"Error creating file {file_path}: {str(e)}")
-                                raise
-                        
-                        progress.update(task2, advance=40)
-                        
-                        # Create requirements.txt
-                        if project_structure.get("dependencies"):
-                            if not isinstance(project_structure["dependencies"], list):
-                                raise ValueError("Dependencies must be a list")
-                                
-                            requirements_path = os.path.join(project_dir, "requirements.txt")
-                            try:
-                                with open(requirements_path, "w", encoding="utf-8") as f:
-                                    for dep in project_structure["dependencies"]:
-                                        if isinstance(dep, str):
-                                            f.write(f"{dep}\n")
-                                created_files.append("requirements.txt")
-                            except Exception as e:
-                                logger.error(f"Error creating requirements.txt: {str(e)}")
-                                raise
-                        
-                        progress.update(task2, advance=30)
+                                # A broken environment should not cost the user the project
+                                logger.error(f"Test run error: {str(e)}")
+                                console.print(f"[red]Tests could not run: {str(e)}[/red]")
+                                verification = None
+                            if verification:
+                                self._show_test_results(verification)
+                            if verification and verification["fix_rounds"]:
+                                # Review what the fixes left on disk
+                                manifest = ProjectManifest(project_dir)
+                                manifest.scan()
+                                created_files = {path: manifest.read(path) for path in manifest.files}
+                            progress.update(task3, description="[yellow]Reviewing and optimizing...")
                         
                         # Review code
                         if created_files:
-                            review_prompt = f"""Review the following Python project and suggest improvements:
-
-                            Project Description: {project_desc}
-
-                            Files:
-                            {chr(10).join(f'=== {path} ===\n{open(os.path.join(project_dir, path)).read()}\n' for path in created_files)}
-
-                            Provide specific suggestions for:
-                            1. Code quality
-                            2. Performance
-                            3. Security
-                            4. Best practices
-                            5. Error handling"""
-
-                            review_response = await self._get_gemini_response(review_prompt)
+                            review_response = await self.reviewer.review(project_desc, created_files)
                             progress.update(task3, advance=100)
                             
                             # Show success message and created files
@@ -222,21 +191,349 @@ class CodeGenerator:
                 console.print(f"[red]Error: {str(e)}[/red]")
                 await asyncio.sleep(1)
     
-    async def _get_gemini_response(self, prompt: str) -> str:
-        """Get response from Gemini model."""
+    async def create_project(self, project_desc: str, review: bool = True, verify: bool = False) -> Dict:
+        """Generate a project without prompting, for the batch and HTTP interfaces.
+        
+        Each call uses its own Gemini chat so concurrent projects do not share history.
+        With verify, the generated tests are run (and failures fixed) before the review;
+        they run unsandboxed on this machine (see ProjectVerifier).
+        """
+        chat = self.model.start_chat(history=[])
+        project_dir = self._new_project_dir()
+        
+        try:
+            created_files = await self._generate_project_files(project_desc, project_dir, chat)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON response: {str(e)}")
+        
+        if not created_files:
+            raise ValueError("No files were created")
+        
+        result = {"project_dir": project_dir, "files": list(created_files)}
+        if verify:
+            result["tests"] = await self.verify_project(project_dir)
+            if result["tests"]["fix_rounds"]:
+                manifest = ProjectManifest(project_dir)
+                manifest.scan()
+                created_files = {path: manifest.read(path) for path in manifest.files}
+        if review:
+            result["review"] = await self.reviewer.review(project_desc, created_files)
+        return result
+    
+    def _new_project_dir(self) -> str:
+        """Create a fresh generated_project_<timestamp> directory."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        project_dir = f"generated_project_{timestamp}"
+        os.makedirs(project_dir, exist_ok=True)
+        return project_dir
+    
+    def _build_structure_prompt(self, project_desc: str) -> str:
+        """Build the prompt asking for the project as a JSON file list."""
+        return f"""Create a complete Python project structure for: {project_desc}
+                    
+                    Requirements:
+                    1. Create all necessary files and directories
+                    2. Include proper documentation
+                    3. Follow Python best practices
+                    4. Include error handling
+                    5. Add unit tests
+                    6. Create requirements.txt
+                    7. Add a detailed README.md
+                    
+                    Format your response as a JSON object with this structure:
+                    {{
+                        "files": [
+                            {{
+                                "path": "relative/path/to/file",
+                                "content": "file content"
+                            }}
+                        ],
+                        "dependencies": ["package1", "package2"]
+                    }}
+                    
+                    Rules:
+                    1. Use forward slashes in paths
+                    2. Include complete file contents
+                    3. Add all necessary imports
+                    4. Follow PEP 8 style guide
+                    5. Add proper error handling
+                    6. Include docstrings and comments"""
+    
+    async def _generate_project_files(self,
+                                      project_desc: str,
+                                      project_dir: str,
+                                      chat=None,
+                                      on_file: Optional[Callable[[str], None]] = None) -> Dict[str, str]:
+        """Stream the project reply and write each file as soon as its entry is complete.
+        
+        Returns the created files as path -> content, including requirements.txt built from
+        the dependencies, so later steps need not read them back from disk.
+        """
+        chat = chat or self._chat_for(project_dir)
+        parser = ProjectStreamParser()
+        writer = ProjectWriter(project_dir, self.write_workers)
+        try:
+            async for text in self._stream_gemini_response(self._build_structure_prompt(project_desc), chat):
+                for file_info in parser.feed(text):
+                    if writer.submit(file_info) and on_file:
+                        on_file(file_info["path"])
+            project_structure = parser.close()
+            if not isinstance(project_structure, dict):
+                raise ValueError("Invalid project structure format")
+            writer.submit_dependencies(project_structure.get("dependencies"))
+        finally:
+            created_files = writer.finish()
+        return {path: writer.contents[path] for path in created_files}
+    
+    def _build_improve_prompt(self, request: str, manifest: ProjectManifest, relevant: Dict[str, str]) -> str:
+        """Build the prompt asking for only the changes a request needs, as patches."""
+        files_listing = "\n".join(
+            f"=== {path} (sha256:{manifest.files[path]['sha256'][:12]}) ===\n{content}\n"
+            for path, content in relevant.items()
+        )
+        edited = ", ".join(sorted(manifest.changed)) or "none"
+        return f"""Update this existing Python project.
+
+Change request: {request}
+
+Project manifest (path, size, content hash):
+{manifest.describe()}
+
+Files edited by the user since the last update: {edited}
+
+Current contents of the relevant files:
+{files_listing}
+
+Reply with a JSON object listing only the files that change:
+{{
+    "files": [
+        {{"path": "existing/file.py", "action": "patch", "diff": "unified diff against the contents above"}},
+        {{"path": "new/file.py", "action": "create", "content": "full file content"}},
+        {{"path": "obsolete/file.py", "action": "delete"}}
+    ],
+    "dependencies": ["only if requirements change: the complete new list"]
+}}
+
+Rules:
+1. Patches use unified diff hunks (@@ -start,count +start,count @@) with 3 lines of context
+2. Only patch files whose contents are shown above
+3. Leave every unchanged file out of the reply
+4. Use forward slashes in paths"""
+    
+    def _apply_change(self, writer: ProjectWriter, manifest: ProjectManifest, change: Any) -> Dict[str, str]:
+        """Apply one change entry; returns {"path", "status"} where status is the outcome or the error."""
+        if not isinstance(change, dict) or not isinstance(change.get("path"), str):
+            logger.warning(f"Skipping invalid change: {str(change)[:200]}")
+            return {"path": str(change)[:80], "status": "invalid"}
+        path = change["path"]
+        action = change.get("action") or ("patch" if "diff" in change else "create")
         try:
-            # Add safety check for model
-            if not hasattr(self, 'chat') or not self.chat:
-                self.chat = self.model.start_chat(history=[])
+            if action == "delete":
+                return {"path": path, "status": "deleted" if writer.delete(path) else "missing"}
+            if action == "patch":
+                target = writer.resolve(path)
+                if target is None:
+                    raise PatchError("path is outside the project")
+                writer.wait(path)
+                original = writer.contents.get(path)
+                if original is None:
+                    original = manifest.read(path)
+                change = {"path": path, "content": apply_patch(original, change.get("diff", ""))}
+            elif action not in ("create", "replace"):
+                raise PatchError(f"unknown action {action}")
+            if not writer.submit(change):
+                raise PatchError("invalid file entry")
+            return {"path": path, "status": "patched" if action == "patch" else "written"}
+        except (PatchError, OSError) as e:
+            logger.warning(f"Could not apply change to {path}: {str(e)}")
+            return {"path": path, "status": f"failed: {str(e)}"}
+    
+    async def _stream_changes(self,
+                              prompt: str,
+                              chat,
+                              writer: ProjectWriter,
+                              manifest: ProjectManifest) -> List[Dict[str, str]]:
+        """Stream a change reply and apply each entry as soon as it is complete."""
+        parser = ProjectStreamParser()
+        outcomes = []
+        async for text in self._stream_gemini_response(prompt, chat):
+            for change in parser.feed(text):
+                outcomes.append(self._apply_change(writer, manifest, change))
+        structure = parser.close()
+        if structure.get("dependencies"):
+            writer.submit_dependencies(structure["dependencies"])
+            outcomes.append({"path": "requirements.txt", "status": "written"})
+        return outcomes
+    
+    async def improve_project(self,
+                              project_dir: str,
+                              request: str,
+                              include: Optional[Set[str]] = None) -> Dict:
+        """Apply a change request to an existing project, sending only a manifest and the relevant files.
+        
+        The model answers with patches for the files it changes; patches that do not apply
+        are asked for once more as full file contents.
+        """
+        if not os.path.isdir(project_dir):
+            raise ValueError(f"Project directory not found: {project_dir}")
+        manifest = ProjectManifest(project_dir)
+        manifest.scan()
+        relevant = manifest.select_relevant(
+            request, self.improve_context_tokens, always=manifest.changed | set(include or ())
+        )
+        chat = self._chat_for(project_dir)
+        
+        writer = ProjectWriter(project_dir, self.write_workers)
+        try:
+            try:
+                outcomes = await self._stream_changes(
+                    self._build_improve_prompt(request, manifest, relevant), chat, writer, manifest
+                )
+                failed = [outcome for outcome in outcomes if outcome["status"].startswith("failed")]
+                if failed:
+                    retry_prompt = (
+                        "These changes could not be applied:\n" +
+                        "\n".join(f"- {outcome['path']}: {outcome['status']}" for outcome in failed) +
+                        "\n\nReply in the same JSON format with action \"replace\" and the complete new "
+                        "content for each of these files."
+                    )
+                    retried = await self._stream_changes(retry_prompt, chat, writer, manifest)
+                    retried_paths = {outcome["path"] for outcome in retried if not outcome["status"].startswith("failed")}
+                    outcomes = [
+                        outcome for outcome in outcomes
+                        if not (outcome["status"].startswith("failed") and outcome["path"] in retried_paths)
+                    ] + retried
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON response: {str(e)}")
+        finally:
+            writer.finish()
+        
+        # Record the new state so the next request only flags the user's own edits
+        manifest.scan()
+        return {
+            "project_dir": project_dir,
+            "changes": outcomes,
+            "files_sent": list(relevant),
+            "files_total": len(manifest.files)
+        }
+    
+    async def verify_project(self, project_dir: str) -> Dict:
+        """Run the project's tests; failing files get up to test_fix_rounds targeted fix requests.
+        
+        Only the failing test files are run again after each fix.
+        """
+        results = await self.verifier.run(project_dir)
+        by_path = {result["path"]: result for result in results}
+        rounds = 0
+        changes = []
+        while rounds < self.test_fix_rounds:
+            failing = [result for result in by_path.values() if result["status"] in ("failed", "timeout")]
+            if not failing:
+                break
+            rounds += 1
+            request = (
+                "Make the failing tests pass. Fix the code under test unless the test itself is wrong.\n\n"
+                f"Test output:\n{failure_report(failing)}"
+            )
+            try:
+                fix = await self.improve_project(project_dir, request, include={result["path"] for result in failing})
+            except Exception as e:
+                logger.error(f"Test fix round {rounds} failed: {str(e)}")
+                break
+            changes.extend(fix["changes"])
+            for result in await self.verifier.run(project_dir, [result["path"] for result in failing]):
+                by_path[result["path"]] = result
+        return {"results": list(by_path.values()), "fix_rounds": rounds, "changes": changes}
+    
+    def _confirm_test_run(self, progress: Progress) -> bool:
+        """Ask before running generated tests, which are not sandboxed."""
+        progress.stop()
+        try:
+            return Confirm.ask(
+                "[bold yellow]Run the generated tests? They execute model-written code on this machine "
+                "with your user's file and network access[/bold yellow]",
+                default=False
+            )
+        finally:
+            progress.start()
+    
+    def _show_test_results(self, verification: Dict) -> None:
+        table = Table(title="Tests", box=box.ROUNDED)
+        table.add_column("File", style="cyan")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        colors = {"passed": "green", "no tests": "yellow"}
+        for result in verification["results"]:
+            color = colors.get(result["status"], "red")
+            table.add_row(result["path"], f"[{color}]{result['status']}[/{color}]", f"{result['duration']:.1f}s")
+        console.print(table)
+        if verification["fix_rounds"]:
+            console.print(f"[dim]{verification['fix_rounds']} fix round(s), "
+                          f"{len(verification['changes'])} file change(s)[/dim]")
+    
+    async def _improve_interactive(self, request: str) -> None:
+        """Prompt for the project and change, then apply it and show what changed."""
+        project_dir = Prompt.ask("[bold blue]Project directory[/bold blue]", default=self.last_project_dir or "")
+        if not request:
+            request = Prompt.ask("[bold blue]What should change?[/bold blue]")
+        
+        with console.status("[bold green]Updating project...[/bold green]"):
+            result = await self.improve_project(project_dir, request)
+        self.last_project_dir = project_dir
+        
+        console.print(
+            f"[dim]Sent {len(result['files_sent'])} of {result['files_total']} files; chat history "
+            f"{self.history_window.last['messages']} messages (~{self.history_window.last['tokens']} tokens)[/dim]"
+        )
+        table = Table(title="Changes", box=box.ROUNDED)
+        table.add_column("File", style="cyan")
+        table.add_column("Status", style="green")
+        for outcome in result["changes"]:
+            table.add_row(outcome["path"], outcome["status"])
+        console.print(table)
+    
+    def _chat_for(self, project_dir: str):
+        """The chat of a project (or of the session), started on first use."""
+        key = "session" if self.history_scope == "session" else project_dir
+        chat = self.chats.get(key)
+        if chat is None:
+            chat = self.chats[key] = self.model.start_chat(history=[])
+            while len(self.chats) > self.max_chats:
+                self.chats.popitem(last=False)
+        self.chats.move_to_end(key)
+        return chat
+    
+    async def _fit_history(self, chat) -> None:
+        """Trim the chat's history to the configured window before the next request."""
+        history = [
+            {"role": content.role, "content": "".join(part.text for part in content.parts)}
+            for content in chat.history
+        ]
+        fitted = await self.history_window.fit(history)
+        chat.history = [{"role": message["role"], "parts": [message["content"]]} for message in fitted]
+    
+    async def _summarize_history(self, prompt: str) -> str:
+        """Stateless call used to summarize history that falls out of the window."""
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+    
+    async def _stream_gemini_response(self, prompt: str, chat) -> AsyncIterator[str]:
+        """Stream response text from Gemini within the given chat."""
+        try:
+            await self._fit_history(chat)
             
-            # Send message and get response
-            response = self.chat.send_message(prompt)
+            # The whole stream is consumed so the chat records the reply in its history
+            response = await chat.send_message_async(prompt, stream=True)
+            received = False
+            async for chunk in response:
+                text = response_text(chunk)
+                if text:
+                    received = True
+                    yield text
             
-            if not response or not response.text:
+            if not received:
                 raise ValueError("Empty response from Gemini")
                 
-            return response.text
-            
         except Exception as e:
             logger.error(f"Gemini API error: {str(e)}")
             raise
@@ -0,0 +1,116 @@
+import hashlib
+import json
+from typing import List, Dict, Optional, Callable, Awaitable
+
+from models.context_budget import CHARS_PER_TOKEN, MESSAGE_OVERHEAD
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+HISTORY_SUMMARY_PROMPT = """Summarize these earlier code generation requests and replies for one project.
+Keep file paths, design decisions, dependencies and open issues; leave out file contents.
+Reply with the summary only.
+
+{transcript}"""
+
+# Longest slice of each message passed to the summarizer; generated projects are mostly code
+SUMMARY_MESSAGE_CHARS = 4000
+
+class ChatHistoryWindow:
+    """Bounds the chat history CodeGenerator resends with every request.
+
+    Only the last `max_turns` request/reply exchanges are sent verbatim, and
+    fewer when they exceed `max_tokens`. Older exchanges are dropped or, with
+    summarization on, folded into one short summary exchange at the start.
+    Counters record how much history each call carried.
+    """
+
+    def __init__(self,
+                 max_turns: int = 2,
+                 max_tokens: int = 0,
+                 summarize: bool = False,
+                 summarizer: Optional[Callable[[str], Awaitable[str]]] = None):
+        self.max_turns = max(max_turns, 0)
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.summarizer = summarizer
+        self._summary_cache: Dict[str, str] = {}
+        self.calls = 0
+        self.messages_sent = 0
+        self.tokens_sent = 0
+        self.tokens_dropped = 0
+        self.last: Dict[str, int] = {"messages": 0, "tokens": 0, "dropped": 0}
+
+    @classmethod
+    def from_config(cls, config, summarizer=None) -> "ChatHistoryWindow":
+        return cls(
+            max_turns=int(config.get("CodeGen", "history_turns", fallback="2")),
+            max_tokens=int(config.get("CodeGen", "history_tokens", fallback="0")),
+            summarize=config.get("CodeGen", "summarize_history", fallback="false").lower() == "true",
+            summarizer=summarizer
+        )
+
+    @staticmethod
+    def count_tokens(message: Dict[str, str]) -> int:
+        return len(message["content"]) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD
+
+    async def fit(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """History to send with the next request, given the full {"role", "content"} history."""
+        # Exchanges are (request, reply) pairs; an unanswered trailing request is dropped
+        exchanges = [history[i:i + 2] for i in range(0, len(history) - 1, 2)]
+        kept = exchanges[len(exchanges) - self.max_turns:] if self.max_turns else []
+        if self.max_tokens:
+            used = 0
+            for start in range(len(kept) - 1, -1, -1):
+                used += sum(self.count_tokens(message) for message in kept[start])
+                if used > self.max_tokens:
+                    kept = kept[start + 1:]
+                    break
+        dropped = exchanges[:len(exchanges) - len(kept)]
+
+        messages = [message for exchange in kept for message in exchange]
+        if dropped and self.summarize and self.summarizer:
+            summary = await self._summarize([message for exchange in dropped for message in exchange])
+            if summary:
+                messages = [
+                    {"role": "user", "content": f"Summary of earlier requests for this project: {summary}"},
+                    {"role": "model", "content": "Understood."}
+                ] + messages
+
+        tokens = sum(self.count_tokens(message) for message in messages)
+        dropped_tokens = sum(self.count_tokens(message) for message in history) - tokens
+        self.calls += 1
+        self.messages_sent += len(messages)
+        self.tokens_sent += tokens
+        self.tokens_dropped += max(dropped_tokens, 0)
+        self.last = {"messages": len(messages), "tokens": tokens, "dropped": max(dropped_tokens, 0)}
+        logger.info(f"Code chat history: sending {len(messages)} messages (~{tokens} tokens), "
+                    f"dropped ~{max(dropped_tokens, 0)} tokens")
+        return messages
+
+    async def _summarize(self, dropped: List[Dict[str, str]]) -> Optional[str]:
+        """Cached summary of dropped messages; None when summarizing fails."""
+        key = hashlib.sha256(json.dumps(dropped, sort_keys=True).encode("utf-8")).hexdigest()
+        summary = self._summary_cache.get(key)
+        if summary is None:
+            transcript = "\n\n".join(
+                f"{message['role'].upper()}: {message['content'][:SUMMARY_MESSAGE_CHARS]}" for message in dropped
+            )
+            try:
+                summary = await self.summarizer(HISTORY_SUMMARY_PROMPT.format(transcript=transcript))
+            except Exception as e:
+                logger.error(f"Error summarizing code chat history: {str(e)}")
+                return None
+            self._summary_cache[key] = summary
+        return summary
+
+    def stats(self) -> Dict[str, int]:
+        """Totals over all calls plus the history size of the most recent one."""
+        return {
+            "calls": self.calls,
+            "messages_sent": self.messages_sent,
+            "tokens_sent": self.tokens_sent,
+            "tokens_dropped": self.tokens_dropped,
+            "last_messages": self.last["messages"],
+            "last_tokens": self.last["tokens"]
+        }
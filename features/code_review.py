@@ -0,0 +1,164 @@
+import asyncio
+from typing import List, Dict, Tuple, Optional
+
+from models.context_budget import CHARS_PER_TOKEN
+from models.rate_limiter import get_rate_limiter
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Review of one chunk of files; each call is stateless, so the prompt says everything needed
+CHUNK_REVIEW_PROMPT = """Review these files from a Python project and suggest improvements.
+
+Project Description: {project_desc}
+All files in the project: {manifest}
+
+Files in this part ({part} of {parts}):
+{files}
+
+Provide specific findings, naming the file for each, on:
+1. Code quality
+2. Performance
+3. Security
+4. Best practices
+5. Error handling"""
+
+# Merge of per-chunk findings (or of already merged groups)
+MERGE_REVIEW_PROMPT = """Combine these partial code reviews of one Python project into a single review.
+
+Project Description: {project_desc}
+
+Partial reviews:
+{reviews}
+
+Remove duplicate findings, keep the file names, and organize the result under:
+1. Code quality
+2. Performance
+3. Security
+4. Best practices
+5. Error handling"""
+
+class CodeReviewer:
+    """Reviews a generated project in token-bounded chunks of files, concurrently.
+
+    Every chunk is a separate stateless model call (no chat history), so the
+    review never carries the generation conversation and no single prompt
+    outgrows the model window. Chunk findings are then merged, hierarchically
+    when there are many of them.
+    """
+
+    def __init__(self,
+                 model,
+                 max_chunk_tokens: int = 6000,
+                 concurrency: int = 4,
+                 merge_batch: int = 8,
+                 limiter=None):
+        self.model = model
+        self.max_chunk_tokens = max_chunk_tokens
+        self.concurrency = concurrency
+        self.merge_batch = max(merge_batch, 2)
+        self.limiter = limiter
+
+    @classmethod
+    def from_config(cls, config, model) -> "CodeReviewer":
+        return cls(
+            model,
+            max_chunk_tokens=int(config.get("CodeGen", "review_chunk_tokens", fallback="6000")),
+            concurrency=int(config.get("CodeGen", "review_concurrency", fallback="4")),
+            merge_batch=int(config.get("CodeGen", "review_merge_batch", fallback="8")),
+            limiter=get_rate_limiter(config, "gemini")
+        )
+
+    def _sections(self, files: Dict[str, str]) -> List[Tuple[str, str]]:
+        """(label, text) per file; files over the chunk budget are split at line boundaries."""
+        sections = []
+        for path, content in files.items():
+            # Leave room for the label and per-section overhead counted by chunk_files
+            max_chars = max(self.max_chunk_tokens * CHARS_PER_TOKEN - len(path) - 64, CHARS_PER_TOKEN)
+            if len(content) <= max_chars:
+                sections.append((path, content))
+                continue
+            lines = content.splitlines(keepends=True)
+            start = 0
+            while start < len(lines):
+                end = start
+                size = 0
+                while end < len(lines) and (end == start or size + len(lines[end]) <= max_chars):
+                    size += len(lines[end])
+                    end += 1
+                sections.append((f"{path} (lines {start + 1}-{end})", "".join(lines[start:end])))
+                start = end
+        return sections
+
+    def chunk_files(self, files: Dict[str, str]) -> List[List[Tuple[str, str]]]:
+        """Pack files, in order, into chunks of at most max_chunk_tokens (estimated)."""
+        chunks = []
+        current = []
+        used = 0
+        for label, text in self._sections(files):
+            tokens = (len(label) + len(text)) // CHARS_PER_TOKEN + 8
+            if current and used + tokens > self.max_chunk_tokens:
+                chunks.append(current)
+                current = []
+                used = 0
+            current.append((label, text))
+            used += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _generate(self, prompt: str, semaphore: asyncio.Semaphore) -> str:
+        async with semaphore:
+            if self.limiter:
+                response = await self.limiter.run(
+                    lambda: self.model.generate_content_async(prompt),
+                    [{"role": "user", "content": prompt}]
+                )
+            else:
+                response = await self.model.generate_content_async(prompt)
+        if not response or not response.text:
+            raise ValueError("Empty response from Gemini")
+        return response.text
+
+    async def review(self, project_desc: str, files: Dict[str, str]) -> str:
+        """Review the given path -> content files and return one merged review."""
+        chunks = self.chunk_files(files)
+        if not chunks:
+            raise ValueError("No files to review")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        manifest = ", ".join(files)
+
+        async def review_chunk(part: int, chunk: List[Tuple[str, str]]) -> Optional[str]:
+            prompt = CHUNK_REVIEW_PROMPT.format(
+                project_desc=project_desc,
+                manifest=manifest,
+                part=part,
+                parts=len(chunks),
+                files="\n".join(f"=== {label} ===\n{text}\n" for label, text in chunk)
+            )
+            try:
+                return await self._generate(prompt, semaphore)
+            except Exception as e:
+                # One failed chunk should not sink the whole review
+                logger.error(f"Error reviewing chunk {part}/{len(chunks)}: {str(e)}")
+                return None
+
+        reviews = await asyncio.gather(*(review_chunk(i, chunk) for i, chunk in enumerate(chunks, 1)))
+        sections = [
+            f"### Files: {', '.join(label for label, _ in chunk)}\n{review}"
+            for chunk, review in zip(chunks, reviews) if review is not None
+        ]
+        if not sections:
+            raise ValueError("Code review failed for every chunk")
+        if len(chunks) == 1:
+            return reviews[0]
+
+        while len(sections) > self.merge_batch:
+            groups = [sections[i:i + self.merge_batch] for i in range(0, len(sections), self.merge_batch)]
+            merged = await asyncio.gather(*(self._merge(group, project_desc, semaphore) for group in groups))
+            sections = [f"### Review part {i}\n{review}" for i, review in enumerate(merged, 1)]
+        return await self._merge(sections, project_desc, semaphore)
+
+    async def _merge(self, sections: List[str], project_desc: str, semaphore: asyncio.Semaphore) -> str:
+        prompt = MERGE_REVIEW_PROMPT.format(project_desc=project_desc, reviews="\n\n".join(sections))
+        return await self._generate(prompt, semaphore)
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import venv
+from typing import List, Dict, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Environment variables passed to test processes; API keys and the like are not
+PASSED_ENV = ("PATH", "LANG", "LC_ALL", "TMPDIR", "SYSTEMROOT")
+IGNORED_DIRS = {".git", "__pycache__", ".venv", "venv", ".pytest_cache", "node_modules"}
+# Output kept per test file, tail first, for reports and fix prompts
+OUTPUT_CHARS = 4000
+READY_MARKER = ".ready"
+
+def requirements_key(requirements: str, offline: bool) -> str:
+    """Hash of the normalized requirements, interpreter version and install mode."""
+    lines = sorted({
+        line.split("#", 1)[0].strip().lower()
+        for line in requirements.splitlines()
+        if line.split("#", 1)[0].strip()
+    })
+    material = "\n".join([sys.version, "offline" if offline else "online"] + lines)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+class VenvCache:
+    """Virtual environments keyed by the content hash of a project's requirements.
+
+    Projects with identical requirements.txt share one environment, so packages
+    are installed once. Environments see the host's site-packages, which keeps
+    pytest and already installed packages usable offline; in offline mode pip
+    only installs from a local wheelhouse.
+    """
+
+    def __init__(self,
+                 cache_dir: str = "cache",
+                 offline: bool = False,
+                 wheelhouse: Optional[str] = None,
+                 install_timeout: float = 600.0):
+        self.root = os.path.join(cache_dir, "venvs")
+        self.offline = offline
+        self.wheelhouse = wheelhouse
+        self.install_timeout = install_timeout
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def python(env_dir: str) -> str:
+        if os.name == "nt":
+            return os.path.join(env_dir, "Scripts", "python.exe")
+        return os.path.join(env_dir, "bin", "python")
+
+    def _pip_command(self, env_dir: str, requirements_path: str) -> List[str]:
+        command = [self.python(env_dir), "-m", "pip", "install", "--disable-pip-version-check", "-q",
+                   "-r", requirements_path]
+        if self.offline:
+            command.append("--no-index")
+            if self.wheelhouse:
+                command += ["--find-links", self.wheelhouse]
+        return command
+
+    def get(self, requirements: str) -> str:
+        """Path of a ready environment for these requirements, creating it on first use."""
+        env_dir = os.path.join(self.root, requirements_key(requirements, self.offline))
+        if os.path.exists(os.path.join(env_dir, READY_MARKER)):
+            return env_dir
+
+        # Build next to the final location and rename, so a half-built env is never reused
+        build_dir = tempfile.mkdtemp(prefix=".build_", dir=self.root)
+        try:
+            logger.info(f"Creating test environment {env_dir}")
+            venv.EnvBuilder(system_site_packages=True, with_pip=False, symlinks=os.name != "nt").create(build_dir)
+            if requirements.strip():
+                requirements_path = os.path.join(build_dir, "requirements.txt")
+                with open(requirements_path, "w", encoding="utf-8") as f:
+                    f.write(requirements)
+                # pip comes from the host interpreter through the system site-packages
+                result = subprocess.run(
+                    self._pip_command(build_dir, requirements_path),
+                    capture_output=True, text=True, timeout=self.install_timeout
+                )
+                if result.returncode != 0:
+                    raise RuntimeError(f"Installing requirements failed: {result.stderr.strip()[-2000:]}")
+            with open(os.path.join(build_dir, READY_MARKER), "w") as f:
+                f.write(requirements)
+            try:
+                os.rename(build_dir, env_dir)
+            except OSError:
+                # Another run finished the same environment first
+                if not os.path.exists(os.path.join(env_dir, READY_MARKER)):
+                    raise
+            return env_dir
+        finally:
+            if os.path.exists(build_dir):
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+class ProjectVerifier:
+    """Runs a generated project's tests in a cached venv, one worker process per test file.
+
+    Tests run against a throwaway copy of the project, each file in its own
+    subprocess with a stripped environment, a private HOME and a timeout; at
+    most `workers` run at once. This is not a sandbox: the tests still run as
+    the current user with network access and can read or write anything that
+    user can, which is why running them is opt-in.
+    """
+
+    def __init__(self, venvs: VenvCache, workers: int = 4, timeout: float = 120.0):
+        self.venvs = venvs
+        self.workers = max(workers, 1)
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config) -> "ProjectVerifier":
+        venvs = VenvCache(
+            cache_dir=config.get("Cache", "cache_dir", fallback="cache"),
+            offline=config.get("CodeGen", "test_offline", fallback="false").lower() == "true",
+            wheelhouse=config.get("CodeGen", "test_wheelhouse", fallback=None) or None,
+            install_timeout=float(config.get("CodeGen", "test_install_timeout", fallback="600"))
+        )
+        return cls(
+            venvs,
+            workers=int(config.get("CodeGen", "test_workers", fallback=str(os.cpu_count() or 2))),
+            timeout=float(config.get("CodeGen", "test_timeout", fallback="120"))
+        )
+
+    @staticmethod
+    def find_tests(project_dir: str) -> List[str]:
+        """Relative paths of test_*.py and *_test.py files."""
+        tests = []
+        for root, dirs, names in os.walk(project_dir):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+            for name in sorted(names):
+                if name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py")):
+                    tests.append(os.path.relpath(os.path.join(root, name), project_dir).replace(os.sep, "/"))
+        return tests
+
+    def _environment(self, project_dir: str, home: str) -> Dict[str, str]:
+        env = {key: os.environ[key] for key in PASSED_ENV if key in os.environ}
+        paths = [os.path.abspath(project_dir)]
+        if os.path.isdir(os.path.join(project_dir, "src")):
+            paths.append(os.path.abspath(os.path.join(project_dir, "src")))
+        env.update({
+            "PYTHONPATH": os.pathsep.join(paths),
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "HOME": home
+        })
+        return env
+
+    async def _run_file(self,
+                        python: str,
+                        project_dir: str,
+                        home: str,
+                        test_path: str,
+                        semaphore: asyncio.Semaphore) -> Dict:
+        async with semaphore:
+            start = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                python, "-m", "pytest", "-q", "-p", "no:cacheprovider", test_path,
+                cwd=project_dir,
+                env=self._environment(project_dir, home),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                # Own process group, so a timeout also stops anything the tests spawned
+                start_new_session=os.name != "nt"
+            )
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), self.timeout)
+                status = {0: "passed", 5: "no tests"}.get(process.returncode, "failed")
+            except asyncio.TimeoutError:
+                try:
+                    if os.name != "nt":
+                        os.killpg(process.pid, signal.SIGKILL)
+                    else:
+                        process.kill()
+                except ProcessLookupError:
+                    # Exited between the timeout and the kill
+                    pass
+                output, _ = await process.communicate()
+                status = "timeout"
+            return {
+                "path": test_path,
+                "status": status,
+                "duration": time.monotonic() - start,
+                "output": output.decode("utf-8", errors="replace")[-OUTPUT_CHARS:]
+            }
+
+    async def run(self, project_dir: str, tests: Optional[List[str]] = None) -> List[Dict]:
+        """Run the given test files (all by default); one result dict per file."""
+        tests = self.find_tests(project_dir) if tests is None else tests
+        if not tests:
+            return []
+        requirements_path = os.path.join(project_dir, "requirements.txt")
+        requirements = ""
+        if os.path.exists(requirements_path):
+            with open(requirements_path, encoding="utf-8") as f:
+                requirements = f.read()
+        env_dir = await asyncio.to_thread(self.venvs.get, requirements)
+        python = self.venvs.python(env_dir)
+
+        # Tests get a fresh copy, so whatever they write never lands in the project
+        work_dir = tempfile.mkdtemp(prefix="codegen_tests_")
+        try:
+            run_dir = os.path.join(work_dir, "project")
+            home = os.path.join(work_dir, "home")
+            await asyncio.to_thread(
+                shutil.copytree, project_dir, run_dir, ignore=shutil.ignore_patterns(*IGNORED_DIRS)
+            )
+            os.makedirs(home)
+
+            semaphore = asyncio.Semaphore(self.workers)
+            outcomes = await asyncio.gather(*(
+                self._run_file(python, run_dir, home, test_path, semaphore) for test_path in tests
+            ), return_exceptions=True)
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+        results = []
+        for test_path, outcome in zip(tests, outcomes):
+            if isinstance(outcome, BaseException):
+                # One file that could not run should not discard the others' results
+                logger.error(f"Error running {test_path}: {str(outcome)}")
+                outcome = {"path": test_path, "status": "error", "duration": 0.0, "output": str(outcome)}
+            results.append(outcome)
+        return results
+
+def failure_report(results: List[Dict]) -> str:
+    """Failed and timed-out test files with their output, for a fix request."""
+    return "\n\n".join(
+        f"=== {result['path']} ({result['status']}) ===\n{result['output']}"
+        for result in results if result["status"] in ("failed", "timeout")
+    )
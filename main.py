@@ -1,4 +1,7 @@
+import argparse
 import asyncio
+import importlib
+import os
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.panel import Panel
@@ -12,10 +15,6 @@ from typing import List
 from utils.config_manager import ConfigManager
 from utils.logger import setup_logger
 from utils.rich_components import create_header, create_menu
-from features.chat import ChatInterface
-from features.code_gen import CodeGenerator
-from features.arxiv_search import ArxivSearch
-from features.settings import SettingsManager
 
 console = Console()
 logger = setup_logger()
@@ -23,12 +22,32 @@ logger = setup_logger()
 class AIAssistant:
     def __init__(self):
         self.config = ConfigManager()
-        self.chat = ChatInterface(self.config)
-        self.code_gen = CodeGenerator(self.config)
-        self.arxiv = ArxivSearch(self.config)
-        self.settings = SettingsManager(self.config)
+        self._features = {}
         self.running = True
 
+    def _get_feature(self, name: str, module_name: str, class_name: str):
+        """Import and build a feature on first use so the menu appears without loading SDKs."""
+        if name not in self._features:
+            module = importlib.import_module(module_name)
+            self._features[name] = getattr(module, class_name)(self.config)
+        return self._features[name]
+
+    @property
+    def chat(self):
+        return self._get_feature("chat", "features.chat", "ChatInterface")
+
+    @property
+    def code_gen(self):
+        return self._get_feature("code_gen", "features.code_gen", "CodeGenerator")
+
+    @property
+    def arxiv(self):
+        return self._get_feature("arxiv", "features.arxiv_search", "ArxivSearch")
+
+    @property
+    def settings(self):
+        return self._get_feature("settings", "features.settings", "SettingsManager")
+
     async def main_menu(self):
         while self.running:
             try:
@@ -70,7 +89,27 @@ class AIAssistant:
                 console.print(f"[red]Error: {str(e)}[/red]")
                 await asyncio.sleep(2)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="AI Assistant")
+    parser.add_argument("--batch", metavar="INPUT", help="Run prompts from a JSONL file without the menu")
+    parser.add_argument("--output", metavar="OUTPUT", help="JSONL file for batch results (default: INPUT.results.jsonl)")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP API server instead of the menu")
+    parser.add_argument("--host", default="127.0.0.1", help="API server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="API server port (default: 8080)")
+    return parser.parse_args()
+
 async def main():
+    args = parse_args()
+    if args.batch:
+        from features.batch import BatchRunner
+        output = args.output or f"{os.path.splitext(args.batch)[0]}.results.jsonl"
+        await BatchRunner(ConfigManager()).run(args.batch, output)
+        return
+    if args.serve:
+        from features.api_server import APIServer
+        await APIServer(ConfigManager()).run(args.host, args.port)
+        return
+
     assistant = AIAssistant()
     await assistant.main_menu()
 
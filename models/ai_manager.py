@@ -1,42 +1,232 @@
-from typing import List, Dict, Any, Optional
-from .openai_client import OpenAIClient
-from .anthropic_client import AnthropicClient
-from .groq_client import GroqClient
-from .gemini_client import GeminiClient
+import asyncio
+import importlib
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable, Awaitable, Tuple
+from .model_config import ModelConfigManager, ModelConfig
 from utils.logger import setup_logger
+from utils.response_cache import ResponseCache
+from .routing import RoutingPolicy, PROVIDER_SECTIONS
 
 logger = setup_logger()
 
+# Client module and class per provider, imported on first use so unused SDKs never load
+PROVIDER_CLIENTS = {
+    "openai": ("models.openai_client", "OpenAIClient"),
+    "anthropic": ("models.anthropic_client", "AnthropicClient"),
+    "groq": ("models.groq_client", "GroqClient"),
+    "gemini": ("models.gemini_client", "GeminiClient")
+}
+
 class AIManager:
     def __init__(self, config):
         self.config = config
-        self.openai = OpenAIClient(config)
-        self.anthropic = AnthropicClient(config)
-        self.groq = GroqClient(config)
-        self.gemini = GeminiClient(config)
+        self._clients: Dict[str, Any] = {}
         self.default_provider = config.get("DEFAULT", "ai_provider", fallback="openai")
+        self.model_config = ModelConfigManager(config)
+        self.cache = ResponseCache.from_config(config)
+        self.routing = RoutingPolicy(config)
+
+    def get_default_model(self, provider: Optional[str] = None) -> str:
+        """Get the configured default model for a provider."""
+        provider = provider or self.default_provider
+        if provider not in PROVIDER_SECTIONS:
+            raise ValueError(f"Unknown AI provider: {provider}")
+        return self.config.get(PROVIDER_SECTIONS[provider], "default_model")
+
+    @property
+    def openai(self):
+        return self._get_client("openai")
+
+    @property
+    def anthropic(self):
+        return self._get_client("anthropic")
+
+    @property
+    def groq(self):
+        return self._get_client("groq")
+
+    @property
+    def gemini(self):
+        return self._get_client("gemini")
+
+    def _get_client(self, provider: str):
+        """Get the client instance for a provider, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None:
+            if provider not in PROVIDER_CLIENTS:
+                raise ValueError(f"Unknown AI provider: {provider}")
+            module_name, class_name = PROVIDER_CLIENTS[provider]
+            client_class = getattr(importlib.import_module(module_name), class_name)
+            client = self._clients[provider] = client_class(self.config)
+        return client
+
+    def _cache_key(self, kind: str, provider: str, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Cache key for a call to the provider's default model, or None when it must not be cached."""
+        if not self.cache:
+            return None
+        
+        model = self.get_default_model(provider)
+        try:
+            model_config = self.model_config.get_model_config(provider, model)
+        except ValueError:
+            model_config = ModelConfig(name=model, provider=provider)
+        
+        if not self.cache.is_cacheable(model_config):
+            return None
+        return self.cache.make_key(kind, provider, model, model_config, messages)
+
+    async def _cached(self,
+                      kind: str,
+                      provider: str,
+                      messages: List[Dict[str, str]],
+                      call: Callable[[], Awaitable[Tuple[str, str]]]) -> Tuple[str, str]:
+        """Serve a deterministic call from the response cache, calling the provider on a miss.
+        
+        `call` returns the response and the provider that produced it, and so does this;
+        answers from a fallback provider are not stored under the requested provider's key.
+        """
+        key = self._cache_key(kind, provider, messages)
+        if key is None:
+            return await call()
+        
+        response = self.cache.get(key)
+        if response is not None:
+            logger.debug(f"Response cache hit for {provider} ({kind})")
+            return response, provider
+        
+        response, answered_by = await call()
+        if answered_by == provider:
+            self.cache.set(key, response)
+        return response, answered_by
+
+    async def _timed_call(self, provider: str, call: Callable[[Any], Awaitable[str]]) -> str:
+        """Run a call against one provider and record its latency on success."""
+        start = time.monotonic()
+        result = await call(self._get_client(provider))
+        self.routing.latency.record(provider, time.monotonic() - start)
+        return result
+
+    async def _route(self, provider: str, call: Callable[[Any], Awaitable[str]]) -> Tuple[str, str]:
+        """Run a call along the provider fallback chain, hedging to the next provider when enabled.
+
+        Returns the response and the name of the provider that answered.
+
+        With hedging, if a provider has not answered within its hedge threshold the
+        next provider in the chain is started as well; the first successful answer
+        wins and the remaining requests are cancelled.
+        """
+        if provider not in PROVIDER_CLIENTS:
+            raise ValueError(f"Unknown AI provider: {provider}")
+        
+        chain = self.routing.chain(provider)
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[Exception] = None
+        next_index = 0
+
+        def launch() -> str:
+            nonlocal next_index
+            name = chain[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(self._timed_call(name, call))] = name
+            return name
+
+        current = launch()
+        try:
+            while pending:
+                timeout = None
+                if self.routing.hedge and next_index < len(chain):
+                    timeout = self.routing.hedge_after(current)
+                
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    logger.info(f"{current} slower than {timeout:.2f}s, hedging to {chain[next_index]}")
+                    current = launch()
+                    continue
+                
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result(), name
+                    last_error = task.exception()
+                    logger.warning(f"Provider {name} failed: {str(last_error)}")
+                
+                if pending:
+                    # Hedge timing follows a provider that is still running, not the one that failed
+                    current = next(iter(pending.values()))
+                elif next_index < len(chain):
+                    current = launch()
+            
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def get_chat_response(self, 
                               conversation: List[Dict[str, str]], 
                               provider: Optional[str] = None) -> str:
         """Get response from the selected AI provider."""
+        response, _ = await self.get_chat_response_with_provider(conversation, provider)
+        return response
+
+    async def get_chat_response_with_provider(self,
+                                              conversation: List[Dict[str, str]],
+                                              provider: Optional[str] = None) -> Tuple[str, str]:
+        """Like get_chat_response, also returning the provider that answered (it differs after a fallback)."""
         provider = provider or self.default_provider
         
         try:
-            if provider == "openai":
-                return await self.openai.get_chat_completion(conversation)
-            elif provider == "anthropic":
-                return await self.anthropic.get_chat_completion(conversation)
-            elif provider == "groq":
-                return await self.groq.get_chat_completion(conversation)
-            elif provider == "gemini":
-                return await self.gemini.get_chat_completion(conversation)
-            else:
-                raise ValueError(f"Unknown AI provider: {provider}")
+            return await self._cached(
+                "chat", provider, conversation,
+                lambda: self._route(provider, lambda client: client.get_chat_completion(conversation))
+            )
         except Exception as e:
             logger.error(f"Error getting chat response: {str(e)}")
             raise
 
+    async def stream_chat_response(self,
+                                 conversation: List[Dict[str, str]],
+                                 provider: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream response chunks from the selected AI provider as they are generated.
+        
+        Cached responses (shared with get_chat_response) are yielded as one chunk;
+        a stream that completes on the requested provider is stored in the cache.
+        """
+        provider = provider or self.default_provider
+        
+        try:
+            if provider not in PROVIDER_CLIENTS:
+                raise ValueError(f"Unknown AI provider: {provider}")
+            
+            key = self._cache_key("chat", provider, conversation)
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    logger.debug(f"Response cache hit for {provider} (stream)")
+                    yield cached
+                    return
+            
+            # A stream can only fall back before its first chunk has been shown
+            chain = self.routing.chain(provider)
+            for index, name in enumerate(chain):
+                started = False
+                chunks = []
+                try:
+                    async for chunk in self._get_client(name).stream_chat_completion(conversation):
+                        started = True
+                        chunks.append(chunk)
+                        yield chunk
+                    if key is not None and name == provider:
+                        self.cache.set(key, "".join(chunks))
+                    return
+                except Exception as e:
+                    if started or index == len(chain) - 1:
+                        raise
+                    logger.warning(f"Provider {name} failed before streaming: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}")
+            raise
+
     async def generate_code(self, 
                           prompt: str,
                           provider: Optional[str] = None) -> str:
@@ -44,16 +234,11 @@ class AIManager:
         provider = provider or self.default_provider
         
         try:
-            if provider == "openai":
-                return await self.openai.generate_code(prompt)
-            elif provider == "anthropic":
-                return await self.anthropic.generate_code(prompt)
-            elif provider == "groq":
-                return await self.groq.generate_code(prompt)
-            elif provider == "gemini":
-                return await self.gemini.generate_code(prompt)
-            else:
-                raise ValueError(f"Unknown AI provider: {provider}")
+            response, _ = await self._cached(
+                "code", provider, [{"role": "user", "content": prompt}],
+                lambda: self._route(provider, lambda client: client.generate_code(prompt))
+            )
+            return response
         except Exception as e:
             logger.error(f"Error generating code: {str(e)}")
             raise
@@ -93,16 +278,12 @@ class AIManager:
             Setup and usage instructions...
             """
 
-            if provider == "openai":
-                return await self.openai.get_code_response(prompt, system_prompt)
-            elif provider == "anthropic":
-                return await self.anthropic.get_code_response(prompt, system_prompt)
-            elif provider == "groq":
-                return await self.groq.get_code_response(prompt, system_prompt)
-            elif provider == "gemini":
-                return await self.gemini.get_code_response(prompt, system_prompt)
-            else:
-                raise ValueError(f"Unknown AI provider: {provider}")
+            response, _ = await self._cached(
+                "code_response", provider,
+                [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}],
+                lambda: self._route(provider, lambda client: client.get_code_response(prompt, system_prompt))
+            )
+            return response
         except Exception as e:
             logger.error(f"Error getting code response: {str(e)}")
             raise
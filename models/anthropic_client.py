@@ -1,16 +1,31 @@
-from typing import List, Dict, Any
-from anthropic import Anthropic
+from typing import List, Dict, Any, AsyncIterator
+from anthropic import AsyncAnthropic, NOT_GIVEN
 from utils.logger import setup_logger
 from models.model_config import ModelConfigManager
+from models.rate_limiter import get_rate_limiter
 
 logger = setup_logger()
 
 class AnthropicClient:
     def __init__(self, config):
         self.config = config
-        self.client = Anthropic(api_key=config.get("Anthropic", "api_key"))
+        self.client = AsyncAnthropic(
+            api_key=config.get("Anthropic", "api_key"),
+            base_url=config.get("Anthropic", "base_url", fallback=None),
+            max_retries=0  # retries are scheduled by the shared rate limiter
+        )
         self.default_model = config.get("Anthropic", "default_model")
         self.model_config = ModelConfigManager(config)
+        self.limiter = get_rate_limiter(config, "anthropic")
+
+    def _split_system(self, conversation: List[Dict[str, str]]):
+        """Separate system messages into Anthropic's top-level system prompt."""
+        system = "\n\n".join(msg["content"] for msg in conversation if msg["role"] == "system")
+        messages = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in conversation if msg["role"] != "system"
+        ]
+        return system or NOT_GIVEN, messages
 
     async def get_chat_completion(self, 
                                 conversation: List[Dict[str, str]], 
@@ -21,21 +36,17 @@ class AnthropicClient:
             model_config = self.model_config.get_model_config("anthropic", model)
             
             # Convert conversation history to Anthropic format
-            messages = []
-            for msg in conversation:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+            system, messages = self._split_system(conversation)
             
-            response = self.client.messages.create(
+            response = await self.limiter.run(lambda: self.client.messages.create(
                 model=model,
+                system=system,
                 messages=messages,
                 max_tokens=model_config.max_tokens,
                 temperature=model_config.temperature,
                 top_p=model_config.top_p,
                 stop_sequences=model_config.stop_sequences
-            )
+            ), conversation)
             
             return response.content[0].text
             
@@ -43,13 +54,42 @@ class AnthropicClient:
             logger.error(f"Anthropic chat completion error: {str(e)}")
             raise
 
+    async def stream_chat_completion(self,
+                                   conversation: List[Dict[str, str]],
+                                   model: str = None) -> AsyncIterator[str]:
+        """Stream chat completion text chunks from Anthropic as they arrive."""
+        try:
+            model = model or self.default_model
+            model_config = self.model_config.get_model_config("anthropic", model)
+            
+            system, messages = self._split_system(conversation)
+            
+            stream = await self.limiter.run(lambda: self.client.messages.create(
+                model=model,
+                system=system,
+                messages=messages,
+                max_tokens=model_config.max_tokens,
+                temperature=model_config.temperature,
+                top_p=model_config.top_p,
+                stop_sequences=model_config.stop_sequences,
+                stream=True
+            ), conversation)
+            
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+                    
+        except Exception as e:
+            logger.error(f"Anthropic chat stream error: {str(e)}")
+            raise
+
     async def generate_code(self, prompt: str, model: str = None) -> str:
         """Generate code using Anthropic."""
         try:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("anthropic", model)
             
-            response = self.client.messages.create(
+            response = await self.limiter.run(lambda: self.client.messages.create(
                 model=model,
                 messages=[
                     {
@@ -65,7 +105,7 @@ class AnthropicClient:
                 temperature=model_config.temperature,
                 top_p=model_config.top_p,
                 stop_sequences=model_config.stop_sequences
-            )
+            ), [{"role": "user", "content": prompt}])
             
             return response.content[0].text
             
@@ -79,7 +119,7 @@ class AnthropicClient:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("anthropic", model)
             
-            response = self.client.messages.create(
+            response = await self.limiter.run(lambda: self.client.messages.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -89,7 +129,7 @@ class AnthropicClient:
                 temperature=model_config.temperature,
                 top_p=model_config.top_p,
                 stop_sequences=model_config.stop_sequences
-            )
+            ), [{"role": "user", "content": prompt}])
             
             return response.content[0].text
             
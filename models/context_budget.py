@@ -0,0 +1,129 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import List, Dict, Optional, Callable, Awaitable
+from models.model_config import ModelConfigManager, ModelConfig
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+# Fixed per-message overhead for role markers and separators
+MESSAGE_OVERHEAD = 4
+# Messages whose token counts are kept, least recently used dropped first
+TOKEN_CACHE_SIZE = 4096
+
+SUMMARY_PROMPT = """Summarize the following conversation excerpt in a few sentences.
+Keep names, decisions, code identifiers and open questions. Reply with the summary only.
+
+{transcript}"""
+
+class ContextBudget:
+    """Decides which part of a conversation fits into a model's context window."""
+
+    def __init__(self,
+                 config,
+                 summarizer: Optional[Callable[[List[Dict[str, str]]], Awaitable[str]]] = None):
+        self.config = config
+        self.model_config = ModelConfigManager(config)
+        self.summarizer = summarizer
+        self.summarize = config.get("Context", "summarize", fallback="false").lower() == "true"
+        self.summary_chunk = int(config.get("Context", "summary_chunk", fallback="8"))
+        self.safety_margin = int(config.get("Context", "safety_margin", fallback="256"))
+        self._token_cache: "OrderedDict[tuple, int]" = OrderedDict()
+        self._summary_cache: Dict[str, str] = {}
+
+    def count_tokens(self, message: Dict[str, str]) -> int:
+        """Estimate tokens for a message, caching the result per role/content (LRU-bounded)."""
+        # Keyed on the text itself: a hash() collision would return another message's count
+        key = (message["role"], message["content"])
+        count = self._token_cache.get(key)
+        if count is None:
+            count = len(message["content"]) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD
+            self._token_cache[key] = count
+            if len(self._token_cache) > TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
+        else:
+            self._token_cache.move_to_end(key)
+        return count
+
+    def get_budget(self, provider: str, model: str) -> Optional[int]:
+        """Get the prompt token budget for a model, or None when the window is unknown."""
+        try:
+            model_config = self.model_config.get_model_config(provider, model)
+        except ValueError:
+            model_config = ModelConfig(name=model, provider=provider)
+
+        if not model_config.context_window:
+            return None
+        return max(model_config.context_window - (model_config.max_tokens or 0) - self.safety_margin, 0)
+
+    async def fit(self,
+                  conversation: List[Dict[str, str]],
+                  provider: str,
+                  model: str) -> List[Dict[str, str]]:
+        """Return the messages to send: pinned system messages, optional summaries and recent turns."""
+        budget = self.get_budget(provider, model)
+        if budget is None:
+            return conversation
+
+        pinned = [msg for msg in conversation if msg["role"] == "system"]
+        turns = [msg for msg in conversation if msg["role"] != "system"]
+
+        remaining = budget - sum(self.count_tokens(msg) for msg in pinned)
+
+        # Walk backwards from the newest turn; the latest message is always kept
+        start = len(turns)
+        while start > 0:
+            cost = self.count_tokens(turns[start - 1])
+            if cost > remaining and start < len(turns):
+                break
+            remaining -= cost
+            start -= 1
+
+        if start == 0:
+            return conversation
+
+        logger.info(f"Context budget: dropping {start} of {len(turns)} messages for {provider}/{model}")
+        summaries = await self._summarize_dropped(turns[:start], remaining)
+        return pinned + summaries + turns[start:]
+
+    async def _summarize_dropped(self,
+                                 dropped: List[Dict[str, str]],
+                                 remaining: int) -> List[Dict[str, str]]:
+        """Replace complete chunks of dropped turns with cached summaries that still fit the budget."""
+        if not self.summarize or not self.summarizer:
+            return []
+
+        summaries = []
+        for i in range(0, len(dropped) - self.summary_chunk + 1, self.summary_chunk):
+            span = dropped[i:i + self.summary_chunk]
+            key = hashlib.sha256(json.dumps(span, sort_keys=True).encode("utf-8")).hexdigest()
+
+            summary = self._summary_cache.get(key)
+            if summary is None:
+                transcript = "\n\n".join(f"{msg['role'].upper()}: {msg['content']}" for msg in span)
+                try:
+                    summary = await self.summarizer([
+                        {"role": "user", "content": SUMMARY_PROMPT.format(transcript=transcript)}
+                    ])
+                except Exception as e:
+                    logger.error(f"Error summarizing conversation span: {str(e)}")
+                    continue
+                self._summary_cache[key] = summary
+
+            summaries.append({
+                "role": "system",
+                "content": f"Summary of earlier conversation: {summary}"
+            })
+
+        # Keep the newest summaries when they do not all fit
+        kept = []
+        for message in reversed(summaries):
+            cost = self.count_tokens(message)
+            if cost > remaining:
+                break
+            remaining -= cost
+            kept.insert(0, message)
+        return kept
@@ -0,0 +1,65 @@
+import re
+import zlib
+from typing import List
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+class HashingEmbedder:
+    """Local embedder: signed feature hashing of word unigrams and bigrams.
+
+    Needs no model download or API key, is deterministic across processes and
+    is good enough to rank abstracts by topical overlap and to spot
+    near-identical texts. Also stands in for a provider endpoint in tests.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = TOKEN.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        # Dampen repeated terms so one frequent word does not dominate
+        return np.sign(vectors) * np.log1p(np.abs(vectors))
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI endpoint, requested in batches through the client's rate limiter."""
+
+    def __init__(self, client, model: str = "text-embedding-3-small", batch_size: int = 100):
+        self.client = client
+        self.model = model
+        self.name = f"openai-{model}"
+        self.batch_size = batch_size
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(await self.client.get_embeddings(texts[start:start + self.batch_size], self.model))
+        return np.asarray(vectors, dtype=np.float32)
+
+def get_embedder(config, ai_manager=None):
+    """Embedder selected by [ArXiv] embedding_provider ("local" or "openai")."""
+    provider = config.get("ArXiv", "embedding_provider", fallback="local")
+    if provider == "openai":
+        if ai_manager is None:
+            raise ValueError("The openai embedding provider needs an AI manager")
+        return OpenAIEmbedder(
+            ai_manager.openai,
+            config.get("ArXiv", "embedding_model", fallback="text-embedding-3-small")
+        )
+    if provider != "local":
+        raise ValueError(f"Unknown embedding provider: {provider}")
+    return HashingEmbedder(int(config.get("ArXiv", "embedding_dim", fallback="512")))
@@ -1,9 +1,31 @@
-from typing import Optional
+from typing import Optional, List, Dict, AsyncIterator
 import google.generativeai as genai
 from utils.logger import setup_logger
+from models.rate_limiter import get_rate_limiter
 
 logger = setup_logger()
 
+_configured_api_key = None
+
+def configure_gemini(api_key: str) -> None:
+    """Configure the Gemini SDK once per API key."""
+    global _configured_api_key
+    if _configured_api_key != api_key:
+        genai.configure(api_key=api_key)
+        _configured_api_key = api_key
+
+def response_text(response) -> str:
+    """Text of a Gemini response or stream chunk, joined from its parts.
+
+    Chunks without parts, such as the finish or a safety-blocked chunk, give ""
+    where the SDK's .text accessor would raise ValueError.
+    """
+    try:
+        parts = response.parts
+    except ValueError:
+        return ""
+    return "".join(getattr(part, "text", "") or "" for part in parts)
+
 class GeminiClient:
     def __init__(self, config):
         self.config = config
@@ -11,15 +33,62 @@ class GeminiClient:
         self.default_model = config.get("Gemini", "default_model")
         
         # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        configure_gemini(self.api_key)
         self.model = genai.GenerativeModel(model_name=self.default_model)
+        self.limiter = get_rate_limiter(config, "gemini")
         
+    def _to_gemini_contents(self, conversation: List[Dict[str, str]]) -> List[Dict]:
+        """Convert conversation history to Gemini's user/model content format."""
+        return [
+            {
+                "role": "model" if msg["role"] == "assistant" else "user",
+                "parts": [msg["content"]]
+            }
+            for msg in conversation
+        ]
+
+    async def get_chat_completion(self,
+                                conversation: List[Dict[str, str]],
+                                model: str = None) -> str:
+        """Get chat completion from Gemini."""
+        try:
+            response = await self.limiter.run(lambda: self.model.generate_content_async(
+                self._to_gemini_contents(conversation)
+            ), conversation)
+            return response.text
+            
+        except Exception as e:
+            logger.error(f"Gemini chat completion error: {str(e)}")
+            raise
+
+    async def stream_chat_completion(self,
+                                   conversation: List[Dict[str, str]],
+                                   model: str = None) -> AsyncIterator[str]:
+        """Stream chat completion text chunks from Gemini as they arrive."""
+        try:
+            response = await self.limiter.run(lambda: self.model.generate_content_async(
+                self._to_gemini_contents(conversation),
+                stream=True
+            ), conversation)
+            
+            async for chunk in response:
+                text = response_text(chunk)
+                if text:
+                    yield text
+                    
+        except Exception as e:
+            logger.error(f"Gemini chat stream error: {str(e)}")
+            raise
+            
     async def generate_code(self, prompt: str, model: str = None) -> str:
         """Generate code using Gemini."""
         try:
             model = model or self.default_model
             
-            response = self.model.generate_content(prompt)
+            response = await self.limiter.run(
+                lambda: self.model.generate_content_async(prompt),
+                [{"role": "user", "content": prompt}]
+            )
             return response.text
             
         except Exception as e:
@@ -31,7 +100,10 @@ class GeminiClient:
         try:
             full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
             
-            response = self.model.generate_content(full_prompt)
+            response = await self.limiter.run(
+                lambda: self.model.generate_content_async(full_prompt),
+                [{"role": "user", "content": full_prompt}]
+            )
             return response.text
             
         except Exception as e:
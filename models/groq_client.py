@@ -1,16 +1,22 @@
-from typing import List, Dict, Any
-from groq import Groq
+from typing import List, Dict, Any, AsyncIterator
+from groq import AsyncGroq
 from utils.logger import setup_logger
 from models.model_config import ModelConfigManager
+from models.rate_limiter import get_rate_limiter
 
 logger = setup_logger()
 
 class GroqClient:
     def __init__(self, config):
         self.config = config
-        self.client = Groq(api_key=config.get("Groq", "api_key"))
+        self.client = AsyncGroq(
+            api_key=config.get("Groq", "api_key"),
+            base_url=config.get("Groq", "base_url", fallback=None),
+            max_retries=0  # retries are scheduled by the shared rate limiter
+        )
         self.default_model = config.get("Groq", "default_model")
         self.model_config = ModelConfigManager(config)
+        self.limiter = get_rate_limiter(config, "groq")
 
     async def get_chat_completion(self, 
                                 conversation: List[Dict[str, str]], 
@@ -28,14 +34,14 @@ class GroqClient:
                     "content": msg["content"]
                 })
             
-            response = self.client.chat.completions.create(
+            response = await self.limiter.run(lambda: self.client.chat.completions.create(
                 model=model,
                 messages=messages,
                 max_tokens=model_config.max_tokens,
                 temperature=model_config.temperature,
                 top_p=model_config.top_p,
                 stop=model_config.stop_sequences
-            )
+            ), conversation)
             
             return response.choices[0].message.content
             
@@ -43,13 +49,41 @@ class GroqClient:
             logger.error(f"Groq chat completion error: {str(e)}")
             raise
 
+    async def stream_chat_completion(self,
+                                   conversation: List[Dict[str, str]],
+                                   model: str = None) -> AsyncIterator[str]:
+        """Stream chat completion text chunks from Groq as they arrive."""
+        try:
+            model = model or self.default_model
+            model_config = self.model_config.get_model_config("groq", model)
+            
+            messages = [{"role": msg["role"], "content": msg["content"]} for msg in conversation]
+            
+            stream = await self.limiter.run(lambda: self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=model_config.max_tokens,
+                temperature=model_config.temperature,
+                top_p=model_config.top_p,
+                stop=model_config.stop_sequences,
+                stream=True
+            ), conversation)
+            
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.error(f"Groq chat stream error: {str(e)}")
+            raise
+
     async def generate_code(self, prompt: str, model: str = None) -> str:
         """Generate code using Groq."""
         try:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("groq", model)
             
-            response = self.client.chat.completions.create(
+            response = await self.limiter.run(lambda: self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {
@@ -65,7 +99,7 @@ class GroqClient:
                 temperature=model_config.temperature,
                 top_p=model_config.top_p,
                 stop=model_config.stop_sequences
-            )
+            ), [{"role": "user", "content": prompt}])
             
             return response.choices[0].message.content
             
@@ -79,7 +113,7 @@ class GroqClient:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("groq", model)
             
-            response = self.client.chat.completions.create(
+            response = await self.limiter.run(lambda: self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {
@@ -95,7 +129,7 @@ class GroqClient:
                 temperature=model_config.temperature,
                 top_p=model_config.top_p,
                 stop=model_config.stop_sequences
-            )
+            ), [{"role": "user", "content": prompt}])
             
             return response.choices[0].message.content
             
@@ -1,16 +1,22 @@
-from typing import List, Dict, Any
-from openai import OpenAI
+from typing import List, Dict, Any, AsyncIterator
+from openai import AsyncOpenAI
 from utils.logger import setup_logger
 from models.model_config import ModelConfigManager
+from models.rate_limiter import get_rate_limiter
 
 logger = setup_logger()
 
 class OpenAIClient:
     def __init__(self, config):
         self.config = config
-        self.client = OpenAI(api_key=config.get("OpenAI", "api_key"))
+        self.client = AsyncOpenAI(
+            api_key=config.get("OpenAI", "api_key"),
+            base_url=config.get("OpenAI", "base_url", fallback=None),
+            max_retries=0  # retries are scheduled by the shared rate limiter
+        )
         self.default_model = config.get("OpenAI", "default_model")
         self.model_config = ModelConfigManager(config)
+        self.limiter = get_rate_limiter(config, "openai")
 
     async def get_chat_completion(self, 
                                 conversation: List[Dict[str, str]], 
@@ -20,7 +26,7 @@ class OpenAIClient:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("openai", model)
             
-            response = self.client.chat.completions.create(
+            response = await self.limiter.run(lambda: self.client.chat.completions.create(
                 model=model,
                 messages=conversation,
                 max_tokens=model_config.max_tokens,
@@ -29,7 +35,7 @@ class OpenAIClient:
                 presence_penalty=model_config.presence_penalty,
                 frequency_penalty=model_config.frequency_penalty,
                 stop=model_config.stop_sequences
-            )
+            ), conversation)
             
             return response.choices[0].message.content
             
@@ -37,13 +43,41 @@ class OpenAIClient:
             logger.error(f"OpenAI chat completion error: {str(e)}")
             raise
 
+    async def stream_chat_completion(self,
+                                   conversation: List[Dict[str, str]],
+                                   model: str = None) -> AsyncIterator[str]:
+        """Stream chat completion text chunks from OpenAI as they arrive."""
+        try:
+            model = model or self.default_model
+            model_config = self.model_config.get_model_config("openai", model)
+            
+            stream = await self.limiter.run(lambda: self.client.chat.completions.create(
+                model=model,
+                messages=conversation,
+                max_tokens=model_config.max_tokens,
+                temperature=model_config.temperature,
+                top_p=model_config.top_p,
+                presence_penalty=model_config.presence_penalty,
+                frequency_penalty=model_config.frequency_penalty,
+                stop=model_config.stop_sequences,
+                stream=True
+            ), conversation)
+            
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            logger.error(f"OpenAI chat stream error: {str(e)}")
+            raise
+
     async def generate_code(self, prompt: str, model: str = None) -> str:
         """Generate code using OpenAI."""
         try:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("openai", model)
             
-            response = self.client.chat.completions.create(
+            response = await self.limiter.run(lambda: self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a skilled programmer. Generate clean, well-documented code."},
@@ -55,7 +89,7 @@ class OpenAIClient:
                 presence_penalty=model_config.presence_penalty,
                 frequency_penalty=model_config.frequency_penalty,
                 stop=model_config.stop_sequences
-            )
+            ), [{"role": "user", "content": prompt}])
             
             return response.choices[0].message.content
             
@@ -69,7 +103,7 @@ class OpenAIClient:
             model = model or self.default_model
             model_config = self.model_config.get_model_config("openai", model)
             
-            response = self.client.chat.completions.create(
+            response = await self.limiter.run(lambda: self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -81,10 +115,23 @@ class OpenAIClient:
                 presence_penalty=model_config.presence_penalty,
                 frequency_penalty=model_config.frequency_penalty,
                 stop=model_config.stop_sequences
-            )
+            ), [{"role": "user", "content": prompt}])
             
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"OpenAI code response error: {str(e)}")
             raise
+
+    async def get_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        """Embed a batch of texts with OpenAI."""
+        try:
+            response = await self.limiter.run(
+                lambda: self.client.embeddings.create(model=model, input=texts),
+                [{"role": "user", "content": text} for text in texts]
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            
+        except Exception as e:
+            logger.error(f"OpenAI embedding error: {str(e)}")
+            raise
@@ -0,0 +1,198 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# HTTP statuses worth retrying: rate limits, overload and transient server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+# SDK exception names raised for network failures before any status is received
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ServiceUnavailable", "DeadlineExceeded"}
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider's circuit breaker is open and calls fail fast."""
+
+class TokenBucket:
+    """Refills `rate` units per minute up to a burst of one minute's worth."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / 60)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until `amount` units are available and take them."""
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters in FIFO order so large requests are not starved
+        async with self.lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) * 60 / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one trial call through after a cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+
+    def before_call(self, provider: str) -> None:
+        """Raise CircuitOpenError while the circuit is open."""
+        if self.opened_at is None:
+            return
+        if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_running:
+            raise CircuitOpenError(f"{provider} circuit open after {self.failures} consecutive failures")
+        self.trial_running = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_running = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        """A cancelled half-open trial counts as a failure so the next cool-down can try again."""
+        if self.trial_running:
+            self.record_failure()
+
+class RateLimiter:
+    """Per-provider request/token budgets with retries, backoff and a circuit breaker."""
+
+    def __init__(self,
+                 provider: str,
+                 requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0,
+                 max_retries: int = 4,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    @classmethod
+    def from_config(cls, config, provider: str) -> "RateLimiter":
+        """Create a limiter from the [RateLimit.<provider>] config section."""
+        section = f"RateLimit.{provider}"
+        return cls(
+            provider,
+            requests_per_minute=float(config.get(section, "requests_per_minute", fallback="0")),
+            tokens_per_minute=float(config.get(section, "tokens_per_minute", fallback="0")),
+            max_retries=int(config.get(section, "max_retries", fallback="4")),
+            base_delay=float(config.get(section, "base_delay", fallback="1.0")),
+            max_delay=float(config.get(section, "max_delay", fallback="60")),
+            failure_threshold=int(config.get(section, "failure_threshold", fallback="5")),
+            reset_timeout=float(config.get(section, "reset_timeout", fallback="30"))
+        )
+
+    async def run(self,
+                  call: Callable[[], Awaitable[Any]],
+                  messages: Optional[List[Dict[str, str]]] = None) -> Any:
+        """Run a provider call within budget, retrying transient failures."""
+        estimate = estimate_tokens(messages or [])
+        attempt = 0
+        while True:
+            self.breaker.before_call(self.provider)
+            try:
+                await self.requests.acquire(1)
+                await self.tokens.acquire(estimate)
+                result = await call()
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered, so a bad request does not count against the circuit
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                logger.warning(
+                    f"{self.provider} transient error ({str(e)}), retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Honor Retry-After when the provider sends it, else exponential backoff with full jitter."""
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough prompt size in tokens (about four characters per token)."""
+    return sum(len(msg.get("content", "")) // 4 + 4 for msg in messages)
+
+def get_status(error: Exception) -> Optional[int]:
+    """Extract an HTTP status from OpenAI/Anthropic/Groq or Google API exceptions."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, overload, transient 5xx and connection failures are retried."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    return get_status(error) in RETRYABLE_STATUS or type(error).__name__ in RETRYABLE_ERRORS
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds or HTTP date) or retry-after-ms from an error response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+_limiters: Dict[tuple, RateLimiter] = {}
+
+def get_rate_limiter(config, provider: str) -> RateLimiter:
+    """Get the limiter shared by every client of a provider for this config file."""
+    key = (getattr(config, "config_file", None), provider)
+    if key not in _limiters:
+        _limiters[key] = RateLimiter.from_config(config, provider)
+    return _limiters[key]
@@ -0,0 +1,85 @@
+from collections import deque
+from typing import List, Dict, Deque, Optional
+
+# Providers in the order they are tried when no fallback_order is configured
+DEFAULT_FALLBACK_ORDER = ["openai", "anthropic", "groq", "gemini"]
+
+# Config section holding each provider's api_key and default_model
+PROVIDER_SECTIONS = {
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "groq": "Groq",
+    "gemini": "Gemini"
+}
+
+class LatencyTracker:
+    """Rolling per-provider latency samples used to pick hedge thresholds."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+
+    def record(self, provider: str, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        self.samples.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, provider: str, q: float) -> Optional[float]:
+        """Get the q-th percentile (0-100) latency for a provider, or None without samples."""
+        samples = self.samples.get(provider)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(int(len(ordered) * q / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def histogram(self, provider: str, bounds: List[float]) -> List[int]:
+        """Count samples per latency bucket; the last bucket holds samples above the final bound."""
+        counts = [0] * (len(bounds) + 1)
+        for sample in self.samples.get(provider, []):
+            bucket = next((i for i, bound in enumerate(bounds) if sample <= bound), len(bounds))
+            counts[bucket] += 1
+        return counts
+
+class RoutingPolicy:
+    """Fallback chain and hedging settings from the [Routing] config section.
+
+    Both are opt-in, since they re-send the whole conversation to other vendors:
+    fallback = true tries the next configured provider in fallback_order when a
+    call fails, and hedge = true (which needs fallback) also starts it when the
+    requested provider is slow.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.fallback = config.get("Routing", "fallback", fallback="false").lower() == "true"
+        self.hedge = config.get("Routing", "hedge", fallback="false").lower() == "true"
+        self.hedge_delay = float(config.get("Routing", "hedge_delay", fallback="10"))
+        self.hedge_percentile = float(config.get("Routing", "hedge_percentile", fallback="95"))
+        self.min_samples = int(config.get("Routing", "min_samples", fallback="20"))
+        order = config.get("Routing", "fallback_order", fallback=",".join(DEFAULT_FALLBACK_ORDER))
+        self.fallback_order = [p.strip() for p in order.split(",") if p.strip()]
+        self.latency = LatencyTracker()
+
+    def is_configured(self, provider: str) -> bool:
+        """A provider is usable when it has a real API key rather than the placeholder."""
+        section = PROVIDER_SECTIONS.get(provider)
+        if not section:
+            return False
+        api_key = self.config.get(section, "api_key", fallback="") or ""
+        return bool(api_key) and not api_key.startswith("your_")
+
+    def chain(self, provider: str) -> List[str]:
+        """Providers to try for a request, starting with the requested one."""
+        if not self.fallback:
+            return [provider]
+        return [provider] + [
+            p for p in self.fallback_order
+            if p != provider and self.is_configured(p)
+        ]
+
+    def hedge_after(self, provider: str) -> float:
+        """Seconds to wait on a provider before hedging to the next one."""
+        samples = self.latency.samples.get(provider)
+        if samples and len(samples) >= self.min_samples:
+            return self.latency.percentile(provider, self.hedge_percentile)
+        return self.hedge_delay
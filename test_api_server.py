@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+from aiohttp.test_utils import TestServer, TestClient
+
+from utils.config_manager import ConfigManager
+from features.api_server import APIServer
+
+
+class StubChatClient:
+    """Stands in for a provider client: echoes the last message in two chunks."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    async def stream_chat_completion(self, conversation, model=None):
+        await asyncio.sleep(self.delay)
+        yield "echo: "
+        yield conversation[-1]["content"]
+
+
+def _make_server(tmp_path, delay=0.0, max_cached_sessions=256):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Routing", "fallback", "false")
+    config.set("Server", "max_cached_sessions", str(max_cached_sessions))
+    server = APIServer(config, sessions_dir=str(tmp_path / "sessions"))
+    server.ai_manager._clients["openai"] = StubChatClient(delay)
+    return server
+
+
+def _parse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = None, None
+        for line in block.splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((event, data))
+    return events
+
+
+async def _chat(client, **body):
+    response = await client.post("/chat", json=body)
+    assert response.status == 200
+    assert response.headers["Content-Type"] == "text/event-stream"
+    return _parse_events(await response.text())
+
+
+def test_chat_streams_events_and_keeps_session(tmp_path):
+    server = _make_server(tmp_path)
+
+    async def run():
+        async with TestClient(TestServer(server.create_app())) as client:
+            events = await _chat(client, message="hello", provider="openai")
+            session_id = events[0][1]["session_id"]
+            assert events[1:3] == [(None, {"chunk": "echo: "}), (None, {"chunk": "hello"})]
+            assert events[-1] == ("done", {"session_id": session_id, "message_count": 2})
+
+            await _chat(client, message="again", provider="openai", session_id=session_id)
+
+            response = await client.get(f"/sessions/{session_id}")
+            conversation = (await response.json())["conversation"]
+            assert [m["content"] for m in conversation] == ["hello", "echo: hello", "again", "echo: again"]
+
+            response = await client.get("/sessions")
+            sessions = (await response.json())["sessions"]
+            assert [s["filename"] for s in sessions] == [f"{session_id}.json"]
+
+    asyncio.run(run())
+
+
+def test_concurrent_sessions_are_served_in_parallel(tmp_path):
+    server = _make_server(tmp_path, delay=0.3)
+
+    async def run():
+        async with TestClient(TestServer(server.create_app())) as client:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await asyncio.gather(*[
+                _chat(client, message=f"m{i}", provider="openai") for i in range(5)
+            ])
+            assert loop.time() - start < 1.0
+            assert all(events[-1][0] == "done" for events in results)
+
+    asyncio.run(run())
+
+
+def test_idle_sessions_are_evicted_and_reloaded(tmp_path):
+    server = _make_server(tmp_path, max_cached_sessions=2)
+
+    async def run():
+        async with TestClient(TestServer(server.create_app())) as client:
+            for session_id in ("a", "b", "c"):
+                await _chat(client, message=f"hi {session_id}", provider="openai", session_id=session_id)
+            assert list(server.sessions) == ["b", "c"]
+            assert server._session_locks == {}
+
+            events = await _chat(client, message="again", provider="openai", session_id="a")
+            assert events[-1] == ("done", {"session_id": "a", "message_count": 4})
+            assert list(server.sessions) == ["c", "a"]
+
+    asyncio.run(run())
+
+
+def test_rejects_invalid_session_id(tmp_path):
+    server = _make_server(tmp_path)
+
+    async def run():
+        async with TestClient(TestServer(server.create_app())) as client:
+            response = await client.get("/sessions/..%2Fconfig")
+            assert response.status in (400, 404)
+            response = await client.post("/chat", json={"message": "hi", "session_id": "../x"})
+            assert response.status == 400
+
+    asyncio.run(run())
@@ -0,0 +1,99 @@
+import asyncio
+
+from utils.config_manager import ConfigManager
+from features.arxiv_search import ArxivSearch
+
+
+class FakeAIManager:
+    default_provider = "openai"
+
+    def __init__(self):
+        self.answering_provider = "openai"
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+
+    def get_default_model(self, provider=None):
+        return "gpt-test"
+
+    async def get_chat_response(self, conversation, provider=None):
+        prompt = conversation[-1]["content"]
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if prompt.startswith("Analyze"):
+            return f"merged {prompt.count('###')} papers"
+        return "summary of " + prompt.split("Title: ")[1].splitlines()[0]
+
+    async def get_chat_response_with_provider(self, conversation, provider=None):
+        return await self.get_chat_response(conversation, provider), self.answering_provider
+
+
+def _papers(ids):
+    return [
+        {"title": f"Paper {i}", "authors": ["A. Author"], "abstract": f"Abstract {i}",
+         "url": f"http://arxiv.org/abs/{i}"}
+        for i in ids
+    ]
+
+
+def _search(tmp_path, ai_manager, **settings):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Cache", "cache_dir", str(tmp_path / "cache"))
+    for key, value in settings.items():
+        config.set("ArXiv", key, value)
+    return ArxivSearch(config, ai_manager)
+
+
+def test_papers_are_summarized_concurrently_then_merged(tmp_path):
+    ai_manager = FakeAIManager()
+    search = _search(tmp_path, ai_manager, analysis_concurrency="3")
+
+    analysis = asyncio.run(search._analyze_papers(_papers(range(8)), "transformers"))
+
+    assert analysis == "merged 8 papers"
+    assert len(ai_manager.prompts) == 9
+    assert 1 < ai_manager.max_active <= 3
+    assert "summary of Paper 5" in ai_manager.prompts[-1]
+
+
+def test_overlapping_results_reuse_cached_summaries(tmp_path):
+    ai_manager = FakeAIManager()
+    search = _search(tmp_path, ai_manager)
+    asyncio.run(search._analyze_papers(_papers(range(5)), "q"))
+    ai_manager.prompts.clear()
+
+    # A new instance shares the on-disk summary cache
+    search = _search(tmp_path, ai_manager)
+    asyncio.run(search._analyze_papers(_papers(range(3, 7)), "q"))
+
+    summarized = [p for p in ai_manager.prompts if not p.startswith("Analyze")]
+    assert len(summarized) == 2
+    assert all("Paper 5" in p or "Paper 6" in p for p in summarized)
+
+
+def test_fallback_summaries_are_not_cached(tmp_path):
+    ai_manager = FakeAIManager()
+    ai_manager.answering_provider = "anthropic"
+    search = _search(tmp_path, ai_manager)
+    asyncio.run(search._analyze_papers(_papers(range(2)), "q"))
+    ai_manager.prompts.clear()
+
+    ai_manager.answering_provider = "openai"
+    asyncio.run(search._analyze_papers(_papers(range(2)), "q"))
+
+    assert len([p for p in ai_manager.prompts if not p.startswith("Analyze")]) == 2
+
+
+def test_large_result_sets_are_reduced_hierarchically(tmp_path):
+    ai_manager = FakeAIManager()
+    search = _search(tmp_path, ai_manager, reduce_batch="4")
+
+    analysis = asyncio.run(search._analyze_papers(_papers(range(10)), "q"))
+
+    reduces = [p for p in ai_manager.prompts if p.startswith("Analyze")]
+    # 10 summaries -> 3 partial merges -> 1 final merge
+    assert len(reduces) == 4
+    assert analysis == "merged 3 papers"
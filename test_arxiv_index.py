@@ -0,0 +1,69 @@
+import asyncio
+
+from features.arxiv_index import ResultIndex
+from test_arxiv_store import _search
+
+
+def _paper(i, categories, published, authors, title="Paper", abstract=""):
+    return {
+        "url": f"http://arxiv.org/abs/{i}",
+        "title": f"{title} {i}",
+        "abstract": abstract,
+        "categories": categories,
+        "published": published,
+        "authors": [f"Author {n}" for n in range(authors)],
+    }
+
+
+PAPERS = [
+    _paper(0, ["cs.LG"], "2024-01-03", 3, abstract="graph networks"),
+    _paper(1, ["cs.CL", "cs.LG"], "2024-01-01", 1, title="Graph"),
+    _paper(2, ["stat.ML"], "2024-01-02", 5),
+]
+
+
+def _urls(papers):
+    return [int(p["url"].rsplit("/", 1)[1]) for p in papers]
+
+
+def test_filter_and_sort_combinations():
+    index = ResultIndex("graph")
+    index.add(PAPERS)
+
+    assert _urls(index.view()) == [0, 1, 2]
+    assert _urls(index.view(category="cs.LG")) == [0, 1]
+    assert _urls(index.view(category="cs")) == [0, 1]
+    assert _urls(index.view(sort_by="date")) == [0, 2, 1]
+    assert _urls(index.view(sort_by="date", descending=False)) == [1, 2, 0]
+    assert _urls(index.view(category="cs.LG", sort_by="authors")) == [0, 1]
+    assert _urls(index.view(sort_by="relevance")) == [1, 0, 2]
+    assert index.categories() == {"cs.LG": 2, "cs.CL": 1, "stat.ML": 1}
+
+
+def test_index_grows_incrementally_and_skips_duplicates():
+    index = ResultIndex()
+    index.add(PAPERS[:2])
+    index.add(PAPERS[1:])
+
+    assert len(index) == 3
+    assert _urls(index.view(sort_by="authors")) == [2, 0, 1]
+    assert _urls(index.view(category="stat.ML")) == [2]
+
+
+def test_filter_and_sort_commands_use_loaded_pages(tmp_path):
+    search = _search(tmp_path, [])
+    shown = []
+
+    async def present(results, query):
+        shown.append(_urls(results))
+
+    search._present_results = present
+    search._reset_view("graph")
+    search.result_index.add(PAPERS)
+
+    asyncio.run(search._handle_command("/filter cs.LG"))
+    asyncio.run(search._handle_command("/sort date asc"))
+    asyncio.run(search._handle_command("/filter"))
+
+    assert shown == [[0, 1], [1, 0], [1, 2, 0]]
+    assert search.client.calls == 0
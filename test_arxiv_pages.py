@@ -0,0 +1,87 @@
+import asyncio
+
+from features.arxiv_pages import ResultPage, ResultPager
+from test_arxiv_store import FakeClient, _result, _search
+
+
+def _pager(total, page_size=3, max_cached_pages=5, delay=0.0):
+    fetched = []
+    formatted = []
+
+    def format_item(i):
+        formatted.append(i)
+        return {"n": i}
+
+    async def fetch_page(page):
+        fetched.append(page)
+        await asyncio.sleep(delay)
+        start = page * page_size
+        return ResultPage(range(start, min(start + page_size, total)), format_item)
+
+    return ResultPager(fetch_page, page_size, max_cached_pages), fetched, formatted
+
+
+def test_next_page_is_prefetched_but_formatted_lazily():
+    async def run():
+        pager, fetched, formatted = _pager(10, delay=0.01)
+        first = await pager.get(0)
+        await asyncio.sleep(0.05)  # prefetch of page 1 completes in the background
+        assert fetched == [0, 1]
+        assert formatted == [0, 1, 2]
+
+        second = await pager.next()
+        await asyncio.sleep(0)
+        assert fetched == [0, 1, 2]  # page 1 came from the prefetch, page 2 is now prefetching
+        assert [r["n"] for r in second] == [3, 4, 5]
+        assert await pager.prev() == first
+        pager.close()
+
+    asyncio.run(run())
+
+
+def test_last_page_stops_prefetching():
+    async def run():
+        pager, fetched, _ = _pager(5)
+        await pager.get(0)
+        last = await pager.next()
+        assert [r["n"] for r in last] == [3, 4]
+        assert not pager.has_next
+        await asyncio.sleep(0)
+        assert fetched == [0, 1]
+
+    asyncio.run(run())
+
+
+def test_memory_is_bounded_to_recent_pages():
+    async def run():
+        pager, fetched, _ = _pager(100, max_cached_pages=2)
+        for _ in range(6):
+            await pager.next()
+        assert len(pager._pages) <= 2
+        pager.close()
+
+    asyncio.run(run())
+
+
+def test_search_pages_use_offsets_and_local_cache(tmp_path):
+    results = [_result(i, f"Paper {i}", "Abstract") for i in range(25)]
+    search = _search(tmp_path, results)
+
+    async def run():
+        pager = search._open_pager("query")
+        first = await pager.get(0)
+        second = await pager.next()
+        third = await pager.next()
+        search.pager.close()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert [len(first), len(second), len(third)] == [10, 10, 5]
+    assert second[0]["url"] == "http://arxiv.org/abs/10"
+    assert not search.pager.has_next
+
+    # Viewed pages were stored, so revisiting them needs no API call
+    calls = search.client.calls
+    assert asyncio.run(search._search_arxiv("query", page=1)) == second
+    assert search.client.calls == calls
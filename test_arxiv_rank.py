@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+
+from features.arxiv_rank import SemanticRanker
+from models.embeddings import HashingEmbedder
+from utils.embedding_store import EmbeddingStore
+from test_arxiv_store import _result, _search
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Stands in for a provider endpoint and records every text it is asked to embed."""
+
+    def __init__(self, dim=256):
+        super().__init__(dim)
+        self.texts = []
+
+    async def embed(self, texts):
+        self.texts.extend(texts)
+        return await super().embed(texts)
+
+
+def _paper(entry_id, title, abstract):
+    return {"url": f"http://arxiv.org/abs/{entry_id}", "title": title, "abstract": abstract,
+            "authors": ["A. Author"], "categories": ["cs.LG"], "published": "2024-01-01"}
+
+
+PAPERS = [
+    _paper("0", "Diffusion models for audio", "We generate speech and music with diffusion."),
+    _paper("1v1", "Sparse attention for long documents",
+           "Sparse attention lets transformers process long documents in linear time."),
+    _paper("2", "Graph neural networks for molecules", "Message passing predicts molecular properties."),
+    _paper("1v2", "Sparse attention for long documents",
+           "Sparse attention lets transformers process long documents in linear time!"),
+]
+
+
+def test_store_persists_vectors_and_skips_known_ids(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model/a", 4)
+    store.add(["a", "b"], np.array([[1, 0, 0, 0], [0, 1, 0, 0]]))
+    store.add(["b", "c"], np.array([[9, 9, 9, 9], [0, 0, 1, 0]]))
+
+    reopened = EmbeddingStore(str(tmp_path), "model/a", 4)
+
+    assert len(reopened) == 3
+    assert reopened.missing(["a", "d", "d"]) == ["d"]
+    assert reopened.get(["c", "b"]).tolist() == [[0, 0, 1, 0], [0, 1, 0, 0]]
+
+
+def test_store_drops_ids_without_vectors(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "m", 2)
+    store.add(["a", "b"], np.ones((2, 2)))
+    # Simulate a crash that lost the tail of the vector file
+    with open(store.vectors_path, "r+b") as f:
+        f.truncate(8)
+
+    reopened = EmbeddingStore(str(tmp_path), "m", 2)
+    reopened.add(["b"], np.full((1, 2), 2.0))
+
+    assert reopened.get(["a", "b"]).tolist() == [[1, 1], [2, 2]]
+
+
+def test_rank_orders_by_similarity_and_collapses_duplicates(tmp_path):
+    embedder = CountingEmbedder()
+    ranker = SemanticRanker(embedder, str(tmp_path), dedup_threshold=0.9)
+
+    ranked = asyncio.run(ranker.rank("sparse attention for long documents", PAPERS))
+
+    assert ranked[0]["url"] == "http://arxiv.org/abs/1v1"
+    assert len(ranked) == 3
+    assert "http://arxiv.org/abs/1v2" not in [paper["url"] for paper in ranked]
+
+    # Paper vectors are cached; a new query only embeds itself
+    embedder.texts.clear()
+    ranked = asyncio.run(ranker.rank("diffusion audio", PAPERS))
+    assert embedder.texts == ["diffusion audio"]
+    assert ranked[0]["url"] == "http://arxiv.org/abs/0"
+
+    # A fresh ranker reads the vectors back from disk
+    embedder = CountingEmbedder()
+    asyncio.run(SemanticRanker(embedder, str(tmp_path)).rank("graphs", PAPERS))
+    assert embedder.texts == ["graphs"]
+
+
+def test_search_reranks_when_enabled(tmp_path):
+    results = [
+        _result(0, "Diffusion models for audio", "Audio generation with diffusion."),
+        _result(1, "Sparse attention for long documents", "We make attention sparse."),
+    ]
+    plain = _search(tmp_path / "plain", results)
+    reranked = _search(tmp_path / "reranked", results, rerank="true")
+
+    page = asyncio.run(plain._search_arxiv("sparse attention"))
+    assert asyncio.run(plain._rank_results(page, "sparse attention")) == page
+
+    page = asyncio.run(reranked._search_arxiv("sparse attention"))
+    ranked = asyncio.run(reranked._rank_results(page, "sparse attention"))
+    assert [paper["title"] for paper in ranked] == [
+        "Sparse attention for long documents", "Diffusion models for audio"
+    ]
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from utils.config_manager import ConfigManager
+from features.arxiv_search import ArxivSearch
+
+
+def _result(i, title, abstract):
+    return SimpleNamespace(
+        title=title,
+        authors=[SimpleNamespace(name=f"Author {i}")],
+        summary=abstract,
+        entry_id=f"http://arxiv.org/abs/{i}",
+        pdf_url=f"http://arxiv.org/pdf/{i}",
+        published=datetime(2024, 1, i + 1),
+        updated=datetime(2024, 2, i + 1),
+        categories=["cs.LG"],
+        comment=None,
+        journal_ref=None,
+        doi=None,
+    )
+
+
+class FakeClient:
+    def __init__(self, results, fail=False):
+        self._results = results
+        self.fail = fail
+        self.calls = 0
+
+    def results(self, search, offset=0):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("arXiv unreachable")
+        return iter(self._results[offset:search.max_results])
+
+
+def _search(tmp_path, results, **settings):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Cache", "cache_dir", str(tmp_path / "cache"))
+    for key, value in settings.items():
+        config.set("ArXiv", key, value)
+    search = ArxivSearch(config)
+    search.client = FakeClient(results)
+    return search
+
+
+RESULTS = [
+    _result(0, "Sparse attention for long documents", "We make attention sparse."),
+    _result(1, "Diffusion models for audio", "Audio generation with diffusion."),
+]
+
+
+def test_repeated_queries_are_served_locally(tmp_path):
+    search = _search(tmp_path, RESULTS)
+
+    first = asyncio.run(search._search_arxiv("attention"))
+    second = asyncio.run(search._search_arxiv("  attention "))
+
+    assert search.client.calls == 1
+    assert first == second
+    assert first[0]["url"] == "http://arxiv.org/abs/0"
+    assert first[0]["updated"] == "2024-02-01"
+
+
+def test_expired_queries_go_back_to_arxiv(tmp_path):
+    search = _search(tmp_path, RESULTS, query_ttl="-1")
+
+    asyncio.run(search._search_arxiv("attention"))
+    asyncio.run(search._search_arxiv("attention"))
+
+    assert search.client.calls == 2
+
+
+def test_network_failure_falls_back_to_local_store(tmp_path):
+    search = _search(tmp_path, RESULTS, query_ttl="-1")
+    asyncio.run(search._search_arxiv("attention"))
+    search.client.fail = True
+
+    # Stale result list for the same query
+    assert len(asyncio.run(search._search_arxiv("attention"))) == 2
+    # Full-text match for a query never sent before
+    assert [p["title"] for p in asyncio.run(search._search_arxiv("diffusion audio"))] == [
+        "Diffusion models for audio"
+    ]
+
+
+def test_offline_mode_uses_full_text_index(tmp_path):
+    search = _search(tmp_path, RESULTS)
+    asyncio.run(search._search_arxiv("all"))
+
+    offline = _search(tmp_path, [], offline="true")
+    results = asyncio.run(offline._search_arxiv("ti:sparse AND attention"))
+
+    assert offline.client.calls == 0
+    assert [p["url"] for p in results] == ["http://arxiv.org/abs/0"]
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.config_manager import ConfigManager
+from models.openai_client import OpenAIClient
+from models.anthropic_client import AnthropicClient
+from models.groq_client import GroqClient
+
+STUB_DELAY = 0.5
+CONCURRENT_CALLS = 8
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Answers OpenAI/Groq chat completions and Anthropic messages after a fixed delay."""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if request.get("stream"):
+            self._send_stream()
+            return
+
+        time.sleep(STUB_DELAY)
+
+        if self.path.endswith("/messages"):
+            body = {
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "model": "stub",
+                "content": [{"type": "text", "text": "stub reply"}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": 1, "output_tokens": 2}
+            }
+        else:
+            body = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "stub",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "stub reply"},
+                    "finish_reason": "stop"
+                }]
+            }
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self):
+        """Send "stub " immediately and "reply" after STUB_DELAY as server-sent events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        anthropic = self.path.endswith("/messages")
+        if anthropic:
+            self._send_event("message_start", {
+                "type": "message_start",
+                "message": {
+                    "id": "msg_stub", "type": "message", "role": "assistant",
+                    "model": "stub", "content": [], "stop_reason": None,
+                    "stop_sequence": None, "usage": {"input_tokens": 1, "output_tokens": 0}
+                }
+            })
+            self._send_event("content_block_start", {
+                "type": "content_block_start", "index": 0,
+                "content_block": {"type": "text", "text": ""}
+            })
+
+        for i, text in enumerate(["stub ", "reply"]):
+            if i:
+                time.sleep(STUB_DELAY)
+            if anthropic:
+                self._send_event("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": text}
+                })
+            else:
+                self._send_event(None, {
+                    "id": "chatcmpl-stub", "object": "chat.completion.chunk",
+                    "created": 0, "model": "stub",
+                    "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]
+                })
+
+        if anthropic:
+            self._send_event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            self._send_event("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": 2}
+            })
+            self._send_event("message_stop", {"type": "message_stop"})
+        else:
+            self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_event(self, event, data):
+        if event:
+            self.wfile.write(f"event: {event}\n".encode("utf-8"))
+        self.wfile.write(f"data: {json.dumps(data)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+def _start_stub_server():
+    server = StubProviderServer(("127.0.0.1", 0), StubProviderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _make_config(tmp_path, base_url):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("OpenAI", "base_url", base_url)
+    config.set("Anthropic", "base_url", base_url)
+    config.set("Groq", "base_url", base_url)
+    return config
+
+
+def _run_concurrently(client):
+    async def run():
+        conversation = [{"role": "user", "content": "hello"}]
+        start = time.perf_counter()
+        replies = await asyncio.gather(*[
+            client.get_chat_completion(conversation) for _ in range(CONCURRENT_CALLS)
+        ])
+        return replies, time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def test_concurrent_calls_finish_in_about_one_call_time(tmp_path):
+    server = _start_stub_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        config = _make_config(tmp_path, base_url)
+
+        for client in (OpenAIClient(config), AnthropicClient(config), GroqClient(config)):
+            replies, elapsed = _run_concurrently(client)
+            assert replies == ["stub reply"] * CONCURRENT_CALLS
+            # Sequential calls would take CONCURRENT_CALLS * STUB_DELAY seconds
+            assert elapsed < STUB_DELAY * 3, f"{type(client).__name__} took {elapsed:.2f}s"
+    finally:
+        server.shutdown()
+
+
+def test_stream_yields_first_chunk_before_completion(tmp_path):
+    server = _start_stub_server()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        config = _make_config(tmp_path, base_url)
+
+        async def run(client):
+            conversation = [{"role": "user", "content": "hello"}]
+            chunks = []
+            first_chunk_at = None
+            start = time.perf_counter()
+            async for chunk in client.stream_chat_completion(conversation):
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter() - start
+                chunks.append(chunk)
+            return "".join(chunks), first_chunk_at
+
+        for client in (OpenAIClient(config), AnthropicClient(config), GroqClient(config)):
+            text, first_chunk_at = asyncio.run(run(client))
+            assert text == "stub reply"
+            assert first_chunk_at < STUB_DELAY, f"{type(client).__name__} first chunk after {first_chunk_at:.2f}s"
+    finally:
+        server.shutdown()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from utils.config_manager import ConfigManager
+from features.batch import BatchRunner
+
+
+class FakeClient:
+    async def get_chat_completion(self, conversation, model=None):
+        prompt = conversation[-1]["content"]
+        await asyncio.sleep(float(prompt))
+        if prompt == "0.03":
+            raise RuntimeError("boom")
+        return f"reply to {prompt}"
+
+
+def _make_runner(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Routing", "fallback", "false")
+    runner = BatchRunner(config)
+    runner.ai_manager._clients["openai"] = FakeClient()
+    return runner
+
+
+def _write_input(path, delays):
+    with open(path, "w") as f:
+        for i, delay in enumerate(delays):
+            f.write(json.dumps({"id": f"r{i}", "type": "chat", "provider": "openai", "prompt": delay}) + "\n")
+
+
+def _read_output(path):
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def test_results_written_in_completion_order(tmp_path):
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_input(input_path, ["0.2", "0.01", "0.1"])
+
+    counts = asyncio.run(_make_runner(tmp_path).run(str(input_path), str(output_path)))
+
+    records = _read_output(output_path)
+    assert [r["id"] for r in records] == ["r1", "r2", "r0"]
+    assert records[0]["result"] == "reply to 0.01"
+    assert counts == {"ok": 3, "error": 0, "skipped": 0}
+
+
+def test_resume_skips_completed_ids_and_retries_failures(tmp_path):
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_input(input_path, ["0.01", "0.03", "0.02"])
+    with open(output_path, "w") as f:
+        f.write(json.dumps({"id": "r0", "status": "ok", "result": "done"}) + "\n")
+        f.write('{"id": "r2", "stat')  # truncated by a crash
+
+    counts = asyncio.run(_make_runner(tmp_path).run(str(input_path), str(output_path)))
+
+    assert counts == {"ok": 1, "error": 1, "skipped": 1}
+    statuses = {r["id"]: r["status"] for r in _read_output(output_path)[1:]}
+    assert statuses == {"r1": "error", "r2": "ok"}
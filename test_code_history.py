@@ -0,0 +1,130 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from features.code_history import ChatHistoryWindow
+from utils.config_manager import ConfigManager
+
+
+def _history(exchanges, size=400):
+    history = []
+    for i in range(exchanges):
+        history.append({"role": "user", "content": f"request {i}"})
+        history.append({"role": "model", "content": f"reply {i} " + "x" * size})
+    return history
+
+
+def test_window_keeps_recent_exchanges_and_records_metrics():
+    window = ChatHistoryWindow(max_turns=2)
+
+    sent = asyncio.run(window.fit(_history(5)))
+
+    assert [m["content"] for m in sent if m["role"] == "user"] == ["request 3", "request 4"]
+    assert window.last["messages"] == 4
+    assert window.stats()["tokens_dropped"] > window.stats()["tokens_sent"]
+
+    # A token bound trims further, oldest first
+    window = ChatHistoryWindow(max_turns=4, max_tokens=150)
+    sent = asyncio.run(window.fit(_history(5)))
+    assert [m["content"] for m in sent if m["role"] == "user"] == ["request 4"]
+
+    assert asyncio.run(ChatHistoryWindow(max_turns=0).fit(_history(3))) == []
+
+
+def test_dropped_exchanges_are_summarized_and_cached():
+    prompts = []
+
+    async def summarizer(prompt):
+        prompts.append(prompt)
+        return "made a CLI in cli.py"
+
+    window = ChatHistoryWindow(max_turns=1, summarize=True, summarizer=summarizer)
+    history = _history(3)
+
+    sent = asyncio.run(window.fit(history))
+    asyncio.run(window.fit(history))
+
+    assert len(prompts) == 1
+    assert "request 0" in prompts[0] and "request 2" not in prompts[0]
+    assert sent[0]["content"] == "Summary of earlier requests for this project: made a CLI in cli.py"
+    assert [m["content"] for m in sent[2:] if m["role"] == "user"] == ["request 2"]
+
+
+class FakeChat:
+    """Mimics a Gemini ChatSession: history of contents, and the reply appended after streaming."""
+
+    def __init__(self, history, reply):
+        self.reply = reply
+        self.sent_history = []
+        self.history = history
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, contents):
+        self._history = [
+            content if not isinstance(content, dict) else
+            SimpleNamespace(role=content["role"], parts=[SimpleNamespace(text=p) for p in content["parts"]])
+            for content in contents
+        ]
+
+    async def send_message_async(self, prompt, stream=False):
+        self.sent_history.append(len(self._history))
+        reply = self.reply
+
+        async def chunks():
+            yield SimpleNamespace(parts=[SimpleNamespace(text=reply)])
+            self._history += [
+                SimpleNamespace(role="user", parts=[SimpleNamespace(text=prompt)]),
+                SimpleNamespace(role="model", parts=[SimpleNamespace(text=reply)]),
+            ]
+        return chunks()
+
+
+class FakeModel:
+    def __init__(self):
+        self.chats = []
+
+    def start_chat(self, history):
+        chat = FakeChat(history, json.dumps({"files": [{"path": "main.py", "content": "print(1)\n"}]}))
+        self.chats.append(chat)
+        return chat
+
+
+def _generator(tmp_path, **settings):
+    pytest.importorskip("google.generativeai")
+    from features.code_gen import CodeGenerator
+
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Gemini", "api_key", "test-key")
+    for key, value in settings.items():
+        config.set("CodeGen", key, value)
+    generator = CodeGenerator(config)
+    generator.model = FakeModel()
+    return generator
+
+
+def test_each_project_gets_its_own_chat(tmp_path):
+    generator = _generator(tmp_path)
+
+    for name in ("one", "two", "one"):
+        asyncio.run(generator._generate_project_files("demo", str(tmp_path / name)))
+
+    first, second = generator.model.chats
+    assert first.sent_history == [0, 2]
+    assert second.sent_history == [0]
+
+
+def test_session_scope_shares_one_bounded_chat(tmp_path):
+    generator = _generator(tmp_path, history_scope="session", history_turns="1")
+
+    for name in ("one", "two", "three"):
+        asyncio.run(generator._generate_project_files("demo", str(tmp_path / name)))
+
+    assert len(generator.model.chats) == 1
+    assert generator.model.chats[0].sent_history == [0, 2, 2]
+    assert generator.history_window.stats()["calls"] == 3
@@ -0,0 +1,78 @@
+import asyncio
+
+from features.code_review import CodeReviewer
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stateless generate_content_async stand-in that records prompts and concurrency."""
+
+    def __init__(self, fail_on=None):
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_on = fail_on
+
+    async def generate_content_async(self, prompt):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if self.fail_on and self.fail_on in prompt:
+            raise ConnectionError("model unavailable")
+        if prompt.startswith("Combine"):
+            return FakeResponse(f"merged {prompt.count('### ')} reviews")
+        files = [line[4:-4] for line in prompt.splitlines() if line.startswith("=== ")]
+        return FakeResponse("findings for " + ", ".join(files))
+
+
+def _files(count, size):
+    return {f"pkg/module_{i}.py": f"# module {i}\n" + "x = 1\n" * (size // 6) for i in range(count)}
+
+
+def test_files_are_packed_into_bounded_chunks():
+    reviewer = CodeReviewer(FakeModel(), max_chunk_tokens=500)
+    files = _files(6, 800)
+    files["pkg/big.py"] = "y = 2\n" * 1000
+
+    chunks = reviewer.chunk_files(files)
+
+    for chunk in chunks:
+        assert sum(len(label) + len(text) for label, text in chunk) // 4 <= 500
+    labels = [label for chunk in chunks for label, _ in chunk]
+    assert labels[:6] == list(files)[:6]
+    assert labels[6].startswith("pkg/big.py (lines 1-")
+    assert "".join(text for chunk in chunks for label, text in chunk if label.startswith("pkg/big.py")) == files["pkg/big.py"]
+
+
+def test_review_runs_chunks_concurrently_and_merges():
+    model = FakeModel()
+    reviewer = CodeReviewer(model, max_chunk_tokens=500, concurrency=3, merge_batch=3)
+
+    review = asyncio.run(reviewer.review("demo", _files(12, 1500)))
+
+    chunk_prompts = [p for p in model.prompts if p.startswith("Review")]
+    assert len(chunk_prompts) == 12
+    assert model.max_active == 3
+    # Every chunk prompt names the whole project but carries only its own files
+    assert all("pkg/module_11.py" in p.split("Files in this part")[0] for p in chunk_prompts)
+    assert all(p.count("=== ") == 1 for p in chunk_prompts)
+    # 12 findings merge in groups of 3, then 4 partial merges merge in two groups, then once more
+    assert review == "merged 2 reviews"
+
+
+def test_single_chunk_needs_no_merge_and_failures_are_skipped():
+    model = FakeModel()
+    assert asyncio.run(CodeReviewer(model).review("demo", {"a.py": "pass\n"})) == "findings for a.py"
+    assert len(model.prompts) == 1
+
+    model = FakeModel(fail_on="=== pkg/module_0.py ===")
+    review = asyncio.run(CodeReviewer(model, max_chunk_tokens=500).review("demo", _files(3, 1500)))
+    merge = [p for p in model.prompts if p.startswith("Combine")][0]
+    assert "module_0" not in merge.split("Partial reviews:")[1]
+    assert review == "merged 2 reviews"
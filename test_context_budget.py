@@ -0,0 +1,76 @@
+import asyncio
+
+from utils.config_manager import ConfigManager
+from models.context_budget import ContextBudget, TOKEN_CACHE_SIZE
+
+
+def _make_config(tmp_path, summarize=False):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Models.openai.small", "max_tokens", "100")
+    config.set("Models.openai.small", "context_window", "1000")
+    config.set("Context", "safety_margin", "0")
+    config.set("Context", "summary_chunk", "4")
+    config.set("Context", "summarize", str(summarize).lower())
+    return config
+
+
+def _conversation(turns):
+    messages = [{"role": "system", "content": "You are helpful."}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"{i:03d}" + "x" * 396})
+    return messages
+
+
+def test_short_conversation_is_sent_unchanged(tmp_path):
+    budget = ContextBudget(_make_config(tmp_path))
+    conversation = _conversation(3)
+    assert asyncio.run(budget.fit(conversation, "openai", "small")) == conversation
+
+
+def test_old_turns_dropped_and_system_pinned(tmp_path):
+    budget = ContextBudget(_make_config(tmp_path))
+    conversation = _conversation(20)
+
+    fitted = asyncio.run(budget.fit(conversation, "openai", "small"))
+
+    assert fitted[0] == conversation[0]
+    assert fitted[-1] == conversation[-1]
+    assert sum(budget.count_tokens(msg) for msg in fitted) <= 900
+    assert len(fitted) < len(conversation)
+
+
+def test_unknown_model_is_not_trimmed(tmp_path):
+    budget = ContextBudget(_make_config(tmp_path))
+    conversation = _conversation(20)
+    assert asyncio.run(budget.fit(conversation, "gemini", "unknown-model")) == conversation
+
+
+def test_dropped_spans_are_summarized_once(tmp_path):
+    calls = []
+
+    async def summarizer(messages):
+        calls.append(messages)
+        return "earlier turns"
+
+    budget = ContextBudget(_make_config(tmp_path, summarize=True), summarizer=summarizer)
+    conversation = _conversation(20)
+
+    fitted = asyncio.run(budget.fit(conversation, "openai", "small"))
+    assert any(msg["content"] == "Summary of earlier conversation: earlier turns" for msg in fitted)
+
+    first_calls = len(calls)
+    asyncio.run(budget.fit(conversation, "openai", "small"))
+    assert len(calls) == first_calls
+
+
+def test_token_cache_is_bounded(tmp_path):
+    budget = ContextBudget(_make_config(tmp_path))
+    first = {"role": "user", "content": "x" * 40}
+    assert budget.count_tokens(first) == 14
+
+    for i in range(TOKEN_CACHE_SIZE + 10):
+        budget.count_tokens({"role": "user", "content": str(i)})
+
+    assert len(budget._token_cache) == TOKEN_CACHE_SIZE
+    assert ("user", first["content"]) not in budget._token_cache
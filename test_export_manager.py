@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import json
+import os
+import tracemalloc
+
+import pytest
+
+from utils.export_manager import ExportManager
+
+
+def _messages(count, size=20):
+    for i in range(count):
+        yield {"role": "user" if i % 2 == 0 else "assistant", "content": f"{i} " + "x" * size}
+
+
+def _read(manager, subdir, filename):
+    path = os.path.join(manager.export_dir, subdir, filename)
+    opener = gzip.open if filename.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_json_and_jsonl_exports_round_trip(tmp_path):
+    manager = ExportManager(str(tmp_path))
+    conversation = list(_messages(3))
+
+    data = json.loads(_read(manager, "conversations", manager.export_conversation(conversation, "json")))
+    assert data["conversation"] == conversation
+    assert "timestamp" in data
+
+    lines = _read(manager, "conversations", manager.export_conversation(iter(conversation), "jsonl")).splitlines()
+    assert [json.loads(line) for line in lines] == conversation
+
+    empty = json.loads(_read(manager, "conversations", manager.export_conversation([], "json", name="empty")))
+    assert empty["conversation"] == []
+
+
+def test_markdown_and_text_layout(tmp_path):
+    manager = ExportManager(str(tmp_path))
+    conversation = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+    md = _read(manager, "conversations", manager.export_conversation(conversation, "md"))
+    assert md.startswith("# AI Assistant Conversation\n\n**Date:** ")
+    assert md.endswith("## User\n\nhi\n\n---\n\n## Assistant\n\nhello\n\n---\n\n")
+
+    txt = _read(manager, "conversations", manager.export_conversation(conversation, "txt", name="t"))
+    assert txt.endswith("USER:\nhi\n\n" + "=" * 50 + "\n\nASSISTANT:\nhello\n\n" + "=" * 50 + "\n\n")
+
+
+def test_gzip_search_results_export(tmp_path):
+    manager = ExportManager(str(tmp_path))
+    results = [{"title": "Paper", "authors": ["A", "B"], "abstract": "text", "url": "http://x"}]
+
+    filename = asyncio.run(manager.export_search_results_async(results, "arxiv", "q", "json", compress=True))
+
+    assert filename.endswith(".json.gz")
+    data = json.loads(_read(manager, "arxiv_search", filename))
+    assert data["query"] == "q" and data["results"] == results
+
+
+def test_unsupported_format_writes_nothing(tmp_path):
+    manager = ExportManager(str(tmp_path))
+    with pytest.raises(ValueError):
+        manager.export_conversation(list(_messages(1)), "pdf")
+    assert os.listdir(tmp_path / "conversations") == []
+
+
+def test_streaming_export_memory_is_bounded(tmp_path):
+    manager = ExportManager(str(tmp_path))
+
+    tracemalloc.start()
+    filename = manager.export_conversation(_messages(20000, size=1000), "json")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # About 20 MB is written; only a message and the write buffer are held at a time
+    assert os.path.getsize(tmp_path / "conversations" / filename) > 20_000_000
+    assert peak < 2_000_000
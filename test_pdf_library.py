@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.pdf_library import PdfLibrary
+from test_arxiv_analysis import FakeAIManager, _papers, _search
+
+
+def make_pdf(pages):
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+PDFS = {
+    "/pdf/0": make_pdf(["Sparse attention scales linearly", "Results on long documents"]),
+    "/pdf/1": make_pdf(["Diffusion for audio synthesis"]),
+    # Same file served from a mirror URL
+    "/mirror/0": make_pdf(["Sparse attention scales linearly", "Results on long documents"]),
+}
+
+
+class PdfHandler(BaseHTTPRequestHandler):
+    active = 0
+    max_active = 0
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with PdfHandler.lock:
+            PdfHandler.requests += 1
+            PdfHandler.active += 1
+            PdfHandler.max_active = max(PdfHandler.max_active, PdfHandler.active)
+        try:
+            time.sleep(0.05)
+            body = PDFS.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with PdfHandler.lock:
+                PdfHandler.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    PdfHandler.active = PdfHandler.max_active = PdfHandler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PdfHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _paper(i, url):
+    return {"url": f"http://arxiv.org/abs/{i}", "pdf_url": url, "title": f"Paper {i}",
+            "authors": ["A. Author"], "abstract": f"Abstract {i}"}
+
+
+def test_pdfs_are_fetched_concurrently_and_stored_by_content(tmp_path):
+    server, base = _serve()
+    try:
+        library = PdfLibrary(str(tmp_path), concurrency=2)
+        papers = [
+            _paper(0, f"{base}/pdf/0"),
+            _paper(1, f"{base}/pdf/1"),
+            _paper(2, f"{base}/mirror/0"),
+            _paper(3, f"{base}/missing"),
+        ]
+
+        outcomes = asyncio.run(library.fetch_many(papers))
+
+        assert outcomes == {p["url"]: p["url"] != "http://arxiv.org/abs/3" for p in papers}
+        assert PdfHandler.max_active == 2
+        assert len([f for f in (tmp_path / "pdfs").iterdir() if f.suffix == ".pdf"]) == 2
+        assert library.get_chunks("http://arxiv.org/abs/0") == [
+            "Sparse attention scales linearly", "Results on long documents"
+        ]
+        assert library.get_chunks("http://arxiv.org/abs/2") == library.get_chunks("http://arxiv.org/abs/0")
+        assert library.is_extracted("http://arxiv.org/abs/1")
+
+        # Everything is cached: a second pass makes no requests
+        requests = PdfHandler.requests
+        asyncio.run(library.fetch_many(papers[:3]))
+        assert PdfHandler.requests == requests
+    finally:
+        server.shutdown()
+
+
+def test_interrupted_extraction_resumes(tmp_path):
+    server, base = _serve()
+    try:
+        library = PdfLibrary(str(tmp_path))
+        asyncio.run(library.fetch_many([_paper(0, f"{base}/pdf/0")]))
+        sha256 = library._document("http://arxiv.org/abs/0")
+
+        # Pretend the process died after the first page
+        library.db.execute("UPDATE extracts SET pages_done = 1 WHERE sha256 = ?", (sha256,))
+        library.db.execute("DELETE FROM chunks WHERE page = 1")
+        library.db.commit()
+        library._extract(sha256)
+
+        assert library.get_text("http://arxiv.org/abs/0", 1000) == (
+            "Sparse attention scales linearly\n\nResults on long documents"
+        )
+        assert library.get_text("http://arxiv.org/abs/0", 40) == "Sparse attention scales linearly"
+    finally:
+        server.shutdown()
+
+
+def test_analysis_uses_extracted_text(tmp_path):
+    server, base = _serve()
+    try:
+        ai_manager = FakeAIManager()
+        search = _search(tmp_path, ai_manager)
+        papers = _papers(range(2))
+        papers[0]["pdf_url"] = f"{base}/pdf/0"
+
+        asyncio.run(search.pdfs.fetch_many(papers[:1]))
+        asyncio.run(search._analyze_papers(papers, "q"))
+
+        summaries = [p for p in ai_manager.prompts if not p.startswith("Analyze")]
+        assert sum("Full text" in p and "Sparse attention" in p for p in summaries) == 1
+    finally:
+        server.shutdown()
+
+
+def test_partly_extracted_papers_use_the_abstract(tmp_path):
+    server, base = _serve()
+    try:
+        ai_manager = FakeAIManager()
+        search = _search(tmp_path, ai_manager)
+        papers = _papers(range(1))
+        papers[0]["pdf_url"] = f"{base}/pdf/0"
+        asyncio.run(search.pdfs.fetch_many(papers))
+        sha256 = search.pdfs._document(papers[0]["url"])
+
+        # Extraction still in progress: only the first page is done
+        search.pdfs.db.execute("UPDATE extracts SET pages_done = 1 WHERE sha256 = ?", (sha256,))
+        search.pdfs.db.commit()
+        asyncio.run(search._analyze_papers(papers, "q"))
+
+        summaries = [p for p in ai_manager.prompts if not p.startswith("Analyze")]
+        assert len(summaries) == 1 and "Full text" not in summaries[0]
+    finally:
+        server.shutdown()
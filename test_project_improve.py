@@ -0,0 +1,121 @@
+import asyncio
+import difflib
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils.config_manager import ConfigManager
+from utils.project_manifest import ProjectManifest, MANIFEST_FILE
+
+
+def _write_project(root, count=20):
+    for i in range(count):
+        path = root / "pkg" / f"module_{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'def handler_{i}(value):\n    """Handle {i}."""\n    return value + {i}\n')
+    (root / "pkg" / "config.py").write_text("TIMEOUT = 10\nRETRIES = 3\n")
+    (root / "README.md").write_text("# Demo\n")
+
+
+def test_manifest_rehashes_only_changed_files_and_flags_user_edits(tmp_path, monkeypatch):
+    _write_project(tmp_path)
+    manifest = ProjectManifest(str(tmp_path))
+    files = manifest.scan()
+    assert len(files) == 22 and not manifest.changed
+    assert (tmp_path / MANIFEST_FILE).exists()
+
+    (tmp_path / "pkg" / "config.py").write_text("TIMEOUT = 30\nRETRIES = 3\n")
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda path, *a, **k: opened.append(str(path)) or real_open(path, *a, **k))
+    manifest = ProjectManifest(str(tmp_path))
+    manifest.scan()
+
+    assert manifest.changed == {"pkg/config.py"}
+    assert [path for path in opened if path.endswith(".py")] == [str(tmp_path / "pkg" / "config.py")]
+
+
+def test_relevant_files_fit_the_budget(tmp_path):
+    _write_project(tmp_path)
+    manifest = ProjectManifest(str(tmp_path))
+    manifest.scan()
+
+    selected = manifest.select_relevant("Raise the TIMEOUT in config.py and fix handler_3", 200)
+
+    assert list(selected)[0] == "pkg/config.py"
+    assert "pkg/module_3.py" in selected
+    assert len(selected) < 22
+
+
+class FakeChat:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+        self.history = []
+
+    async def send_message_async(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        reply = self.replies.pop(0)
+
+        async def chunks():
+            for i in range(0, len(reply), 50):
+                yield SimpleNamespace(parts=[SimpleNamespace(text=reply[i:i + 50])])
+        return chunks()
+
+
+def _generator(tmp_path, chat):
+    pytest.importorskip("google.generativeai")
+    from features.code_gen import CodeGenerator
+
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Gemini", "api_key", "test-key")
+    config.set("CodeGen", "improve_context_tokens", "300")
+    generator = CodeGenerator(config)
+    generator._chat_for = lambda project_dir: chat
+    return generator
+
+
+def _diff(old, new):
+    return "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True)))
+
+
+def test_improve_applies_patches_and_retries_failures(tmp_path):
+    project = tmp_path / "project"
+    _write_project(project)
+    config_py = (project / "pkg" / "config.py").read_text()
+    module_3 = (project / "pkg" / "module_3.py").read_text()
+    reply = json.dumps({"files": [
+        {"path": "pkg/config.py", "action": "patch", "diff": _diff(config_py, config_py.replace("10", "30"))},
+        {"path": "pkg/module_3.py", "action": "patch", "diff": "@@ -1,1 +1,1 @@\n-def nothing_like_it():\n+x\n"},
+        {"path": "pkg/module_19.py", "action": "delete"},
+        {"path": "pkg/retry.py", "action": "create", "content": "ATTEMPTS = 3\n"},
+    ]})
+    retry = json.dumps({"files": [
+        {"path": "pkg/module_3.py", "action": "replace", "content": module_3.replace("+ 3", "* 3")},
+    ]})
+    chat = FakeChat([reply, retry])
+    generator = _generator(tmp_path, chat)
+
+    result = asyncio.run(generator.improve_project(str(project), "Raise the TIMEOUT in config.py and fix handler_3"))
+
+    assert (project / "pkg" / "config.py").read_text() == "TIMEOUT = 30\nRETRIES = 3\n"
+    assert "value * 3" in (project / "pkg" / "module_3.py").read_text()
+    assert not (project / "pkg" / "module_19.py").exists()
+    assert (project / "pkg" / "retry.py").read_text() == "ATTEMPTS = 3\n"
+    assert {c["path"]: c["status"] for c in result["changes"]} == {
+        "pkg/config.py": "patched",
+        "pkg/module_19.py": "deleted",
+        "pkg/retry.py": "written",
+        "pkg/module_3.py": "written",
+    }
+    # Only a manifest line was sent for most files
+    assert len(result["files_sent"]) < result["files_total"] / 2
+    assert "pkg/module_7.py" in chat.prompts[0] and "Handle 7" not in chat.prompts[0]
+    assert "pkg/module_3.py" in chat.prompts[1]
+
+    # The generator's own changes are not reported as user edits next time
+    manifest = ProjectManifest(str(project))
+    manifest.scan()
+    assert not manifest.changed
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import random
+
+import pytest
+
+from utils.config_manager import ConfigManager
+from utils.project_stream import ProjectStreamParser, ProjectWriter
+
+PROJECT = {
+    "files": [
+        {"path": "README.md", "content": "# Demo\n\nUses {braces}, [brackets] and \"quotes\": ok"},
+        {"path": "src/pkg/__init__.py", "content": ""},
+        {"path": "src/pkg/core.py", "content": "def f(x):\n    return {'a': [x, \"\\\\\"]}  # é ✓\n"},
+        {"path": "tests/test_core.py", "content": "from pkg.core import f\n"},
+    ],
+    "dependencies": ["requests", "rich>=13"],
+    "notes": {"files": ["not the file list"]},
+}
+
+
+def _reply():
+    return "Here is the project:\n```json\n" + json.dumps(PROJECT, indent=2, ensure_ascii=False) + "\n```\nEnjoy!"
+
+
+def _chunks(text, rng):
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 7)
+        yield text[i:i + size]
+        i += size
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_parser_yields_entries_for_any_chunking(seed):
+    parser = ProjectStreamParser()
+    entries = []
+    for chunk in _chunks(_reply(), random.Random(seed)):
+        entries.extend(parser.feed(chunk))
+
+    assert entries == PROJECT["files"]
+    assert parser.close() == {"files": [], "dependencies": ["requests", "rich>=13"],
+                              "notes": {"files": ["not the file list"]}}
+
+
+def test_entries_arrive_before_the_reply_ends():
+    parser = ProjectStreamParser()
+    text = json.dumps(PROJECT)
+    cut = text.index('"src/pkg/core.py"')
+
+    assert [entry["path"] for entry in parser.feed(text[:cut])] == ["README.md", "src/pkg/__init__.py"]
+    with pytest.raises(json.JSONDecodeError):
+        parser.close()
+
+
+def test_parser_rejects_replies_without_files():
+    parser = ProjectStreamParser()
+    parser.feed('no json at all')
+    with pytest.raises(ValueError):
+        parser.close()
+
+    parser = ProjectStreamParser()
+    parser.feed('{"dependencies": []}')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_writer_creates_files_and_skips_unsafe_paths(tmp_path):
+    writer = ProjectWriter(str(tmp_path), max_workers=2)
+    for file_info in PROJECT["files"]:
+        assert writer.submit(file_info)
+    assert not writer.submit({"path": "../escape.py", "content": "x"})
+    assert not writer.submit({"path": "broken"})
+    writer.submit({"path": "README.md", "content": "replaced"})
+    writer.submit_dependencies(PROJECT["dependencies"])
+
+    created = writer.finish()
+
+    assert created == [entry["path"] for entry in PROJECT["files"]] + ["requirements.txt"]
+    assert (tmp_path / "README.md").read_text(encoding="utf-8") == "replaced"
+    assert (tmp_path / "src/pkg/core.py").read_text(encoding="utf-8") == PROJECT["files"][2]["content"]
+    assert (tmp_path / "requirements.txt").read_text() == "requests\nrich>=13\n"
+    assert not (tmp_path.parent / "escape.py").exists()
+
+
+class FakePart:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.parts = [FakePart(text)]
+
+
+class FinishChunk:
+    @property
+    def parts(self):
+        raise ValueError("The response.parts quick accessor requires a single candidate")
+
+    @property
+    def text(self):
+        raise ValueError("The response.text quick accessor requires the response to contain a valid Part")
+
+
+class FakeStream:
+    def __init__(self, text, project_dir, seen):
+        self.chunks = list(_chunks(text, random.Random(0)))
+        self.project_dir = project_dir
+        self.seen = seen
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            # Record how many files were on disk before the reply finished
+            self.seen.append(sum(len(files) for _, _, files in os.walk(self.project_dir)))
+            await asyncio.sleep(0)
+            yield FakeChunk(chunk)
+        # Gemini ends with a finish chunk that has no parts; its .text would raise
+        yield FinishChunk()
+
+
+class FakeChat:
+    def __init__(self, text, project_dir):
+        self.text = text
+        self.project_dir = project_dir
+        self.seen = []
+        self.history = []
+
+    async def send_message_async(self, prompt, stream=False):
+        assert stream
+        return FakeStream(self.text, self.project_dir, self.seen)
+
+
+def test_generator_writes_files_while_streaming(tmp_path):
+    pytest.importorskip("google.generativeai")
+    from features.code_gen import CodeGenerator
+
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Gemini", "api_key", "test-key")
+    generator = CodeGenerator(config)
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    chat = FakeChat(_reply(), str(project_dir))
+    written = []
+
+    created = asyncio.run(generator._generate_project_files("demo", str(project_dir), chat, written.append))
+
+    assert list(created) == [entry["path"] for entry in PROJECT["files"]] + ["requirements.txt"]
+    assert created["src/pkg/core.py"] == PROJECT["files"][2]["content"]
+    assert written == [entry["path"] for entry in PROJECT["files"]]
+    assert max(chat.seen) >= 3
+    assert (project_dir / "tests/test_core.py").exists()
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from features.project_tests import ProjectVerifier, VenvCache, requirements_key, failure_report
+from utils.config_manager import ConfigManager
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("cache"))
+
+
+def _project(root, files):
+    for path, content in files.items():
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+    return str(root)
+
+
+def test_requirements_key_ignores_order_case_and_comments():
+    assert requirements_key("Rich>=13\nrequests  # http\n\n", False) == requirements_key("requests\nrich>=13\n", False)
+    assert requirements_key("requests\n", False) != requirements_key("requests\n", True)
+    assert requirements_key("requests\n", False) != requirements_key("httpx\n", False)
+
+
+def test_environment_is_built_once_and_reused(cache_dir):
+    venvs = VenvCache(cache_dir, offline=True)
+
+    env_dir = venvs.get("")
+    started = time.monotonic()
+    assert venvs.get("# nothing to install\n") == env_dir
+    assert time.monotonic() - started < 0.1
+    assert os.path.exists(venvs.python(env_dir))
+
+
+def test_offline_install_failure_leaves_no_environment(cache_dir):
+    venvs = VenvCache(cache_dir, offline=True)
+
+    with pytest.raises(RuntimeError):
+        venvs.get("surely-not-a-real-package-xyz==1.0\n")
+    assert sorted(os.listdir(venvs.root)) == [requirements_key("", True)]
+
+
+PROJECT = {
+    "calc.py": "def add(a, b):\n    return a - b\n",
+    "tests/test_calc.py": "from calc import add\n\ndef test_add():\n    assert add(2, 2) == 4\n",
+    "tests/test_env.py": (
+        "import os, time\n\n"
+        "def test_isolated():\n"
+        "    time.sleep(0.5)\n"
+        "    assert 'SECRET_TOKEN' not in os.environ\n"
+    ),
+    "tests/test_slow.py": "import time\n\ndef test_hangs():\n    time.sleep(0.5)\n",
+    "tests/test_hang.py": "import time\n\ndef test_hangs():\n    time.sleep(60)\n",
+}
+
+
+def test_tests_run_in_parallel_isolated_and_time_out(tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setenv("SECRET_TOKEN", "do-not-leak")
+    project_dir = _project(tmp_path, PROJECT)
+    verifier = ProjectVerifier(VenvCache(cache_dir, offline=True), workers=4, timeout=5)
+    verifier.venvs.get("")
+
+    started = time.monotonic()
+    results = {result["path"]: result for result in asyncio.run(verifier.run(project_dir))}
+    elapsed = time.monotonic() - started
+
+    assert {path: result["status"] for path, result in results.items()} == {
+        "tests/test_calc.py": "failed",
+        "tests/test_env.py": "passed",
+        "tests/test_hang.py": "timeout",
+        "tests/test_slow.py": "passed",
+    }
+    assert "assert 0 == 4" in results["tests/test_calc.py"]["output"]
+    # The other files run while the hanging one waits out its timeout
+    assert elapsed < 5 + 3
+    report = failure_report(list(results.values()))
+    assert "tests/test_calc.py (failed)" in report and "test_env.py" not in report
+
+
+class FakeChat:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+        self.history = []
+
+    async def send_message_async(self, prompt, stream=False):
+        self.prompts.append(prompt)
+
+        async def chunks():
+            yield SimpleNamespace(parts=[SimpleNamespace(text=self.reply)])
+        return chunks()
+
+
+def test_failures_get_one_targeted_fix_round(tmp_path, cache_dir):
+    pytest.importorskip("google.generativeai")
+    from features.code_gen import CodeGenerator
+
+    project_dir = _project(tmp_path / "project", {
+        "calc.py": PROJECT["calc.py"],
+        "tests/test_calc.py": PROJECT["tests/test_calc.py"],
+        "tests/test_ok.py": "def test_ok():\n    assert True\n",
+    })
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Gemini", "api_key", "test-key")
+    config.set("Cache", "cache_dir", cache_dir)
+    config.set("CodeGen", "test_offline", "true")
+    generator = CodeGenerator(config)
+    chat = FakeChat(json.dumps({"files": [
+        {"path": "calc.py", "action": "patch", "diff": "@@ -1,2 +1,2 @@\n def add(a, b):\n-    return a - b\n+    return a + b\n"}
+    ]}))
+    generator._chat_for = lambda project_dir: chat
+    runs = []
+    run = generator.verifier.run
+
+    async def recording_run(project_dir, tests=None):
+        runs.append(tests)
+        return await run(project_dir, tests)
+    generator.verifier.run = recording_run
+
+    verification = asyncio.run(generator.verify_project(project_dir))
+
+    assert verification["fix_rounds"] == 1
+    assert {r["path"]: r["status"] for r in verification["results"]} == {
+        "tests/test_calc.py": "passed", "tests/test_ok.py": "passed"
+    }
+    assert runs == [None, ["tests/test_calc.py"]]
+    assert "assert 0 == 4" in chat.prompts[0] and "def add(a, b)" in chat.prompts[0]
+
+
+def test_tests_run_on_a_throwaway_copy(tmp_path, cache_dir):
+    project_dir = _project(tmp_path / "project", {
+        "tests/test_writes.py": (
+            "import os, tempfile\n\n"
+            "def test_writes():\n"
+            "    open('artifact.txt', 'w').write('x')\n"
+            "    assert os.path.isdir(os.environ['HOME'])\n"
+            "    assert os.environ['HOME'] != tempfile.gettempdir()\n"
+        ),
+    })
+    verifier = ProjectVerifier(VenvCache(cache_dir, offline=True), workers=1, timeout=30)
+
+    results = asyncio.run(verifier.run(project_dir))
+
+    assert [result["status"] for result in results] == ["passed"]
+    assert not os.path.exists(os.path.join(project_dir, "artifact.txt"))
+
+
+def test_one_broken_file_keeps_the_other_results(tmp_path, cache_dir):
+    project_dir = _project(tmp_path / "project", {
+        "tests/test_a.py": "def test_a():\n    assert True\n",
+        "tests/test_b.py": "def test_b():\n    assert True\n",
+    })
+    verifier = ProjectVerifier(VenvCache(cache_dir, offline=True), workers=2, timeout=30)
+    run_file = verifier._run_file
+
+    async def flaky_run_file(python, project_dir, home, test_path, semaphore):
+        if test_path.endswith("test_b.py"):
+            raise ProcessLookupError("gone")
+        return await run_file(python, project_dir, home, test_path, semaphore)
+    verifier._run_file = flaky_run_file
+
+    results = {result["path"]: result["status"] for result in asyncio.run(verifier.run(project_dir))}
+
+    assert results == {"tests/test_a.py": "passed", "tests/test_b.py": "error"}
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from models.rate_limiter import RateLimiter, TokenBucket, CircuitOpenError
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(headers or {})
+
+
+def _flaky(failures, error):
+    calls = []
+
+    async def call():
+        calls.append(time.monotonic())
+        if len(calls) <= failures:
+            raise error
+        return "ok"
+
+    return call, calls
+
+
+def test_token_bucket_spreads_requests_over_the_rate():
+    async def run():
+        bucket = TokenBucket(rate=600)  # 10 per second, burst of 600
+        bucket.tokens = 0
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire(1)
+        return time.monotonic() - start
+
+    assert 0.25 < asyncio.run(run()) < 0.6
+
+
+def test_retries_honor_retry_after():
+    limiter = RateLimiter("openai", max_retries=3, base_delay=5)
+    call, calls = _flaky(2, FakeStatusError(429, {"retry-after": "0.1"}))
+
+    assert asyncio.run(limiter.run(call)) == "ok"
+    assert len(calls) == 3
+    assert all(0.09 < later - earlier < 0.5 for earlier, later in zip(calls, calls[1:]))
+
+
+def test_client_errors_are_not_retried():
+    limiter = RateLimiter("openai", max_retries=3)
+    call, calls = _flaky(1, FakeStatusError(400))
+
+    with pytest.raises(FakeStatusError):
+        asyncio.run(limiter.run(call))
+    assert len(calls) == 1
+
+
+def test_circuit_opens_after_consecutive_failures_and_recovers():
+    limiter = RateLimiter("openai", max_retries=0, failure_threshold=2, reset_timeout=0.1)
+    failing, _ = _flaky(10, FakeStatusError(503))
+
+    for _ in range(2):
+        with pytest.raises(FakeStatusError):
+            asyncio.run(limiter.run(failing))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(limiter.run(failing))
+
+    time.sleep(0.15)
+    succeeding, _ = _flaky(0, None)
+    assert asyncio.run(limiter.run(succeeding)) == "ok"
+    assert limiter.breaker.opened_at is None
+
+
+def test_cancelled_half_open_trial_releases_the_circuit():
+    limiter = RateLimiter("openai", max_retries=0, failure_threshold=1, reset_timeout=0.1)
+    failing, _ = _flaky(10, FakeStatusError(503))
+    with pytest.raises(FakeStatusError):
+        asyncio.run(limiter.run(failing))
+    time.sleep(0.15)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(limiter.run(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(cancel_trial())
+
+    # The cancelled trial reopened the circuit; after the next cool-down a trial is let through again
+    assert not limiter.breaker.trial_running
+    time.sleep(0.15)
+    succeeding, _ = _flaky(0, None)
+    assert asyncio.run(limiter.run(succeeding)) == "ok"
+    assert limiter.breaker.opened_at is None
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+from utils.config_manager import ConfigManager
+from utils.response_cache import ResponseCache
+from models.ai_manager import AIManager
+
+
+def test_lru_eviction_and_counters(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), max_entries=2)
+    cache.set("a", "A")
+    time.sleep(0.01)
+    cache.set("b", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"  # "a" is now more recently used than "b"
+    time.sleep(0.01)
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=0.05)
+    cache.set("a", "A")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_ai_manager_caches_deterministic_calls_only(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Cache", "enabled", "true")
+    config.set("Cache", "cache_dir", str(tmp_path / "cache"))
+    config.set("Models.openai.gpt-4", "temperature", "0")
+
+    manager = AIManager(config)
+    calls = []
+
+    async def fake_completion(conversation, model=None):
+        calls.append(conversation)
+        return "reply"
+
+    manager.openai.get_chat_completion = fake_completion
+    conversation = [{"role": "user", "content": "hello"}]
+
+    assert asyncio.run(manager.get_chat_response(conversation, "openai")) == "reply"
+    assert asyncio.run(manager.get_chat_response(conversation, "openai")) == "reply"
+    assert len(calls) == 1
+    assert manager.cache.stats()["hits"] == 1
+
+    # Sampling calls bypass the cache unless allow_sampling is set
+    config.set("Models.openai.gpt-4", "temperature", "0.7")
+    asyncio.run(manager.get_chat_response(conversation, "openai"))
+    asyncio.run(manager.get_chat_response(conversation, "openai"))
+    assert len(calls) == 3
+
+
+def test_hits_do_not_write_until_flushed(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path))
+    cache.set("a", "A")
+    changes = cache.db.total_changes
+
+    for _ in range(3):
+        assert cache.get("a") == "A"
+    assert cache.db.total_changes == changes
+
+    cache.close()
+    reopened = ResponseCache(cache_dir=str(tmp_path))
+    last_access = reopened.db.execute("SELECT last_access, created FROM responses").fetchone()
+    assert last_access[0] > last_access[1]
+
+
+def _cached_manager(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("Cache", "enabled", "true")
+    config.set("Cache", "cache_dir", str(tmp_path / "cache"))
+    config.set("Models.openai.gpt-4", "temperature", "0")
+    config.set("OpenAI", "api_key", "sk-test")
+    config.set("Anthropic", "api_key", "sk-test")
+    config.set("Routing", "fallback", "true")
+    config.set("Routing", "fallback_order", "openai,anthropic")
+    return AIManager(config)
+
+
+def test_fallback_answers_are_not_cached_for_the_primary(tmp_path):
+    manager = _cached_manager(tmp_path)
+    calls = []
+
+    async def failing(conversation, model=None):
+        calls.append("openai")
+        raise RuntimeError("outage")
+
+    async def backup(conversation, model=None):
+        calls.append("anthropic")
+        return "backup reply"
+
+    manager.openai.get_chat_completion = failing
+    manager.anthropic.get_chat_completion = backup
+    conversation = [{"role": "user", "content": "hello"}]
+
+    assert asyncio.run(manager.get_chat_response(conversation, "openai")) == "backup reply"
+    assert asyncio.run(manager.get_chat_response(conversation, "openai")) == "backup reply"
+    assert calls == ["openai", "anthropic", "openai", "anthropic"]
+    assert manager.cache.stats()["entries"] == 0
+
+
+def test_streamed_replies_are_cached(tmp_path):
+    manager = _cached_manager(tmp_path)
+    streams = []
+
+    async def fake_stream(conversation, model=None):
+        streams.append(conversation)
+        for chunk in ("Hel", "lo", "!"):
+            yield chunk
+
+    manager.openai.stream_chat_completion = fake_stream
+    conversation = [{"role": "user", "content": "hello"}]
+
+    async def collect():
+        return [chunk async for chunk in manager.stream_chat_response(conversation, "openai")]
+
+    assert asyncio.run(collect()) == ["Hel", "lo", "!"]
+    assert asyncio.run(collect()) == ["Hello!"]
+    assert len(streams) == 1
+
+    # Streaming and non-streaming calls share entries
+    assert asyncio.run(manager.get_chat_response(conversation, "openai")) == "Hello!"
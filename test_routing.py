@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from utils.config_manager import ConfigManager
+from models.ai_manager import AIManager
+from models.routing import LatencyTracker
+
+
+class FakeClient:
+    def __init__(self, reply, delay=0.0, fail=False):
+        self.reply = reply
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = False
+
+    async def get_chat_completion(self, conversation, model=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.reply} unavailable")
+        return self.reply
+
+
+def _make_manager(tmp_path, hedge=False, clients=None):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("OpenAI", "api_key", "sk-test")
+    config.set("Anthropic", "api_key", "sk-test")
+    config.set("Routing", "fallback", "true")
+    config.set("Routing", "fallback_order", "openai,anthropic")
+    config.set("Routing", "hedge", str(hedge).lower())
+    config.set("Routing", "hedge_delay", "0.05")
+    manager = AIManager(config)
+    manager._clients.update(clients or {})
+    return manager
+
+
+def test_falls_back_to_next_provider_on_error(tmp_path):
+    primary = FakeClient("openai", fail=True)
+    backup = FakeClient("anthropic")
+    manager = _make_manager(tmp_path, clients={"openai": primary, "anthropic": backup})
+
+    reply = asyncio.run(manager.get_chat_response([{"role": "user", "content": "hi"}], "openai"))
+
+    assert reply == "anthropic"
+    assert primary.calls == 1 and backup.calls == 1
+
+
+def test_hedged_request_takes_faster_provider_and_cancels_loser(tmp_path):
+    slow = FakeClient("openai", delay=1.0)
+    fast = FakeClient("anthropic", delay=0.01)
+    manager = _make_manager(tmp_path, hedge=True, clients={"openai": slow, "anthropic": fast})
+
+    async def run():
+        start = time.perf_counter()
+        reply = await manager.get_chat_response([{"role": "user", "content": "hi"}], "openai")
+        await asyncio.sleep(0)  # let the cancellation reach the losing request
+        return reply, time.perf_counter() - start
+
+    reply, elapsed = asyncio.run(run())
+
+    assert reply == "anthropic"
+    assert elapsed < 0.5
+    assert slow.cancelled
+    assert manager.routing.latency.percentile("anthropic", 95) is not None
+
+
+def test_hedge_timing_follows_pending_provider_after_a_failure(tmp_path):
+    slow = FakeClient("openai", delay=0.3)
+    broken = FakeClient("anthropic", fail=True)
+    spare = FakeClient("groq", delay=1.0)
+    manager = _make_manager(tmp_path, hedge=True, clients={"openai": slow, "anthropic": broken, "groq": spare})
+    manager.config.set("Groq", "api_key", "gsk-test")
+    manager.routing.fallback_order = ["openai", "anthropic", "groq"]
+    asked = []
+    hedge_after = manager.routing.hedge_after
+
+    def recording_hedge_after(provider):
+        asked.append(provider)
+        return hedge_after(provider)
+    manager.routing.hedge_after = recording_hedge_after
+
+    reply = asyncio.run(manager.get_chat_response([{"role": "user", "content": "hi"}], "openai"))
+
+    assert reply == "openai"
+    assert asked[:3] == ["openai", "anthropic", "openai"]
+
+
+def test_without_hedging_slow_provider_is_awaited(tmp_path):
+    slow = FakeClient("openai", delay=0.1)
+    fast = FakeClient("anthropic")
+    manager = _make_manager(tmp_path, clients={"openai": slow, "anthropic": fast})
+
+    reply = asyncio.run(manager.get_chat_response([{"role": "user", "content": "hi"}], "openai"))
+
+    assert reply == "openai"
+    assert fast.calls == 0
+
+
+def test_latency_percentile_and_histogram():
+    tracker = LatencyTracker()
+    for ms in range(1, 101):
+        tracker.record("openai", ms / 1000)
+
+    assert tracker.percentile("openai", 95) == 0.096
+    assert tracker.histogram("openai", [0.05, 0.1]) == [50, 50, 0]
+    assert tracker.percentile("groq", 95) is None
+
+
+def test_fallback_is_opt_in(tmp_path):
+    config = ConfigManager(str(tmp_path / "config.ini"))
+    config.set("OpenAI", "api_key", "sk-test")
+    config.set("Anthropic", "api_key", "sk-test")
+    manager = AIManager(config)
+
+    assert manager.routing.chain("openai") == ["openai"]
@@ -0,0 +1,96 @@
+import json
+import os
+
+from utils.export_manager import ExportManager
+from utils.search_index import SearchIndex, MATCH_START, MATCH_END
+from utils.session_manager import SessionManager
+
+
+def _index(tmp_path):
+    return SearchIndex(str(tmp_path / "search.db"))
+
+
+def test_save_and_export_are_searchable(tmp_path):
+    index = _index(tmp_path)
+    sessions = SessionManager(str(tmp_path / "sessions"), search_index=index)
+    exports = ExportManager(str(tmp_path / "exports"), search_index=index)
+
+    sessions.save_session([
+        {"role": "user", "content": "How do I reverse a linked list?"},
+        {"role": "assistant", "content": "Walk the list and flip each next pointer."},
+    ], "lists")
+    exports.export_conversation([
+        {"role": "user", "content": "Explain quicksort partitioning"},
+    ], export_format="md", name="chat")
+
+    results = index.search("pointer")
+    assert [(r["source"], r["role"], r["seq"]) for r in results] == [("sessions", "assistant", 1)]
+    assert f"{MATCH_START}pointer{MATCH_END}" in results[0]["snippet"]
+    assert index.search("quicksort")[0]["source"] == "exports"
+
+    sessions.delete_session("lists.json")
+    assert index.search("pointer") == []
+
+
+def test_results_are_ranked_by_relevance(tmp_path):
+    index = _index(tmp_path)
+    sessions = SessionManager(str(tmp_path / "sessions"), search_index=index)
+    sessions.save_session([{"role": "user", "content": "asyncio once, then something else entirely"}], "weak")
+    sessions.save_session([{"role": "user", "content": "asyncio asyncio asyncio event loop"}], "strong")
+
+    results = index.search("asyncio")
+    assert [os.path.basename(r["path"]) for r in results] == ["strong.json", "weak.json"]
+
+
+def test_sync_picks_up_external_changes(tmp_path):
+    index = _index(tmp_path)
+    sessions_dir = tmp_path / "sessions"
+    sessions_dir.mkdir()
+    session_file = sessions_dir / "manual.json"
+    session_file.write_text(json.dumps({
+        "timestamp": "2024-01-01T00:00:00",
+        "conversation": [{"role": "user", "content": "kubernetes ingress"}]
+    }))
+    (sessions_dir / "notes.txt").write_text("terraform state locking")
+
+    assert index.sync({"sessions": str(sessions_dir)}) == 2
+    assert len(index.search("ingress")) == 1
+    assert len(index.search("terraform")) == 1
+
+    session_file.unlink()
+    assert index.sync({"sessions": str(sessions_dir)}) == 1
+    assert index.search("ingress") == []
+
+
+def test_query_syntax_characters_are_literal(tmp_path):
+    index = _index(tmp_path)
+    sessions = SessionManager(str(tmp_path / "sessions"), search_index=index)
+    sessions.save_session([{"role": "user", "content": "use pre-commit hooks with \"quotes\""}], "hooks")
+
+    assert len(index.search('pre-commit "quotes')) == 1
+    assert len(index.search("pre*")) == 1
+    assert index.search("   ") == []
+
+
+def test_sync_keeps_jsonl_and_compressed_exports(tmp_path):
+    index = _index(tmp_path)
+    exports = ExportManager(str(tmp_path / "exports"), search_index=index)
+    conversation = [
+        {"role": "user", "content": "How does raft leader election work?"},
+        {"role": "assistant", "content": "Followers time out and request votes."},
+    ]
+    exports.export_conversation(conversation, export_format="jsonl", name="a")
+    exports.export_conversation(conversation, export_format="md", name="b", compress=True)
+    exports.export_conversation(conversation, export_format="jsonl", name="c", compress=True)
+    assert len(index.search("raft")) == 3
+
+    # The first /search of a chat session syncs; it must not drop these exports
+    assert index.sync({"exports": str(tmp_path / "exports" / "conversations")}) == 3
+    assert len(index.search("raft")) == 3
+
+    # Files are also read back when indexed from scratch
+    fresh = SearchIndex(str(tmp_path / "fresh.db"))
+    assert fresh.sync({"exports": str(tmp_path / "exports" / "conversations")}) == 3
+    results = fresh.search("votes")
+    assert len(results) == 3
+    assert {r["role"] for r in results} == {"assistant", ""}
@@ -0,0 +1,80 @@
+from utils.session_journal import SessionJournal
+from utils.session_manager import SessionManager
+
+
+def _messages(count):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        for i in range(count)
+    ]
+
+
+def test_recovers_messages_after_crash(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    journal = SessionJournal(manager, "chat", fsync_every=2)
+    messages = _messages(3)
+    for seq, message in enumerate(messages):
+        journal.append(message, seq)
+    # No close(): simulate the process dying
+
+    assert SessionJournal.pending(str(tmp_path)) == ["chat"]
+    assert SessionJournal(manager, "chat").recover() == messages
+
+
+def test_compaction_writes_snapshot_and_skips_replayed_messages(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    journal = SessionJournal(manager, "chat", compact_every=4)
+    messages = _messages(6)
+    for seq, message in enumerate(messages[:4]):
+        journal.append(message, seq)
+    assert journal.should_compact()
+
+    # Crash after the snapshot was written but before the journal was emptied
+    manager.save_session(messages[:4], "chat", overwrite=True)
+    for seq, message in enumerate(messages[4:], 4):
+        journal.append(message, seq)
+
+    assert SessionJournal(manager, "chat").recover() == messages
+
+    journal.compact(messages)
+    assert manager.load_session("chat.json") == messages
+    assert SessionJournal.pending(str(tmp_path)) == []
+    assert manager.list_sessions()[0]["message_count"] == 6
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    journal = SessionJournal(manager, "chat")
+    messages = _messages(2)
+    for seq, message in enumerate(messages):
+        journal.append(message, seq)
+    journal.sync()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "role": "us')
+
+    assert SessionJournal(manager, "chat").recover() == messages
+
+
+def test_close_removes_journal(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    journal = SessionJournal(manager, "chat")
+    journal.append({"role": "user", "content": "hi"}, 0)
+
+    assert journal.close([{"role": "user", "content": "hi"}]) == "chat.json"
+    assert SessionJournal.pending(str(tmp_path)) == []
+
+
+def test_discard_removes_journal_and_snapshot(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    journal = SessionJournal(manager, "autosave_1", compact_every=2)
+    messages = _messages(3)
+    for seq, message in enumerate(messages[:2]):
+        journal.append(message, seq)
+    journal.compact(messages[:2])
+    journal.append(messages[2], 2)
+    manager.save_session(messages, "named")
+
+    journal.discard()
+
+    assert SessionJournal.pending(str(tmp_path)) == []
+    assert [session["filename"] for session in manager.list_sessions()] == ["named.json"]
@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+from utils.session_manager import SessionManager
+
+
+def _conversation(n):
+    return [{"role": "user", "content": f"message {i}"} for i in range(n)]
+
+
+def test_listing_reads_index_not_files(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    first = manager.save_session(_conversation(2), "first")
+    second = manager.save_session(_conversation(5), "second")
+
+    # Listing must not open session files
+    with open(tmp_path / first, "w") as f:
+        f.write("not json")
+
+    sessions = manager.list_sessions()
+    assert [s["filename"] for s in sessions] == [second, first]
+    assert sessions[0]["message_count"] == 5
+
+
+def test_paging_and_delete(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    names = [manager.save_session(_conversation(1), f"s{i}") for i in range(5)]
+
+    page = manager.list_sessions(limit=2, offset=2)
+    assert len(page) == 2
+    assert manager.count_sessions() == 5
+
+    assert manager.delete_session(names[0])
+    assert names[0] not in [s["filename"] for s in manager.list_sessions()]
+
+
+def test_rebuild_picks_up_hand_made_changes(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    kept = manager.save_session(_conversation(1), "kept")
+    removed = manager.save_session(_conversation(1), "removed")
+
+    os.remove(tmp_path / removed)
+    with open(tmp_path / "copied.json", "w") as f:
+        json.dump({"timestamp": "2024-01-01T00:00:00", "conversation": _conversation(3)}, f)
+
+    assert manager.rebuild_index() == 2
+    assert sorted(s["filename"] for s in manager.list_sessions()) == ["copied.json", kept]
+
+
+def test_existing_directory_is_indexed_on_first_open(tmp_path):
+    with open(tmp_path / "old.json", "w") as f:
+        json.dump({"timestamp": "2024-01-01T00:00:00", "conversation": _conversation(4)}, f)
+
+    manager = SessionManager(str(tmp_path))
+    assert manager.list_sessions() == [
+        {"filename": "old.json", "timestamp": "2024-01-01T00:00:00", "message_count": 4}
+    ]
+
+
+def test_gzip_sessions_load_next_to_legacy_json(tmp_path):
+    legacy = SessionManager(str(tmp_path))
+    legacy.save_session(_conversation(2), "legacy")
+
+    manager = SessionManager(str(tmp_path), compression="gzip")
+    filename = manager.save_session(_conversation(3), "packed")
+
+    assert filename == "packed.json.gz"
+    assert manager.load_session(filename) == _conversation(3)
+    assert manager.load_session("legacy.json") == _conversation(2)
+    assert manager.find_session("packed") == filename
+    assert manager.export_session(filename, "txt") == "packed_export.txt"
+
+    # Names stay unique across formats, and overwriting replaces the other format
+    assert manager.save_session(_conversation(1), "legacy") == "legacy_1.json.gz"
+    assert manager.save_session(_conversation(1), "legacy", overwrite=True) == "legacy.json.gz"
+    assert not os.path.exists(tmp_path / "legacy.json")
+    assert sorted(s["filename"] for s in manager.list_sessions()) == [
+        "legacy.json.gz", "legacy_1.json.gz", "packed.json.gz"
+    ]
+
+
+def test_migrate_sessions_round_trips(tmp_path):
+    manager = SessionManager(str(tmp_path))
+    for i in range(3):
+        manager.save_session(_conversation(i + 1), f"s{i}")
+
+    assert manager.migrate_sessions("gzip") == 3
+    assert sorted(os.listdir(tmp_path)) == ["index.db", "s0.json.gz", "s1.json.gz", "s2.json.gz"]
+    assert manager.load_session("s2.json.gz") == _conversation(3)
+
+    assert manager.migrate_sessions("json") == 3
+    assert manager.load_session("s1.json") == _conversation(2)
+    assert manager.rebuild_index() == 3
+
+
+def test_zstd_dictionary_sessions(tmp_path):
+    pytest.importorskip("zstandard")
+    manager = SessionManager(str(tmp_path))
+    code = "def handler(request):\n    return {'status': 'ok', 'items': []}\n"
+    conversations = [
+        [{"role": "user", "content": f"Write handler {i}"}, {"role": "assistant", "content": code * (i % 5 + 1)}]
+        for i in range(40)
+    ]
+    for i, conversation in enumerate(conversations):
+        manager.save_session(conversation, f"s{i}")
+
+    assert manager.migrate_sessions("zstd") == 40
+    assert os.listdir(tmp_path / "dicts")
+
+    # A fresh manager finds the dictionary on disk
+    reopened = SessionManager(str(tmp_path), compression="zstd")
+    assert reopened.load_session("s7.json.zst") == conversations[7]
+    reopened.save_session(conversations[0], "new")
+    assert reopened.load_session("new.json.zst") == conversations[0]
@@ -0,0 +1,35 @@
+import difflib
+
+import pytest
+
+from utils.unified_diff import apply_patch, PatchError
+
+ORIGINAL = "".join(f"line {i}\n" for i in range(1, 41))
+
+
+def _diff(old, new):
+    return "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True), "a/f.py", "b/f.py"))
+
+
+def test_applies_difflib_output():
+    new = ORIGINAL.replace("line 3\n", "line three\n").replace("line 30\n", "").replace("line 40\n", "line 40\nend\n")
+    assert apply_patch(ORIGINAL, _diff(ORIGINAL, new)) == new
+
+
+def test_hunks_may_be_offset_and_lose_trailing_whitespace():
+    diff = "@@ -2,3 +2,3 @@\n line 11\n-line 12\n+line twelve\n line 13   \n"
+    patched = apply_patch(ORIGINAL, diff)
+    assert "line twelve\nline 13\n" in patched
+    assert "line 12\n" not in patched
+
+
+def test_insertion_and_new_file():
+    assert apply_patch("a\nb\n", "@@ -1,0 +2,1 @@\n+inserted\n") == "a\ninserted\nb\n"
+    assert apply_patch("", "--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,2 @@\n+x = 1\n+y = 2\n") == "x = 1\ny = 2\n"
+
+
+def test_mismatched_or_empty_diff_is_rejected():
+    with pytest.raises(PatchError):
+        apply_patch(ORIGINAL, "@@ -1,2 +1,2 @@\n-not here\n+x\n")
+    with pytest.raises(PatchError):
+        apply_patch(ORIGINAL, "just prose")
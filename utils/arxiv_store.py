@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from utils.logger import setup_logger
+from utils.search_index import build_match_query
+
+logger = setup_logger()
+
+class ArxivStore:
+    """Local SQLite store for arXiv data, keyed by entry_id.
+
+    Keeps paper metadata with a full-text index over it, the entry_ids each
+    query returned (so repeated queries skip the API until they expire), and
+    per-paper AI summaries so re-analysing overlapping result sets only
+    summarizes papers that have not been seen before.
+    """
+
+    def __init__(self, cache_dir: str = "cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Used from worker threads by the API server and batch mode
+        self.db = sqlite3.connect(os.path.join(cache_dir, "arxiv.db"), check_same_thread=False)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS papers (
+                entry_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched REAL NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                entry_id UNINDEXED,
+                title,
+                authors,
+                abstract,
+                categories,
+                tokenize = 'porter unicode61'
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS queries (
+                key TEXT PRIMARY KEY,
+                entry_ids TEXT NOT NULL,
+                fetched REAL NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS summaries (
+                entry_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (entry_id, model)
+            )"""
+        )
+        self.db.commit()
+
+    def upsert_papers(self, papers: List[Dict[str, Any]]) -> None:
+        """Store or refresh formatted paper dicts (as built by ArxivSearch) and their index rows."""
+        now = time.time()
+        with self._lock:
+            for paper in papers:
+                entry_id = paper["url"]
+                self.db.execute(
+                    "INSERT OR REPLACE INTO papers VALUES (?, ?, ?)",
+                    (entry_id, json.dumps(paper, ensure_ascii=False), now)
+                )
+                self.db.execute("DELETE FROM papers_fts WHERE entry_id = ?", (entry_id,))
+                self.db.execute(
+                    "INSERT INTO papers_fts VALUES (?, ?, ?, ?, ?)",
+                    (entry_id, paper["title"], " ".join(paper["authors"]),
+                     paper["abstract"], " ".join(paper["categories"]))
+                )
+            self.db.commit()
+
+    def get_papers(self, entry_ids: List[str]) -> List[Dict[str, Any]]:
+        """Stored papers in the given order; unknown ids are skipped."""
+        if not entry_ids:
+            return []
+        placeholders = ",".join("?" * len(entry_ids))
+        with self._lock:
+            rows = dict(self.db.execute(
+                f"SELECT entry_id, data FROM papers WHERE entry_id IN ({placeholders})", entry_ids
+            ).fetchall())
+        return [json.loads(rows[entry_id]) for entry_id in entry_ids if entry_id in rows]
+
+    def cache_query(self, key: str, entry_ids: List[str]) -> None:
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?)",
+                (key, json.dumps(entry_ids), time.time())
+            )
+            self.db.commit()
+
+    def get_cached_query(self, key: str, ttl: Optional[float]) -> Optional[List[str]]:
+        """entry_ids a query returned, if cached within `ttl` seconds (any age when ttl is None)."""
+        with self._lock:
+            row = self.db.execute("SELECT entry_ids, fetched FROM queries WHERE key = ?", (key,)).fetchone()
+        if row is None or (ttl is not None and time.time() - row[1] > ttl):
+            return None
+        return json.loads(row[0])
+
+    def search_local(self, query: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """Best matching stored papers for a free-text query, without touching the network."""
+        # Drop arXiv query syntax (field prefixes like "ti:" and boolean operators)
+        words = [
+            word.split(":", 1)[-1] for word in query.split()
+            if word not in ("AND", "OR", "ANDNOT")
+        ]
+        terms = build_match_query(" ".join(words))
+        if not terms:
+            return []
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT entry_id FROM papers_fts WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts) LIMIT ? OFFSET ?",
+                (terms, limit, offset)
+            ).fetchall()
+        return self.get_papers([row[0] for row in rows])
+
+    def get_summaries(self, entry_ids: List[str], model: str) -> Dict[str, str]:
+        """Cached summaries by entry_id for the papers that have one."""
+        if not entry_ids:
+            return {}
+        placeholders = ",".join("?" * len(entry_ids))
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT entry_id, summary FROM summaries WHERE model = ? AND entry_id IN ({placeholders})",
+                [model, *entry_ids]
+            ).fetchall()
+        return dict(rows)
+
+    def set_summary(self, entry_id: str, model: str, summary: str) -> None:
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                (entry_id, model, summary, time.time())
+            )
+            self.db.commit()
@@ -0,0 +1,91 @@
+import os
+import re
+import threading
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+class EmbeddingStore:
+    """Append-only, memory-mapped float32 matrix of embeddings keyed by entry_id.
+
+    Each embedding model gets its own <model>.f32 file (one row per vector)
+    and a <model>.ids sidecar listing the entry_id of every row. Vectors are
+    written before their ids, so a crash between the two leaves only unused
+    trailing rows that are overwritten on the next append.
+    """
+
+    def __init__(self, cache_dir: str, model: str, dim: int):
+        self.directory = os.path.join(cache_dir, "embeddings")
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+        self.vectors_path = os.path.join(self.directory, f"{slug}.f32")
+        self.ids_path = os.path.join(self.directory, f"{slug}.ids")
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, encoding="utf-8") as f:
+                ids = f.read().splitlines()
+            stored = os.path.getsize(self.vectors_path) // (4 * dim) if os.path.exists(self.vectors_path) else 0
+            if stored < len(ids):
+                logger.warning(f"Embedding store {self.vectors_path} is short, dropping {len(ids) - stored} ids")
+                ids = ids[:stored]
+                self._rewrite_ids(ids)
+            self._rows = {entry_id: row for row, entry_id in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._rows
+
+    def _rewrite_ids(self, ids: List[str]) -> None:
+        with open(self.ids_path, "w", encoding="utf-8") as f:
+            f.write("".join(f"{entry_id}\n" for entry_id in ids))
+
+    def _map(self) -> Optional[np.memmap]:
+        """Read-only view of the stored rows, remapped after the file grows."""
+        rows = len(self._rows)
+        if rows == 0:
+            return None
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._matrix
+
+    def missing(self, entry_ids: List[str]) -> List[str]:
+        """The given ids that have no stored vector yet, without duplicates."""
+        return list(dict.fromkeys(entry_id for entry_id in entry_ids if entry_id not in self._rows))
+
+    def add(self, entry_ids: List[str], vectors: np.ndarray) -> None:
+        """Append vectors for ids not stored yet; ids already present keep their vector."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(entry_ids), self.dim):
+            raise ValueError(f"Expected {len(entry_ids)} vectors of size {self.dim}, got {vectors.shape}")
+        with self._lock:
+            new = [i for i, entry_id in enumerate(entry_ids) if entry_id not in self._rows]
+            new = list({entry_ids[i]: i for i in new}.values())
+            if not new:
+                return
+            start = len(self._rows)
+            with open(self.vectors_path, "r+b" if os.path.exists(self.vectors_path) else "wb") as f:
+                f.seek(start * 4 * self.dim)
+                f.write(np.ascontiguousarray(vectors[new]).tobytes())
+                f.truncate()
+            with open(self.ids_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{entry_ids[i]}\n" for i in new))
+            for offset, i in enumerate(new):
+                self._rows[entry_ids[i]] = start + offset
+
+    def get(self, entry_ids: List[str]) -> np.ndarray:
+        """Stored vectors for the given ids as one (n, dim) array; every id must be present."""
+        with self._lock:
+            matrix = self._map()
+            if not entry_ids:
+                return np.empty((0, self.dim), dtype=np.float32)
+            return np.array(matrix[[self._rows[entry_id] for entry_id in entry_ids]])
@@ -1,19 +1,27 @@
 import os
 import json
+import gzip
+import asyncio
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from rich.console import Console
 from rich.markdown import Markdown
 from utils.logger import setup_logger
+from utils.search_index import SearchIndex
+from utils.session_format import EXPORT_FORMATS
 
 logger = setup_logger()
 console = Console()
 
+# Buffer size for export files so each message is not a separate write syscall
+WRITE_BUFFER = 1 << 16
+
 class ExportManager:
     """Manages exports for various features including search results and conversations."""
     
-    def __init__(self, export_dir: str = "exports"):
+    def __init__(self, export_dir: str = "exports", search_index: Optional[SearchIndex] = None):
         self.export_dir = export_dir
+        self.search_index = search_index
         self._ensure_export_directories()
     
     def _ensure_export_directories(self) -> None:
@@ -27,17 +35,98 @@ class ExportManager:
         for directory in directories:
             os.makedirs(directory, exist_ok=True)
     
-    def _generate_filename(self, base_name: str, export_format: str) -> str:
+    def _generate_filename(self, base_name: str, export_format: str, compress: bool = False) -> str:
         """Generate a unique filename for the export."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"{base_name}_{timestamp}.{export_format}"
+        return f"{base_name}_{timestamp}.{export_format}" + (".gz" if compress else "")
+    
+    def _write_stream(self, filepath: str, chunks: Iterator[str], compress: bool = False) -> None:
+        """Write rendered chunks through a buffered (optionally gzip) file; a failed export leaves no file."""
+        try:
+            if compress:
+                f = gzip.open(filepath, 'wt', encoding='utf-8')
+            else:
+                f = open(filepath, 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+            with f:
+                for chunk in chunks:
+                    f.write(chunk)
+        except BaseException:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
+    
+    def _stream_json(self, header: Dict[str, Any], key: str, items: Iterable[Any]) -> Iterator[str]:
+        """Render {**header, key: [items]} as indented JSON one item at a time."""
+        yield "{\n"
+        for field, value in header.items():
+            yield f'  {json.dumps(field)}: {json.dumps(value, ensure_ascii=False)},\n'
+        yield f'  {json.dumps(key)}: ['
+        separator = "\n"
+        for item in items:
+            yield separator + "    " + json.dumps(item, ensure_ascii=False)
+            separator = ",\n"
+        yield ("\n  ]" if separator != "\n" else "]") + "\n}\n"
+    
+    def _stream_jsonl(self, items: Iterable[Any]) -> Iterator[str]:
+        for item in items:
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+    
+    def _render_search_results(self,
+                               results: Iterable[Dict[str, Any]],
+                               search_type: str,
+                               query: str,
+                               export_format: str) -> Iterator[str]:
+        """Yield the export one result at a time."""
+        if export_format == "json":
+            header = {"type": search_type, "query": query, "timestamp": datetime.now().isoformat()}
+            yield from self._stream_json(header, "results", results)
+        
+        elif export_format == "jsonl":
+            yield from self._stream_jsonl(results)
+        
+        elif export_format == "md":
+            yield (f"# {search_type.title()} Search Results\n\n"
+                   f"**Query:** {query}\n\n"
+                   f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            
+            for i, result in enumerate(results, 1):
+                if search_type == "web":
+                    yield (f"## Result {i}\n\n"
+                           f"**Title:** {result.get('title', 'N/A')}\n\n"
+                           f"**URL:** {result.get('url', 'N/A')}\n\n"
+                           f"**Summary:** {result.get('summary', 'N/A')}\n\n")
+                else:
+                    yield (f"## Result {i}\n\n"
+                           f"**Title:** {result.get('title', 'N/A')}\n\n"
+                           f"**Authors:** {', '.join(result.get('authors', []))}\n\n"
+                           f"**Abstract:** {result.get('abstract', 'N/A')}\n\n"
+                           f"**URL:** {result.get('url', 'N/A')}\n\n")
+        
+        elif export_format == "txt":
+            yield (f"{search_type.upper()} SEARCH RESULTS\n\n"
+                   f"Query: {query}\n"
+                   f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            
+            for i, result in enumerate(results, 1):
+                if search_type == "web":
+                    yield (f"Result {i}:\n"
+                           f"Title: {result.get('title', 'N/A')}\n"
+                           f"URL: {result.get('url', 'N/A')}\n"
+                           f"Summary: {result.get('summary', 'N/A')}\n\n")
+                else:
+                    yield (f"Result {i}:\n"
+                           f"Title: {result.get('title', 'N/A')}\n"
+                           f"Authors: {', '.join(result.get('authors', []))}\n"
+                           f"Abstract: {result.get('abstract', 'N/A')}\n"
+                           f"URL: {result.get('url', 'N/A')}\n\n")
     
     def export_search_results(self, 
-                            results: List[Dict[str, Any]], 
+                            results: Iterable[Dict[str, Any]], 
                             search_type: str,
                             query: str,
-                            export_format: str = "md") -> str:
-        """Export search results to a file."""
+                            export_format: str = "md",
+                            compress: bool = False) -> str:
+        """Export search results to a file, streaming them from any iterable."""
         try:
             # Determine export directory based on search type
             if search_type == "web":
@@ -47,111 +136,92 @@ class ExportManager:
             else:
                 raise ValueError(f"Invalid search type: {search_type}")
             
+            if export_format not in EXPORT_FORMATS:
+                raise ValueError(f"Unsupported export format: {export_format}")
+            
             export_path = os.path.join(self.export_dir, subdir)
-            filename = self._generate_filename(f"{search_type}_search", export_format)
+            filename = self._generate_filename(f"{search_type}_search", export_format, compress)
             filepath = os.path.join(export_path, filename)
             
-            if export_format == "md":
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(f"# {search_type.title()} Search Results\n\n")
-                    f.write(f"**Query:** {query}\n\n")
-                    f.write(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                    
-                    for i, result in enumerate(results, 1):
-                        f.write(f"## Result {i}\n\n")
-                        if search_type == "web":
-                            f.write(f"**Title:** {result.get('title', 'N/A')}\n\n")
-                            f.write(f"**URL:** {result.get('url', 'N/A')}\n\n")
-                            f.write(f"**Summary:** {result.get('summary', 'N/A')}\n\n")
-                        elif search_type == "arxiv":
-                            f.write(f"**Title:** {result.get('title', 'N/A')}\n\n")
-                            f.write(f"**Authors:** {', '.join(result.get('authors', []))}\n\n")
-                            f.write(f"**Abstract:** {result.get('abstract', 'N/A')}\n\n")
-                            f.write(f"**URL:** {result.get('url', 'N/A')}\n\n")
-            
-            elif export_format == "json":
-                export_data = {
-                    "type": search_type,
-                    "query": query,
-                    "timestamp": datetime.now().isoformat(),
-                    "results": results
-                }
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False)
-            
-            elif export_format == "txt":
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(f"{search_type.upper()} SEARCH RESULTS\n\n")
-                    f.write(f"Query: {query}\n")
-                    f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                    
-                    for i, result in enumerate(results, 1):
-                        f.write(f"Result {i}:\n")
-                        if search_type == "web":
-                            f.write(f"Title: {result.get('title', 'N/A')}\n")
-                            f.write(f"URL: {result.get('url', 'N/A')}\n")
-                            f.write(f"Summary: {result.get('summary', 'N/A')}\n")
-                        elif search_type == "arxiv":
-                            f.write(f"Title: {result.get('title', 'N/A')}\n")
-                            f.write(f"Authors: {', '.join(result.get('authors', []))}\n")
-                            f.write(f"Abstract: {result.get('abstract', 'N/A')}\n")
-                            f.write(f"URL: {result.get('url', 'N/A')}\n")
-                        f.write("\n")
-            
-            else:
-                raise ValueError(f"Unsupported export format: {export_format}")
+            self._write_stream(
+                filepath,
+                self._render_search_results(results, search_type, query, export_format),
+                compress
+            )
             
             return filename
         
         except Exception as e:
             logger.error(f"Error exporting search results: {str(e)}")
             raise
-
+    
+    async def export_search_results_async(self,
+                                          results: Iterable[Dict[str, Any]],
+                                          search_type: str,
+                                          query: str,
+                                          export_format: str = "md",
+                                          compress: bool = False) -> str:
+        """Run export_search_results in a worker thread so the event loop is not blocked."""
+        return await asyncio.to_thread(
+            self.export_search_results, results, search_type, query, export_format, compress
+        )
+    
+    def _render_conversation(self, conversation: Iterable[Dict[str, str]], export_format: str) -> Iterator[str]:
+        """Yield the export one message at a time."""
+        if export_format == "json":
+            yield from self._stream_json({"timestamp": datetime.now().isoformat()}, "conversation", conversation)
+        
+        elif export_format == "jsonl":
+            yield from self._stream_jsonl(conversation)
+        
+        elif export_format == "md":
+            yield ("# AI Assistant Conversation\n\n"
+                   f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            
+            for msg in conversation:
+                # Add separator between messages
+                yield f"## {msg['role'].title()}\n\n{msg['content']}\n\n---\n\n"
+        
+        elif export_format == "txt":
+            yield ("AI Assistant Conversation\n"
+                   f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            
+            for msg in conversation:
+                # Add clear separator
+                yield f"{msg['role'].upper()}:\n{msg['content']}\n\n" + "="*50 + "\n\n"
+    
     def export_conversation(self, 
-                          conversation: List[Dict[str, str]], 
+                          conversation: Iterable[Dict[str, str]], 
                           export_format: str = "md",
-                          name: Optional[str] = None) -> str:
-        """Enhanced version of conversation export with better formatting."""
+                          name: Optional[str] = None,
+                          compress: bool = False) -> str:
+        """Export a conversation, streaming messages from any iterable so memory stays bounded.
+        
+        Lists are also added to the search index; a one-shot iterator is not kept around for it.
+        """
         try:
+            if export_format not in EXPORT_FORMATS:
+                raise ValueError(f"Unsupported export format: {export_format}")
+            
             export_path = os.path.join(self.export_dir, "conversations")
             base_name = name or "conversation"
-            filename = self._generate_filename(base_name, export_format)
+            filename = self._generate_filename(base_name, export_format, compress)
             filepath = os.path.join(export_path, filename)
             
-            if export_format == "md":
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write("# AI Assistant Conversation\n\n")
-                    f.write(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                    
-                    for msg in conversation:
-                        role = msg['role'].title()
-                        content = msg['content']
-                        f.write(f"## {role}\n\n{content}\n\n")
-                        f.write("---\n\n")  # Add separator between messages
-            
-            elif export_format == "json":
-                export_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "conversation": conversation
-                }
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False)
-            
-            elif export_format == "txt":
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write("AI Assistant Conversation\n")
-                    f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                    
-                    for msg in conversation:
-                        f.write(f"{msg['role'].upper()}:\n")
-                        f.write(f"{msg['content']}\n")
-                        f.write("\n" + "="*50 + "\n\n")  # Add clear separator
-            
-            else:
-                raise ValueError(f"Unsupported export format: {export_format}")
+            self._write_stream(filepath, self._render_conversation(conversation, export_format), compress)
             
+            if self.search_index and isinstance(conversation, (list, tuple)):
+                self.search_index.index_conversation(filepath, "exports", conversation)
             return filename
         
         except Exception as e:
             logger.error(f"Error exporting conversation: {str(e)}")
             raise
+    
+    async def export_conversation_async(self,
+                                        conversation: Iterable[Dict[str, str]],
+                                        export_format: str = "md",
+                                        name: Optional[str] = None,
+                                        compress: bool = False) -> str:
+        """Run export_conversation in a worker thread so the event loop is not blocked."""
+        return await asyncio.to_thread(self.export_conversation, conversation, export_format, name, compress)
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+import aiohttp
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+class PdfLibrary:
+    """Downloads paper PDFs into a content-addressed cache and extracts their text once.
+
+    PDFs are stored as <sha256>.pdf, so the same file reached through different
+    URLs is kept once. Text is extracted page by page into a chunked store and
+    progress is committed per page, so an interrupted extraction resumes where
+    it stopped.
+    """
+
+    def __init__(self,
+                 cache_dir: str = "cache",
+                 concurrency: int = 4,
+                 chunk_chars: int = 4000,
+                 timeout: float = 60.0):
+        self.pdf_dir = os.path.join(cache_dir, "pdfs")
+        self.concurrency = concurrency
+        self.chunk_chars = chunk_chars
+        self.timeout = timeout
+        os.makedirs(self.pdf_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Extraction runs in worker threads
+        self.db = sqlite3.connect(os.path.join(self.pdf_dir, "text.db"), check_same_thread=False)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                entry_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                fetched REAL NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS extracts (
+                sha256 TEXT PRIMARY KEY,
+                page_count INTEGER NOT NULL,
+                pages_done INTEGER NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS chunks (
+                sha256 TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (sha256, page, seq)
+            )"""
+        )
+        self.db.commit()
+
+    @classmethod
+    def from_config(cls, config) -> "PdfLibrary":
+        return cls(
+            cache_dir=config.get("Cache", "cache_dir", fallback="cache"),
+            concurrency=int(config.get("ArXiv", "pdf_concurrency", fallback="4")),
+            chunk_chars=int(config.get("ArXiv", "pdf_chunk_chars", fallback="4000")),
+            timeout=float(config.get("ArXiv", "pdf_timeout", fallback="60"))
+        )
+
+    def _pdf_path(self, sha256: str) -> str:
+        return os.path.join(self.pdf_dir, f"{sha256}.pdf")
+
+    def _document(self, entry_id: str) -> Optional[str]:
+        with self._lock:
+            row = self.db.execute("SELECT sha256 FROM documents WHERE entry_id = ?", (entry_id,)).fetchone()
+        return row[0] if row and os.path.exists(self._pdf_path(row[0])) else None
+
+    def is_extracted(self, entry_id: str) -> bool:
+        sha256 = self._document(entry_id)
+        if sha256 is None:
+            return False
+        with self._lock:
+            row = self.db.execute(
+                "SELECT page_count, pages_done FROM extracts WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        return row is not None and row[1] >= row[0]
+
+    async def fetch_many(self, papers: List[Dict[str, Any]]) -> Dict[str, bool]:
+        """Download and extract the given papers; returns entry_id -> success.
+
+        Downloads share one HTTP session (so connections are reused) and at most
+        `concurrency` run at once; each PDF is extracted as soon as it arrives.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as session:
+            outcomes = await asyncio.gather(*(
+                self._fetch_one(session, semaphore, paper) for paper in papers
+            ))
+        return {paper['url']: ok for paper, ok in zip(papers, outcomes)}
+
+    async def _fetch_one(self,
+                         session: aiohttp.ClientSession,
+                         semaphore: asyncio.Semaphore,
+                         paper: Dict[str, Any]) -> bool:
+        entry_id = paper['url']
+        try:
+            sha256 = self._document(entry_id)
+            if sha256 is None:
+                async with semaphore:
+                    sha256 = await self._download(session, paper['pdf_url'])
+                with self._lock:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                        (entry_id, paper['pdf_url'], sha256, time.time())
+                    )
+                    self.db.commit()
+            await asyncio.to_thread(self._extract, sha256)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error fetching PDF for {entry_id}: {str(e)}")
+            return False
+
+    async def _download(self, session: aiohttp.ClientSession, url: str) -> str:
+        """Stream a PDF to disk while hashing it, then file it under its hash."""
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(self.pdf_dir, f".{os.getpid()}_{id(digest)}.part")
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    async for block in response.content.iter_chunked(1 << 16):
+                        digest.update(block)
+                        f.write(block)
+            sha256 = digest.hexdigest()
+            if os.path.exists(self._pdf_path(sha256)):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, self._pdf_path(sha256))
+            return sha256
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _extract(self, sha256: str) -> None:
+        """Extract remaining pages into chunks, committing after each page."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT page_count, pages_done FROM extracts WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        if row is not None and row[1] >= row[0]:
+            return
+
+        from pypdf import PdfReader  # only needed once PDFs are actually used
+
+        reader = PdfReader(self._pdf_path(sha256))
+        page_count = len(reader.pages)
+        with self._lock:
+            self.db.execute("INSERT OR IGNORE INTO extracts VALUES (?, ?, 0)", (sha256, page_count))
+            self.db.commit()
+        pages_done = row[1] if row else 0
+
+        for page in range(pages_done, page_count):
+            text = reader.pages[page].extract_text() or ""
+            chunks = self._split(text)
+            with self._lock:
+                self.db.execute("DELETE FROM chunks WHERE sha256 = ? AND page = ?", (sha256, page))
+                self.db.executemany(
+                    "INSERT INTO chunks VALUES (?, ?, ?, ?)",
+                    [(sha256, page, seq, chunk) for seq, chunk in enumerate(chunks)]
+                )
+                self.db.execute("UPDATE extracts SET pages_done = ? WHERE sha256 = ?", (page + 1, sha256))
+                self.db.commit()
+
+    def _split(self, text: str) -> List[str]:
+        """Split page text into chunks of at most chunk_chars, preferring paragraph breaks."""
+        chunks = []
+        current = ""
+        for paragraph in text.split("\n\n"):
+            while len(paragraph) > self.chunk_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(paragraph[:self.chunk_chars])
+                paragraph = paragraph[self.chunk_chars:]
+            if current and len(current) + len(paragraph) + 2 > self.chunk_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current.strip():
+            chunks.append(current)
+        return chunks
+
+    def get_chunks(self, entry_id: str) -> List[str]:
+        """Extracted text chunks of a paper in reading order (empty if not fetched)."""
+        sha256 = self._document(entry_id)
+        if sha256 is None:
+            return []
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT text FROM chunks WHERE sha256 = ? ORDER BY page, seq", (sha256,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_text(self, entry_id: str, max_chars: int) -> str:
+        """Leading extracted text of a paper, cut at a chunk boundary within max_chars."""
+        text = []
+        used = 0
+        for chunk in self.get_chunks(entry_id):
+            if used + len(chunk) > max_chars:
+                if not text:
+                    text.append(chunk[:max_chars])
+                break
+            text.append(chunk)
+            used += len(chunk)
+        return "\n\n".join(text)
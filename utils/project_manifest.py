@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Any, Set
+
+from models.context_budget import CHARS_PER_TOKEN
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+MANIFEST_FILE = ".codegen_manifest.json"
+IGNORED_DIRS = {".git", "__pycache__", ".venv", "venv", ".pytest_cache", ".mypy_cache", "node_modules"}
+WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]+")
+# Common request words that say nothing about which file is meant
+STOP_WORDS = {"the", "and", "for", "with", "add", "make", "use", "that", "this", "from", "into", "should",
+              "when", "all", "are", "can", "not", "file", "files", "code", "please", "also", "have"}
+
+class ProjectManifest:
+    """Content hashes of a generated project's files, refreshed incrementally.
+
+    Hashes are cached in .codegen_manifest.json with each file's size and
+    mtime, so a rescan only reads files that changed since the last one.
+    """
+
+    def __init__(self, project_dir: str):
+        self.project_dir = project_dir
+        self.path = os.path.join(project_dir, MANIFEST_FILE)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # Files edited outside the generator since the previous scan
+        self.changed: Set[str] = set()
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def scan(self) -> Dict[str, Dict[str, Any]]:
+        """Map relative path -> {"size", "mtime_ns", "sha256"} for every project file."""
+        cached = self._load_cache()
+        files = {}
+        changed = set()
+        for root, dirs, names in os.walk(self.project_dir):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS and not d.endswith(".egg-info"))
+            for name in sorted(names):
+                full_path = os.path.join(root, name)
+                relative_path = os.path.relpath(full_path, self.project_dir).replace(os.sep, "/")
+                if relative_path == MANIFEST_FILE:
+                    continue
+                stat = os.stat(full_path)
+                entry = cached.get(relative_path)
+                if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                    with open(full_path, "rb") as f:
+                        entry = {
+                            "size": stat.st_size,
+                            "mtime_ns": stat.st_mtime_ns,
+                            "sha256": hashlib.sha256(f.read()).hexdigest()
+                        }
+                if cached and cached.get(relative_path, {}).get("sha256") != entry["sha256"]:
+                    changed.add(relative_path)
+                files[relative_path] = entry
+        self.files = files
+        self.changed = changed
+        self.save()
+        return files
+
+    def save(self) -> None:
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.files, f, indent=1, sort_keys=True)
+        except OSError as e:
+            logger.error(f"Error saving project manifest: {str(e)}")
+
+    def describe(self) -> str:
+        """One manifest line per file, as sent to the model."""
+        return "\n".join(
+            f"{path}  {entry['size']} bytes  sha256:{entry['sha256'][:12]}" for path, entry in self.files.items()
+        )
+
+    def read(self, path: str) -> str:
+        with open(os.path.join(self.project_dir, path), encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    def select_relevant(self, request: str, max_tokens: int, always: Set[str] = frozenset()) -> Dict[str, str]:
+        """Contents of the files most related to a change request, within a token budget.
+
+        Files named in the request (or in `always`) come first, then files
+        sharing the most distinctive words with the request; words found in
+        more than half of the files do not count.
+        """
+        terms = {word.lower() for word in WORD.findall(request)} - STOP_WORDS
+        lowered = request.lower()
+        candidates = []
+        for path, entry in self.files.items():
+            if entry["size"] > max_tokens * CHARS_PER_TOKEN:
+                continue
+            try:
+                content = self.read(path)
+            except OSError:
+                continue
+            path_words = {word.lower() for word in WORD.findall(path)}
+            words = path_words | {word.lower() for word in WORD.findall(content)}
+            candidates.append((path, content, path_words, words & terms))
+
+        document_frequency: Dict[str, int] = {}
+        for _, _, _, matched in candidates:
+            for term in matched:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        distinctive = {term for term, count in document_frequency.items() if count <= max(len(candidates) // 2, 1)}
+
+        scored = []
+        for path, content, path_words, matched in candidates:
+            name = os.path.basename(path).lower()
+            if path in always or path.lower() in lowered or (len(name) > 3 and name in lowered):
+                score = float("inf")
+            else:
+                matched &= distinctive
+                score = 3 * len(matched & path_words) + len(matched)
+            if score > 0:
+                scored.append((score, path, content))
+
+        selected = {}
+        used = 0
+        for score, path, content in sorted(scored, key=lambda item: (-item[0], item[1])):
+            tokens = (len(path) + len(content)) // CHARS_PER_TOKEN + 8
+            if used + tokens > max_tokens:
+                continue
+            selected[path] = content
+            used += tokens
+        return selected
@@ -0,0 +1,246 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Inside a JSON string only quotes and backslashes change the scanner state
+STRING_SPECIAL = re.compile(r'["\\]')
+STRUCTURAL = re.compile(r'["{}\[\]:]')
+
+class ProjectStreamParser:
+    """Incremental parser for the {"files": [{"path", "content"}, ...], ...} project reply.
+
+    Text is fed chunk by chunk as the model streams it. Every entry of the
+    "files" array is returned by feed() as soon as its closing brace arrives,
+    and only the entry currently being received is buffered. Everything else
+    in the top-level object (such as "dependencies") is kept and returned by
+    close(). Text around the object, like markdown fences, is ignored.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.seen_files = False
+        self.in_files = False
+        self.files_count = 0
+        # Strings directly inside the top-level object, to know which key a value belongs to
+        self._string: Optional[List[str]] = None
+        self._last_string = ""
+        self._key = ""
+        self._entry: Optional[List[str]] = None
+        self._rest: List[str] = []
+
+    def _capture(self, text: str) -> None:
+        if self._entry is not None:
+            self._entry.append(text)
+        elif not self.in_files:
+            self._rest.append(text)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume the next piece of the reply; returns the file entries it completed."""
+        entries = []
+        i = 0
+        n = len(chunk)
+        while i < n and not self.done:
+            if not self.started:
+                i = chunk.find("{", i)
+                if i == -1:
+                    break
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    end = i + 1
+                else:
+                    # Jump straight to the next quote or backslash
+                    match = STRING_SPECIAL.search(chunk, i)
+                    if match is None:
+                        end = n
+                    else:
+                        end = match.end()
+                        if match.group() == "\\":
+                            self.escape = True
+                        else:
+                            self.in_string = False
+                if self._string is not None:
+                    self._string.append(chunk[i:end])
+                    if not self.in_string:
+                        self._last_string = json.loads('"' + "".join(self._string))
+                        self._string = None
+                self._capture(chunk[i:end])
+                i = end
+                continue
+
+            match = STRUCTURAL.search(chunk, i)
+            if match is None:
+                self._capture(chunk[i:])
+                break
+            if match.start() > i:
+                self._capture(chunk[i:match.start()])
+            i = match.end()
+            entry = self._structural(match.group())
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def _structural(self, char: str) -> Optional[Dict[str, Any]]:
+        depth = len(self.stack)
+        if char == '"':
+            self.in_string = True
+            if depth == 1:
+                self._string = []
+            self._capture(char)
+            return None
+        if char == ":":
+            if depth == 1:
+                self._key = self._last_string
+            self._capture(char)
+            return None
+
+        if char in "{[":
+            self.started = True
+            if char == "[" and depth == 1 and self._key == "files" and not self.seen_files:
+                # Entries are handed out as they complete; the rest keeps an empty array
+                self._rest.append("[]")
+                self.seen_files = self.in_files = True
+            elif char == "{" and self.in_files and depth == 2:
+                self._entry = []
+            self._capture(char)
+            self.stack.append(char)
+            return None
+
+        # Closing bracket
+        if not self.stack:
+            return None
+        self._capture(char)
+        self.stack.pop()
+        depth = len(self.stack)
+        if depth == 2 and self._entry is not None:
+            text = "".join(self._entry)
+            self._entry = None
+            self.files_count += 1
+            return json.loads(text)
+        if depth == 1 and self.in_files:
+            self.in_files = False
+        elif depth == 0:
+            self.done = True
+        return None
+
+    def close(self) -> Dict[str, Any]:
+        """The rest of the project object, with an empty "files" list; raises if it was not complete."""
+        if not self.started:
+            raise ValueError("No valid JSON object found in response")
+        if not self.done:
+            raise json.JSONDecodeError("Response ended inside the project object", "".join(self._rest), 0)
+        if not self.seen_files:
+            raise ValueError("No files specified in project structure")
+        return json.loads("".join(self._rest))
+
+class ProjectWriter:
+    """Writes project files on a bounded thread pool while the reply is still streaming.
+
+    Directories are created on the calling thread, each one once, so workers
+    only open and write files.
+    """
+
+    def __init__(self, project_dir: str, max_workers: int = 4):
+        self.project_dir = project_dir
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="project-writer")
+        self._directories = set()
+        self._writes: List[Tuple[str, Future]] = []
+        self._latest: Dict[str, Future] = {}
+        # Final content per relative path, for steps that use the files after writing
+        self.contents: Dict[str, str] = {}
+
+    def resolve(self, relative_path: str) -> Optional[str]:
+        """Absolute file path, or None when the path would leave the project directory."""
+        root = os.path.abspath(self.project_dir)
+        path = os.path.abspath(os.path.join(root, relative_path))
+        if os.path.isabs(relative_path) or not path.startswith(root + os.sep):
+            return None
+        return path
+
+    def _ensure_directory(self, directory: str) -> None:
+        if directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            # Every parent now exists too
+            while directory not in self._directories:
+                self._directories.add(directory)
+                directory = os.path.dirname(directory)
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def submit(self, file_info: Any) -> bool:
+        """Queue one {"path", "content"} entry; invalid entries are skipped."""
+        if (not isinstance(file_info, dict) or not isinstance(file_info.get("path"), str)
+                or not isinstance(file_info.get("content"), str)):
+            logger.warning(f"Skipping invalid file info: {str(file_info)[:200]}")
+            return False
+        path = self.resolve(file_info["path"])
+        if path is None:
+            logger.warning(f"Skipping file outside the project: {file_info['path']}")
+            return False
+        self._ensure_directory(os.path.dirname(path))
+        if path in self._latest:
+            # A repeated path replaces the earlier content, so the writes must not overlap
+            self._latest[path].result()
+        future = self._latest[path] = self.executor.submit(self._write, path, file_info["content"])
+        self._writes.append((file_info["path"], future))
+        self.contents[file_info["path"]] = file_info["content"]
+        return True
+
+    def wait(self, relative_path: str) -> None:
+        """Block until any queued write of a path has finished."""
+        path = self.resolve(relative_path)
+        if path in self._latest:
+            self._latest[path].result()
+
+    def delete(self, relative_path: str) -> bool:
+        """Remove a project file once its queued writes are done; False if there is none."""
+        path = self.resolve(relative_path)
+        if path is None:
+            logger.warning(f"Skipping file outside the project: {relative_path}")
+            return False
+        self.wait(relative_path)
+        self.contents.pop(relative_path, None)
+        if not os.path.isfile(path):
+            return False
+        os.remove(path)
+        return True
+
+    def submit_dependencies(self, dependencies: Any) -> None:
+        if not dependencies:
+            return
+        if not isinstance(dependencies, list):
+            raise ValueError("Dependencies must be a list")
+        self.submit({
+            "path": "requirements.txt",
+            "content": "".join(f"{dep}\n" for dep in dependencies if isinstance(dep, str))
+        })
+
+    def finish(self) -> List[str]:
+        """Wait for all writes; returns the written paths in submission order."""
+        try:
+            created_files = []
+            for relative_path, future in self._writes:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error creating file {relative_path}: {str(e)}")
+                    raise
+                if relative_path not in created_files:
+                    created_files.append(relative_path)
+            return created_files
+        finally:
+            self.executor.shutdown(wait=True)
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import List, Dict, Any, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Hits whose access times are written in one transaction at most this many reads apart
+TOUCH_BATCH = 64
+
+class ResponseCache:
+    """On-disk LRU cache for provider responses with TTL expiry.
+
+    Reads do not write: access times of hits are kept in memory and flushed in
+    one transaction on the next set(), flush() or close(), or every TOUCH_BATCH hits.
+    """
+
+    def __init__(self,
+                 cache_dir: str = "cache",
+                 ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 10000,
+                 allow_sampling: bool = False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.allow_sampling = allow_sampling
+        self.hits = 0
+        self.misses = 0
+        self._touched: Dict[str, float] = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(cache_dir, "responses.db"))
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self.db.commit()
+
+    @classmethod
+    def from_config(cls, config) -> Optional["ResponseCache"]:
+        """Create a cache from the [Cache] config section, or None when disabled."""
+        if config.get("Cache", "enabled", fallback="false").lower() != "true":
+            return None
+        return cls(
+            cache_dir=config.get("Cache", "cache_dir", fallback="cache"),
+            ttl=float(config.get("Cache", "ttl_seconds", fallback=str(7 * 24 * 3600))),
+            max_entries=int(config.get("Cache", "max_entries", fallback="10000")),
+            allow_sampling=config.get("Cache", "allow_sampling", fallback="false").lower() == "true"
+        )
+
+    def is_cacheable(self, model_config) -> bool:
+        """Only deterministic calls are cached unless sampling is explicitly allowed."""
+        return self.allow_sampling or model_config.temperature == 0
+
+    def make_key(self,
+                 kind: str,
+                 provider: str,
+                 model: str,
+                 model_config,
+                 messages: List[Dict[str, Any]]) -> str:
+        """Build a cache key from the call type, provider, model parameters and messages."""
+        payload = json.dumps({
+            "kind": kind,
+            "provider": provider,
+            "model": model,
+            "params": model_config.model_dump(),
+            "messages": messages
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None when missing or expired."""
+        try:
+            row = self.db.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.db.commit()
+                self.misses += 1
+                return None
+
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH:
+                self.flush()
+            self.hits += 1
+            return row[0]
+
+        except sqlite3.Error as e:
+            logger.error(f"Response cache read error: {str(e)}")
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response and evict least recently used entries beyond max_entries."""
+        try:
+            # Eviction below must see recent hits
+            self._write_touched()
+            now = time.time()
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self.db.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+            self.db.commit()
+
+        except sqlite3.Error as e:
+            logger.error(f"Response cache write error: {str(e)}")
+
+    def _write_touched(self) -> None:
+        if self._touched:
+            self.db.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(last_access, key) for key, last_access in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def flush(self) -> None:
+        """Write pending access times of cache hits."""
+        try:
+            if self._touched:
+                self._write_touched()
+                self.db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Response cache write error: {str(e)}")
+
+    def close(self) -> None:
+        self.flush()
+        self.db.close()
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._touched.clear()
+        self.db.execute("DELETE FROM responses")
+        self.db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of stored entries."""
+        entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
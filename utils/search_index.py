@@ -0,0 +1,168 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Optional
+from utils.logger import setup_logger
+from utils.session_format import SessionCodec, is_session_file, is_export_file
+
+logger = setup_logger()
+
+# Markers put around matched terms in snippets; callers swap them for their own highlighting
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+class SearchIndex:
+    """SQLite FTS5 full-text index over saved sessions and conversation exports.
+
+    Session and JSON/JSONL export files are indexed one message per row so results
+    point at the matching turn; markdown and text exports are indexed as a whole.
+    Gzip-compressed exports are read transparently.
+    Files are re-read only when their size or mtime changes.
+    """
+
+    def __init__(self, db_path: str = os.path.join("cache", "search.db")):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._codecs: Dict[str, SessionCodec] = {}
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                path TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS messages USING fts5(
+                path UNINDEXED,
+                role UNINDEXED,
+                seq UNINDEXED,
+                content,
+                tokenize = 'porter unicode61'
+            )"""
+        )
+        self.db.commit()
+
+    def index_conversation(self, path: str, source: str, conversation: List[Dict[str, str]]) -> None:
+        """Index a conversation that is already in memory, replacing the file's previous entries."""
+        self._replace(path, source, [
+            (msg.get("role", ""), seq, msg.get("content", ""))
+            for seq, msg in enumerate(conversation)
+        ])
+
+    def index_file(self, path: str, source: str) -> None:
+        """Read and index a session or export file."""
+        try:
+            if is_session_file(path):
+                directory, filename = os.path.split(path)
+                codec = self._codecs.setdefault(directory, SessionCodec(directory))
+                data = codec.read(filename)
+                conversation = data.get("conversation", []) if isinstance(data, dict) else []
+                self.index_conversation(path, source, conversation)
+            else:
+                opener = gzip.open if path.endswith(".gz") else open
+                with opener(path, 'rt', encoding='utf-8') as f:
+                    if path.endswith((".jsonl", ".jsonl.gz")):
+                        messages = (json.loads(line) for line in f if line.strip())
+                        rows = [
+                            (msg.get("role", ""), seq, msg.get("content", ""))
+                            for seq, msg in enumerate(messages)
+                        ]
+                    else:
+                        rows = [("", 0, f.read())]
+                self._replace(path, source, rows)
+        except (ValueError, OSError, AttributeError) as e:
+            logger.warning(f"Skipping unreadable file {path}: {str(e)}")
+
+    def _replace(self, path: str, source: str, rows: List[tuple]) -> None:
+        stat = os.stat(path)
+        with self._lock:
+            self.db.execute("DELETE FROM messages WHERE path = ?", (path,))
+            self.db.executemany(
+                "INSERT INTO messages (path, role, seq, content) VALUES (?, ?, ?, ?)",
+                [(path, role, seq, content) for role, seq, content in rows]
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                (path, source, stat.st_size, stat.st_mtime)
+            )
+            self.db.commit()
+
+    def remove(self, path: str) -> None:
+        """Drop a deleted file from the index."""
+        with self._lock:
+            self.db.execute("DELETE FROM messages WHERE path = ?", (path,))
+            self.db.execute("DELETE FROM documents WHERE path = ?", (path,))
+            self.db.commit()
+
+    def sync(self, directories: Dict[str, str]) -> int:
+        """Bring the index in line with the files in {source: directory}.
+
+        Only new or changed files are read. Returns the number of indexed files.
+        """
+        try:
+            with self._lock:
+                indexed = {
+                    row[0]: (row[1], row[2])
+                    for row in self.db.execute("SELECT path, size, mtime FROM documents")
+                }
+
+            present = set()
+            for source, directory in directories.items():
+                if not os.path.isdir(directory):
+                    continue
+                for filename in os.listdir(directory):
+                    if not (is_session_file(filename) or is_export_file(filename)):
+                        continue
+                    path = os.path.join(directory, filename)
+                    present.add(path)
+                    stat = os.stat(path)
+                    if indexed.get(path) != (stat.st_size, stat.st_mtime):
+                        self.index_file(path, source)
+
+            prefixes = tuple(os.path.join(directory, "") for directory in directories.values())
+            for path in indexed:
+                if path.startswith(prefixes) and path not in present:
+                    self.remove(path)
+
+            with self._lock:
+                return self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+        except Exception as e:
+            logger.error(f"Error syncing search index: {str(e)}")
+            raise
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Best matching messages first, each with a snippet around the matched terms."""
+        match = build_match_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self.db.execute(
+                f"""SELECT m.path, d.source, m.role, m.seq,
+                           snippet(messages, 3, '{MATCH_START}', '{MATCH_END}', '...', 16),
+                           bm25(messages)
+                    FROM messages m JOIN documents d ON d.path = m.path
+                    WHERE messages MATCH ?
+                    ORDER BY bm25(messages)
+                    LIMIT ?""",
+                (match, limit)
+            ).fetchall()
+        return [
+            {"path": path, "source": source, "role": role, "seq": seq, "snippet": snippet, "score": -rank}
+            for path, source, role, seq, snippet, rank in rows
+        ]
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching all terms; a trailing * keeps prefix search."""
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
@@ -0,0 +1,145 @@
+import gzip
+import json
+import os
+from typing import Dict, Any, List, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+# Extension of each session format; the legacy plain-JSON format comes first
+SESSION_EXTENSIONS = {
+    "json": ".json",
+    "gzip": ".json.gz",
+    "zstd": ".json.zst",
+}
+
+# Trained zstd dictionaries live here, one file per dictionary id so old sessions stay readable
+DICTIONARY_DIR = "dicts"
+
+# Formats every conversation export supports; any of them can also be gzip-compressed
+EXPORT_FORMATS = ("md", "txt", "json", "jsonl")
+
+def is_session_file(filename: str) -> bool:
+    return filename.endswith(tuple(SESSION_EXTENSIONS.values()))
+
+def is_export_file(filename: str) -> bool:
+    return filename.endswith(tuple(f".{fmt}{gz}" for fmt in EXPORT_FORMATS for gz in ("", ".gz")))
+
+def session_name(filename: str) -> str:
+    """Session name without its format extension."""
+    # Check the longer compressed extensions before plain .json
+    for ext in sorted(SESSION_EXTENSIONS.values(), key=len, reverse=True):
+        if filename.endswith(ext):
+            return filename[:-len(ext)]
+    return os.path.splitext(filename)[0]
+
+def resolve_compression(compression: Optional[str]) -> str:
+    """Normalize a configured format name, falling back to gzip when zstandard is missing."""
+    compression = (compression or "json").lower()
+    if compression in ("none", "off", "false"):
+        compression = "json"
+    if compression not in SESSION_EXTENSIONS:
+        raise ValueError(f"Unknown session format: {compression}")
+    if compression == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, storing sessions with gzip instead")
+        compression = "gzip"
+    return compression
+
+class SessionCodec:
+    """Reads and writes session files in any supported format."""
+
+    def __init__(self, sessions_dir: str, level: Optional[int] = None):
+        self.sessions_dir = sessions_dir
+        self.level = level
+        self._dictionaries: Dict[int, Any] = {}
+        self._decompressors: Dict[int, Any] = {}
+        self._active_dictionary = None
+
+    @property
+    def dictionary_dir(self) -> str:
+        return os.path.join(self.sessions_dir, DICTIONARY_DIR)
+
+    def encode(self, session_data: Dict[str, Any], compression: str) -> bytes:
+        if compression == "json":
+            return json.dumps(session_data, indent=2, ensure_ascii=False).encode("utf-8")
+
+        payload = json.dumps(session_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if compression == "gzip":
+            return gzip.compress(payload, compresslevel=self.level or 6, mtime=0)
+        dictionary = self._load_active_dictionary()
+        return zstandard.ZstdCompressor(level=self.level or 3, dict_data=dictionary).compress(payload)
+
+    def decode(self, filename: str, data: bytes) -> Dict[str, Any]:
+        if filename.endswith(SESSION_EXTENSIONS["gzip"]):
+            data = gzip.decompress(data)
+        elif filename.endswith(SESSION_EXTENSIONS["zstd"]):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {filename}")
+            data = self._decompressor(zstandard.get_frame_parameters(data).dict_id).decompress(data)
+        return json.loads(data.decode("utf-8"))
+
+    def read(self, filename: str) -> Dict[str, Any]:
+        with open(os.path.join(self.sessions_dir, filename), 'rb') as f:
+            return self.decode(filename, f.read())
+
+    def write(self, filename: str, session_data: Dict[str, Any], compression: str) -> None:
+        """Write via a temporary file and swap it in so a crash never leaves a half-written session."""
+        filepath = os.path.join(self.sessions_dir, filename)
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.encode(session_data, compression))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
+    def train_dictionary(self, samples: List[bytes], size: int = 112640) -> Optional[int]:
+        """Train a zstd dictionary on session payloads and make it the one new sessions use.
+
+        Returns the dictionary id, or None when zstandard is missing or there is too little data.
+        """
+        if zstandard is None or len(samples) < 8:
+            return None
+        try:
+            dictionary = zstandard.train_dictionary(size, samples)
+        except zstandard.ZstdError as e:
+            logger.warning(f"Could not train session dictionary: {str(e)}")
+            return None
+
+        dict_id = dictionary.dict_id()
+        os.makedirs(self.dictionary_dir, exist_ok=True)
+        with open(os.path.join(self.dictionary_dir, f"{dict_id}.dict"), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        with open(os.path.join(self.dictionary_dir, "active"), 'w', encoding='utf-8') as f:
+            f.write(str(dict_id))
+        self._dictionaries[dict_id] = dictionary
+        self._active_dictionary = dictionary
+        return dict_id
+
+    def _load_dictionary(self, dict_id: int):
+        if dict_id not in self._dictionaries:
+            path = os.path.join(self.dictionary_dir, f"{dict_id}.dict")
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Session dictionary {dict_id} not found in {self.dictionary_dir}")
+            with open(path, 'rb') as f:
+                self._dictionaries[dict_id] = zstandard.ZstdCompressionDict(f.read())
+        return self._dictionaries[dict_id]
+
+    def _decompressor(self, dict_id: int):
+        """Reuse one decompressor per dictionary; building one with a dictionary is not free."""
+        if dict_id not in self._decompressors:
+            dictionary = self._load_dictionary(dict_id) if dict_id else None
+            self._decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return self._decompressors[dict_id]
+
+    def _load_active_dictionary(self):
+        if self._active_dictionary is None:
+            active_path = os.path.join(self.dictionary_dir, "active")
+            if os.path.exists(active_path):
+                with open(active_path, 'r', encoding='utf-8') as f:
+                    self._active_dictionary = self._load_dictionary(int(f.read().strip()))
+        return self._active_dictionary
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from typing import List, Dict, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+class SessionJournal:
+    """Append-only JSONL journal of a chat session, compacted into a regular session snapshot.
+
+    Each line records one message with its position ("seq") in the conversation.
+    Recovery loads the snapshot written by the last compaction and replays the
+    journal lines that come after it, so a crash between writing the snapshot
+    and truncating the journal never duplicates messages.
+    """
+
+    def __init__(self,
+                 session_manager,
+                 session_id: str,
+                 fsync_every: int = 8,
+                 fsync_interval: float = 1.0,
+                 compact_every: int = 50):
+        self.session_manager = session_manager
+        self.session_id = session_id
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.journal_dir = self.journal_directory(session_manager.sessions_dir)
+        self.path = os.path.join(self.journal_dir, f"{session_id}.jsonl")
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_compact = 0
+        os.makedirs(self.journal_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config, session_manager, session_id: str) -> "SessionJournal":
+        """Create a journal using the [Journal] config section."""
+        return cls(
+            session_manager,
+            session_id,
+            fsync_every=int(config.get("Journal", "fsync_every", fallback="8")),
+            fsync_interval=float(config.get("Journal", "fsync_interval", fallback="1.0")),
+            compact_every=int(config.get("Journal", "compact_every", fallback="50"))
+        )
+
+    @staticmethod
+    def journal_directory(sessions_dir: str) -> str:
+        return os.path.join(sessions_dir, "journal")
+
+    @classmethod
+    def pending(cls, sessions_dir: str) -> List[str]:
+        """Session ids with a non-empty journal left behind by an unclean exit."""
+        journal_dir = cls.journal_directory(sessions_dir)
+        if not os.path.isdir(journal_dir):
+            return []
+        return sorted(
+            filename[:-len(".jsonl")]
+            for filename in os.listdir(journal_dir)
+            if filename.endswith(".jsonl") and os.path.getsize(os.path.join(journal_dir, filename)) > 0
+        )
+
+    def recover(self) -> List[Dict[str, str]]:
+        """Rebuild the latest conversation from the snapshot plus journaled messages."""
+        filename = self.session_manager.find_session(self.session_id)
+        conversation = self.session_manager.load_session(filename) if filename else []
+
+        if not os.path.exists(self.path):
+            return conversation
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves a partial last line
+                    logger.warning(f"Ignoring truncated journal line in {self.path}")
+                    break
+                seq = record.get("seq")
+                if seq is None or seq < len(conversation):
+                    continue  # already part of the snapshot
+                if seq > len(conversation):
+                    logger.warning(f"Journal {self.path} has a gap at message {len(conversation)}")
+                    break
+                conversation.append({"role": record["role"], "content": record["content"]})
+
+        return conversation
+
+    def append(self, message: Dict[str, str], seq: int) -> None:
+        """Journal a message at position `seq`; fsync is batched by count and time."""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+        record = {"seq": seq, "role": message["role"], "content": message["content"]}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        self._since_compact += 1
+
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Force journaled messages to disk."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def should_compact(self) -> bool:
+        return self._since_compact >= self.compact_every
+
+    def compact(self, conversation: List[Dict[str, str]]) -> Optional[str]:
+        """Write the conversation as a session snapshot and empty the journal."""
+        try:
+            self.sync()
+            filename = None
+            if conversation:
+                filename = self.session_manager.save_session(conversation, self.session_id, overwrite=True)
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.path, 'w', encoding='utf-8') as f:
+                os.fsync(f.fileno())
+            self._since_compact = 0
+            return filename
+
+        except Exception as e:
+            logger.error(f"Error compacting session journal: {str(e)}")
+            raise
+
+    def close(self, conversation: List[Dict[str, str]]) -> Optional[str]:
+        """Compact and remove the journal at the end of a session."""
+        filename = self.compact(conversation)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return filename
+
+    def discard(self) -> None:
+        """Drop the journal and any snapshot it compacted, once the conversation is saved elsewhere."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        filename = self.session_manager.find_session(self.session_id)
+        if filename:
+            self.session_manager.delete_session(filename)
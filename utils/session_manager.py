@@ -1,43 +1,144 @@
-import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 from rich.console import Console
 from rich.table import Table
 from utils.logger import setup_logger
+from utils.search_index import SearchIndex
+from utils.session_format import SessionCodec, SESSION_EXTENSIONS, is_session_file, session_name, resolve_compression
 
 logger = setup_logger()
 console = Console()
 
+# Index of session metadata kept next to the session files
+INDEX_FILE = "index.db"
+# Most sessions sampled when training a zstd dictionary
+MAX_DICTIONARY_SAMPLES = 2000
+
 class SessionManager:
-    def __init__(self, sessions_dir: str = "sessions"):
+    def __init__(self,
+                 sessions_dir: str = "sessions",
+                 search_index: Optional[SearchIndex] = None,
+                 compression: Optional[str] = None):
         self.sessions_dir = sessions_dir
+        self.search_index = search_index
+        # Format for new sessions: json (legacy), gzip or zstd; all formats are always readable
+        self.compression = resolve_compression(compression)
+        self.codec = SessionCodec(sessions_dir)
         os.makedirs(sessions_dir, exist_ok=True)
+        self._index_lock = threading.Lock()
+        self._open_index()
+        
+    def _open_index(self) -> None:
+        """Open the session index, building it from the session files on first use."""
+        index_path = os.path.join(self.sessions_dir, INDEX_FILE)
+        is_new = not os.path.exists(index_path)
+        # The API server calls into the manager from worker threads
+        self.index = sqlite3.connect(index_path, check_same_thread=False)
+        self.index.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                filename TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                message_count INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            )"""
+        )
+        self.index.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON sessions(timestamp)")
+        self.index.commit()
+        if is_new:
+            self.rebuild_index()
+    
+    def _index_session(self, filename: str, timestamp: str, message_count: int) -> None:
+        """Record or update a session's metadata in the index."""
+        stat = os.stat(os.path.join(self.sessions_dir, filename))
+        with self._index_lock:
+            self.index.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                (filename, timestamp, message_count, stat.st_size, stat.st_mtime)
+            )
+            self.index.commit()
+    
+    def rebuild_index(self) -> int:
+        """Bring the index in line with the session files after changes made by hand.
         
-    def save_session(self, conversation: List[Dict[str, str]], name: Optional[str] = None) -> str:
-        """Save the current conversation to a file."""
+        Only files that are new or whose size/mtime changed are parsed again.
+        Returns the number of indexed sessions.
+        """
+        try:
+            with self._index_lock:
+                indexed = {
+                    row[0]: (row[1], row[2])
+                    for row in self.index.execute("SELECT filename, size, mtime FROM sessions")
+                }
+            
+            present = set()
+            for filename in os.listdir(self.sessions_dir):
+                if not is_session_file(filename):
+                    continue
+                present.add(filename)
+                stat = os.stat(os.path.join(self.sessions_dir, filename))
+                if indexed.get(filename) == (stat.st_size, stat.st_mtime):
+                    continue
+                try:
+                    session_data = self.codec.read(filename)
+                    self._index_session(
+                        filename,
+                        session_data["timestamp"],
+                        len(session_data["conversation"])
+                    )
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable session {filename}: {str(e)}")
+            
+            with self._index_lock:
+                self.index.executemany(
+                    "DELETE FROM sessions WHERE filename = ?",
+                    [(filename,) for filename in indexed if filename not in present]
+                )
+                self.index.commit()
+                return self.index.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding session index: {str(e)}")
+            raise
+    
+    def save_session(self,
+                     conversation: List[Dict[str, str]],
+                     name: Optional[str] = None,
+                     overwrite: bool = False) -> str:
+        """Save the current conversation to a file, replacing an existing one when overwrite is set."""
         try:
             if not name:
                 name = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            filename = f"{name}.json"
-            filepath = os.path.join(self.sessions_dir, filename)
+            extension = SESSION_EXTENSIONS[self.compression]
+            base_name = name
             
-            # Ensure unique filename
+            # Ensure unique filename (across all formats)
             counter = 1
-            while os.path.exists(filepath):
-                filename = f"{name}_{counter}.json"
-                filepath = os.path.join(self.sessions_dir, filename)
+            while self.find_session(name) and not overwrite:
+                name = f"{base_name}_{counter}"
                 counter += 1
             
+            filename = f"{name}{extension}"
             session_data = {
                 "timestamp": datetime.now().isoformat(),
                 "conversation": conversation
             }
+            self.codec.write(filename, session_data, self.compression)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
-                
+            # An overwritten session may have been stored in another format
+            for other in self._session_files(name):
+                if other != filename:
+                    self.delete_session(other)
+            
+            self._index_session(filename, session_data["timestamp"], len(conversation))
+            if self.search_index:
+                self.search_index.index_conversation(
+                    os.path.join(self.sessions_dir, filename), "sessions", conversation
+                )
             return filename
             
         except Exception as e:
@@ -51,8 +152,7 @@ class SessionManager:
             if not os.path.exists(filepath):
                 raise FileNotFoundError(f"Session file not found: {filename}")
                 
-            with open(filepath, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
+            session_data = self.codec.read(filename)
                 
             return session_data.get("conversation", [])
             
@@ -60,30 +160,92 @@ class SessionManager:
             logger.error(f"Error loading session: {str(e)}")
             raise
     
-    def list_sessions(self) -> List[Dict[str, str]]:
-        """List all available chat sessions."""
-        sessions = []
+    def _session_files(self, name: str) -> List[str]:
+        return [
+            f"{name}{extension}" for extension in SESSION_EXTENSIONS.values()
+            if os.path.exists(os.path.join(self.sessions_dir, f"{name}{extension}"))
+        ]
+    
+    def find_session(self, name: str) -> Optional[str]:
+        """Filename of the session called `name` in whichever format it is stored, or None."""
+        files = self._session_files(name)
+        return files[0] if files else None
+    
+    def migrate_sessions(self, compression: str) -> int:
+        """Rewrite every session in another format; for zstd a dictionary is trained on the sessions first.
+        
+        Returns the number of converted sessions.
+        """
         try:
-            for filename in os.listdir(self.sessions_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.sessions_dir, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
-                        sessions.append({
-                            "filename": filename,
-                            "timestamp": session_data["timestamp"],
-                            "message_count": len(session_data["conversation"])
-                        })
-            return sorted(sessions, key=lambda x: x["timestamp"], reverse=True)
+            compression = resolve_compression(compression)
+            extension = SESSION_EXTENSIONS[compression]
+            filenames = [
+                session["filename"] for session in self.list_sessions()
+                if not session["filename"].endswith(extension) or compression == "zstd"
+            ]
+            
+            if compression == "zstd":
+                samples = [
+                    self.codec.encode(self.codec.read(filename), "json")
+                    for filename in filenames[:MAX_DICTIONARY_SAMPLES]
+                ]
+                dict_id = self.codec.train_dictionary(samples)
+                if dict_id is not None:
+                    logger.info(f"Trained session dictionary {dict_id} on {len(samples)} sessions")
+            
+            converted = 0
+            for filename in filenames:
+                session_data = self.codec.read(filename)
+                new_filename = f"{session_name(filename)}{extension}"
+                self.codec.write(new_filename, session_data, compression)
+                if new_filename != filename:
+                    self.delete_session(filename)
+                self._index_session(new_filename, session_data["timestamp"], len(session_data["conversation"]))
+                if self.search_index:
+                    self.search_index.index_conversation(
+                        os.path.join(self.sessions_dir, new_filename), "sessions", session_data["conversation"]
+                    )
+                converted += 1
+            
+            self.compression = compression
+            return converted
+            
+        except Exception as e:
+            logger.error(f"Error migrating sessions: {str(e)}")
+            raise
+    
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, str]]:
+        """List chat sessions from the index, newest first, optionally one page at a time."""
+        try:
+            with self._index_lock:
+                rows = self.index.execute(
+                    "SELECT filename, timestamp, message_count FROM sessions "
+                    "ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                    (limit if limit is not None else -1, offset)
+                ).fetchall()
+            return [
+                {"filename": filename, "timestamp": timestamp, "message_count": message_count}
+                for filename, timestamp, message_count in rows
+            ]
             
         except Exception as e:
             logger.error(f"Error listing sessions: {str(e)}")
             raise
     
+    def count_sessions(self) -> int:
+        """Number of indexed sessions."""
+        with self._index_lock:
+            return self.index.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    
     def delete_session(self, filename: str) -> bool:
         """Delete a chat session file."""
         try:
             filepath = os.path.join(self.sessions_dir, filename)
+            with self._index_lock:
+                self.index.execute("DELETE FROM sessions WHERE filename = ?", (filename,))
+                self.index.commit()
+            if self.search_index:
+                self.search_index.remove(filepath)
             if os.path.exists(filepath):
                 os.remove(filepath)
                 return True
@@ -97,7 +259,7 @@ class SessionManager:
         """Export a chat session to different formats."""
         try:
             session = self.load_session(filename)
-            base_name = os.path.splitext(filename)[0]
+            base_name = session_name(filename)
             export_file = f"{base_name}_export.{export_format}"
             export_path = os.path.join(self.sessions_dir, export_file)
             
@@ -118,12 +280,15 @@ class SessionManager:
             logger.error(f"Error exporting session: {str(e)}")
             raise
     
-    def display_sessions(self) -> None:
-        """Display available sessions in a formatted table."""
+    def display_sessions(self, page: int = 1, page_size: int = 20) -> None:
+        """Display one page of available sessions in a formatted table."""
         try:
-            sessions = self.list_sessions()
+            total = self.count_sessions()
+            pages = max((total + page_size - 1) // page_size, 1)
+            page = min(max(page, 1), pages)
+            sessions = self.list_sessions(limit=page_size, offset=(page - 1) * page_size)
             
-            table = Table(title="Available Chat Sessions")
+            table = Table(title=f"Available Chat Sessions (page {page}/{pages}, {total} total)")
             table.add_column("Filename", style="cyan")
             table.add_column("Timestamp", style="green")
             table.add_column("Messages", style="yellow")
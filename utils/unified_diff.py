@@ -0,0 +1,73 @@
+import re
+from typing import List, Tuple
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+class PatchError(ValueError):
+    """A diff that does not apply to the file it targets."""
+
+def parse_hunks(diff: str) -> List[Tuple[int, List[Tuple[str, str]]]]:
+    """(old start line, [(marker, text), ...]) for every hunk of a unified diff."""
+    hunks = []
+    current = None
+    for line in diff.splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [])
+            hunks.append(current)
+            continue
+        if current is None or line.startswith(("--- ", "+++ ")):
+            continue
+        if line.startswith("\\"):
+            # "\ No newline at end of file"
+            continue
+        marker, text = (line[0], line[1:]) if line else (" ", "")
+        if marker not in " -+":
+            raise PatchError(f"Unexpected line in hunk: {line[:80]}")
+        current[1].append((marker, text))
+    if not hunks:
+        raise PatchError("No hunks found in diff")
+    return hunks
+
+def _find(lines: List[str], block: List[str], expected: int, start: int) -> int:
+    """Index at or after `start` where `block` matches, nearest to `expected` first.
+
+    Lines are compared without trailing whitespace, since models often drop it.
+    """
+    wanted = [line.rstrip() for line in block]
+    size = len(block)
+    last = len(lines) - size
+    expected = min(max(expected, start), max(last, start))
+    for distance in range(0, max(last - start, 0) + 1):
+        for position in (expected - distance, expected + distance):
+            if start <= position <= last and [line.rstrip() for line in lines[position:position + size]] == wanted:
+                return position
+        if expected - distance < start and expected + distance > last:
+            break
+    raise PatchError(f"Hunk does not match the file near line {expected + 1}")
+
+def apply_patch(original: str, diff: str) -> str:
+    """Apply a unified diff to a file's text; hunks may be offset from their stated lines."""
+    lines = original.splitlines()
+    trailing_newline = original.endswith("\n") or not original
+    result = []
+    cursor = 0
+    for old_start, ops in parse_hunks(diff):
+        old = [text for marker, text in ops if marker != "+"]
+        if old:
+            position = _find(lines, old, old_start - 1, cursor)
+        else:
+            # Pure insertion after line old_start
+            position = min(max(old_start, cursor), len(lines))
+        result.extend(lines[cursor:position])
+        cursor = position
+        for marker, text in ops:
+            if marker == "+":
+                result.append(text)
+            else:
+                # Context lines keep the file's own text, not the diff's copy of it
+                if marker == " ":
+                    result.append(lines[cursor])
+                cursor += 1
+    result.extend(lines[cursor:])
+    return "\n".join(result) + ("\n" if trailing_newline and result else "")